@@ -0,0 +1 @@
+# Benchmarks (run against local stubs; no API key or network needed)
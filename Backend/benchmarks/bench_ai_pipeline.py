@@ -0,0 +1,232 @@
+"""
+End-to-end throughput benchmark for the AI pipeline: report creation through
+the API, the ai_jobs queue and process_issue_text, against the local stub LLM
+(no API key or money needed). Uses a throwaway SQLite database.
+
+Reports request latency of POST /api/reports, end-to-end latency until the
+report's ai_status leaves "processing" (polled every --poll-ms), both as
+p50/p95/p99, and completed reports per second. Threshold flags make it usable
+as a CI gate: the exit code is 1 if any threshold is missed.
+
+Run from Backend folder:
+    python -m benchmarks.bench_ai_pipeline --reports 200 --concurrency 16 \\
+        --latency-ms 300 --latency-dist lognormal --error-rate 0.02 \\
+        --max-p95-ms 3000 --min-reports-per-second 10
+Stub flags are the same as benchmarks.stub_llm_server; --base-url uses an
+already running stub (or any OpenAI-compatible server) instead.
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stub_llm_server import add_behaviour_arguments, behaviour_from_args, start_in_thread
+
+SAMPLE_TEXTS = [
+    "Amazi ntabwo aboneka mu mudugudu wacu iminsi itatu, turasaba ubufasha",
+    "the road near our school has big potholes and cars cant pass pls help",
+    "Umuriro wabuze mu kagari kacu kuva ejo, abaturage barababaye",
+    "garbage not collected for 2 weeks in our street, it smells bad",
+    "Ibitaro byacu nta miti ihari, abarwayi bategereza igihe kirekire",
+    "thieves broke into 3 shops last night near the market, we need police patrols",
+]
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile (values need not be sorted)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, min(len(ordered), round(pct / 100 * len(ordered) + 0.5)))
+    return ordered[rank - 1]
+
+
+def _summary(label: str, seconds: list[float]) -> dict[str, float]:
+    ms = [s * 1000 for s in seconds]
+    stats = {"p50": percentile(ms, 50), "p95": percentile(ms, 95), "p99": percentile(ms, 99)}
+    print(
+        f"{label:<22} n={len(ms):<5} p50={stats['p50']:8.1f} ms  p95={stats['p95']:8.1f} ms  "
+        f"p99={stats['p99']:8.1f} ms"
+    )
+    return stats
+
+
+def _configure_env(args: argparse.Namespace, base_url: str, db_path: str) -> None:
+    """Settings are read at import time, so this runs before any app module is imported."""
+    os.environ.update({
+        "DATABASE_URL": f"sqlite:///{db_path}",
+        "OPENAI_API_KEY": "stub",
+        "OPENAI_API_BASE": base_url,
+        "AI_WORKERS": str(args.workers),
+        "AI_JOB_POLL_SECONDS": "0.2",
+        "AI_JOB_RETRY_BASE_SECONDS": str(args.retry_base_seconds),
+        # Measure the LLM path itself: every report goes to the stub
+        "AI_LOCAL_CLASSIFIER_ENABLED": "true" if args.local_classifier else "false",
+        "AI_CACHE_ENABLED": "true" if args.cache else "false",
+        "AI_DAILY_TOKEN_BUDGET": "0",
+    })
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="AI pipeline throughput benchmark (stub LLM)")
+    parser.add_argument("--reports", type=int, default=100, help="reports to create (default 100)")
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent POST /api/reports (default 8)")
+    parser.add_argument("--workers", type=int, default=4, help="AI_WORKERS for the queue (default 4)")
+    parser.add_argument("--retry-base-seconds", type=float, default=0.5, help="AI_JOB_RETRY_BASE_SECONDS")
+    parser.add_argument("--local-classifier", action="store_true", help="let the local classifier skip the LLM")
+    parser.add_argument("--cache", action="store_true", help="enable the AI result cache")
+    parser.add_argument("--timeout", type=float, default=300.0, help="give up waiting for the queue after this")
+    parser.add_argument("--poll-ms", type=float, default=20.0, help="completion polling interval (default 20)")
+    parser.add_argument("--base-url", default=None, help="use this OpenAI-compatible server instead of the stub")
+    parser.add_argument("--max-p95-ms", type=float, default=None, help="fail if end-to-end p95 is above this")
+    parser.add_argument("--max-p99-ms", type=float, default=None, help="fail if end-to-end p99 is above this")
+    parser.add_argument("--min-reports-per-second", type=float, default=None, help="fail below this throughput")
+    parser.add_argument("--max-failed-rate", type=float, default=None, help="fail if more reports end up failed")
+    add_behaviour_arguments(parser)
+    args = parser.parse_args(argv)
+
+    server = None
+    base_url = args.base_url
+    if base_url is None:
+        server = start_in_thread(behaviour=behaviour_from_args(args))
+        base_url = server.base_url
+
+    tmpdir = tempfile.TemporaryDirectory(prefix="bench-ai-")
+    _configure_env(args, base_url, os.path.join(tmpdir.name, "bench.db"))
+
+    from fastapi.testclient import TestClient
+
+    from main import app
+    from models.base import SessionLocal
+    from models.report import Report
+    from services import ai_usage
+    from services.ai_queue import AI_STATUS_PROCESSING
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)  # one INFO line per request otherwise
+
+    submitted: dict[int, float] = {}  # report id -> time its POST started
+    finished: dict[int, float] = {}  # report id -> time it was seen leaving "processing"
+    final_status: dict[int, Optional[str]] = {}
+    create_latency: list[float] = []
+    create_errors = 0
+    lock = threading.Lock()
+    submitting_done = threading.Event()
+
+    def watch() -> None:
+        """Poll ai_status while reports are still being submitted, so early ones are timed correctly."""
+        deadline = time.perf_counter() + args.timeout
+        while time.perf_counter() < deadline:
+            with lock:
+                pending = [i for i in submitted if i not in finished]
+                all_seen = submitting_done.is_set()
+            if all_seen and not pending:
+                return
+            if pending:
+                db = SessionLocal()
+                try:
+                    rows = db.query(Report.id, Report.ai_status).filter(Report.id.in_(pending)).all()
+                finally:
+                    db.close()
+                now = time.perf_counter()
+                with lock:
+                    for report_id, ai_status in rows:
+                        if ai_status != AI_STATUS_PROCESSING:
+                            finished[report_id] = now
+                            final_status[report_id] = ai_status
+            time.sleep(args.poll_ms / 1000)
+
+    with TestClient(app) as client:
+        client.post("/api/auth/register", json={
+            "full_name": "Bench User", "email": "bench@example.com", "password": "benchpass123",
+        })
+        token = client.post(
+            "/api/auth/login", json={"email": "bench@example.com", "password": "benchpass123"}
+        ).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        def create(i: int) -> None:
+            nonlocal create_errors
+            payload = {
+                "name": "Bench User",
+                "phone": "0780000000",
+                "location": f"Kigali, Gasabo, cell {i % 50}",
+                "institution": "district",
+                "category": "other",
+                "description": f"{SAMPLE_TEXTS[i % len(SAMPLE_TEXTS)]} (report {i})",
+            }
+            start = time.perf_counter()
+            response = client.post("/api/reports", json=payload, headers=headers)
+            elapsed = time.perf_counter() - start
+            with lock:
+                create_latency.append(elapsed)
+                if response.status_code == 201:
+                    submitted[response.json()["id"]] = start
+                else:
+                    create_errors += 1
+
+        watcher = threading.Thread(target=watch, name="bench-watch", daemon=True)
+        bench_start = time.perf_counter()
+        watcher.start()
+        with ThreadPoolExecutor(max_workers=max(1, args.concurrency)) as pool:
+            list(pool.map(create, range(args.reports)))
+        submitting_done.set()
+        watcher.join()
+        bench_end = max(finished.values(), default=time.perf_counter())
+        usage = ai_usage.stats()
+
+    if server is not None:
+        server.shutdown()
+    tmpdir.cleanup()
+
+    print(f"\n{args.reports} reports, concurrency {args.concurrency}, {args.workers} AI worker(s), stub {base_url}")
+    if server is not None:
+        print(f"stub: {server.behaviour}")
+    _summary("POST /api/reports", create_latency)
+    e2e_stats = _summary("submit -> AI finished", [finished[i] - submitted[i] for i in finished])
+    elapsed = bench_end - bench_start
+    throughput = len(finished) / elapsed if elapsed > 0 else 0.0
+    counts: dict[str, int] = {}
+    for ai_status in final_status.values():
+        counts[ai_status or "none"] = counts.get(ai_status or "none", 0) + 1
+    print(f"completed {len(finished)}/{len(submitted)} in {elapsed:.2f}s -> {throughput:.1f} reports/s")
+    print(f"ai_status: {counts}  create errors: {create_errors}")
+    if server is not None:
+        print(
+            f"stub requests={server.requests_served} errors={server.errors_sent} "
+            f"malformed={server.malformed_sent} connections={server.connections_opened}"
+        )
+    for model, m in usage["models"].items():
+        print(
+            f"usage {model}: calls={m['calls']} errors={m['errors']} "
+            f"avg_prompt_tokens={m['avg_prompt_tokens']} avg_latency={m['avg_latency_seconds'] * 1000:.1f} ms"
+        )
+
+    failures = []
+    if len(finished) < len(submitted):
+        failures.append(f"{len(submitted) - len(finished)} report(s) still processing after {args.timeout:.0f}s")
+    if create_errors:
+        failures.append(f"{create_errors} report creation request(s) failed")
+    if args.max_p95_ms is not None and e2e_stats["p95"] > args.max_p95_ms:
+        failures.append(f"end-to-end p95 {e2e_stats['p95']:.1f} ms > {args.max_p95_ms} ms")
+    if args.max_p99_ms is not None and e2e_stats["p99"] > args.max_p99_ms:
+        failures.append(f"end-to-end p99 {e2e_stats['p99']:.1f} ms > {args.max_p99_ms} ms")
+    if args.min_reports_per_second is not None and throughput < args.min_reports_per_second:
+        failures.append(f"throughput {throughput:.1f} reports/s < {args.min_reports_per_second}")
+    failed_rate = counts.get("failed", 0) / len(submitted) if submitted else 0.0
+    if args.max_failed_rate is not None and failed_rate > args.max_failed_rate:
+        failures.append(f"failed rate {failed_rate:.3f} > {args.max_failed_rate}")
+
+    for failure in failures:
+        print(f"THRESHOLD FAILED: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
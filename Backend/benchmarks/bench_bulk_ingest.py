@@ -0,0 +1,94 @@
+"""
+Bulk ingest benchmark: the same reports submitted one POST /api/reports at a
+time versus one POST /api/reports/bulk (NDJSON), against a throwaway SQLite
+database served by uvicorn. Prints reports/s for both and the speedup; the
+bulk figure is what a field office or SMS gateway upload gets.
+
+Run from Backend folder:
+    python -m benchmarks.bench_bulk_ingest --reports 2000
+    python -m benchmarks.bench_bulk_ingest --reports 20000 --skip-single
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from typing import Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_ai_pipeline import SAMPLE_TEXTS
+
+
+def payloads(count: int, offset: int = 0) -> list[dict]:
+    return [
+        {
+            "name": "Bench", "phone": "0780000000", "location": f"Kigali cell {i % 50}",
+            "institution": "district", "category": "water",
+            "description": f"{SAMPLE_TEXTS[i % len(SAMPLE_TEXTS)]} ({i})",
+        }
+        for i in range(offset, offset + count)
+    ]
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="One-by-one report POSTs vs the bulk ingest endpoint")
+    parser.add_argument("--reports", type=int, default=2000, help="reports per run")
+    parser.add_argument("--skip-single", action="store_true", help="only time the bulk endpoint")
+    args = parser.parse_args(argv)
+
+    tmpdir = tempfile.TemporaryDirectory(prefix="bench-bulk-")
+    os.environ.update({
+        "DATABASE_URL": f"sqlite:///{os.path.join(tmpdir.name, 'bench.db')}",
+        "OPENAI_API_KEY": "",
+        "PASSWORD_POOL_WORKERS": "0",
+        "SMTP_HOST": "",
+    })
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    import httpx
+
+    from benchmarks.bench_async_db import ServerThread, _free_port
+    from core.security import create_access_token, hash_password
+    from main import app
+    from models.base import SessionLocal, init_db
+    from models.user import User
+
+    init_db()
+    db = SessionLocal()
+    admin = User(full_name="Bench", email="bench@example.com", hashed_password=hash_password("benchpass1"), role="Admin")
+    db.add(admin)
+    db.commit()
+    headers = {"Authorization": f"Bearer {create_access_token(subject=admin.id)}"}
+    db.close()
+
+    results = {}
+    port = _free_port()
+    with ServerThread(app, port, threadpool_size=40), httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=None) as client:
+        if not args.skip_single:
+            start = time.perf_counter()
+            for payload in payloads(args.reports):
+                client.post("/api/reports", json=payload, headers=headers).raise_for_status()
+            results["single"] = time.perf_counter() - start
+
+        body = "\n".join(json.dumps(p) for p in payloads(args.reports, offset=args.reports))
+        start = time.perf_counter()
+        response = client.post("/api/reports/bulk", content=body, headers={**headers, "Content-Type": "application/x-ndjson"})
+        response.raise_for_status()
+        results["bulk"] = time.perf_counter() - start
+        assert response.json()["created"] == args.reports, response.json()["failed"]
+
+    print(f"{args.reports} reports")
+    print(f"{'mode':>8} {'seconds':>8} {'reports/s':>10} {'reports/min':>12}")
+    for mode, elapsed in results.items():
+        print(f"{mode:>8} {elapsed:8.2f} {args.reports / elapsed:10.0f} {args.reports * 60 / elapsed:12.0f}")
+    if "single" in results:
+        print(f"bulk speedup: {results['single'] / results['bulk']:.1f}x")
+    tmpdir.cleanup()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
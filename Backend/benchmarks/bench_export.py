@@ -0,0 +1,118 @@
+"""
+Export benchmark: GET /api/reports/export for growing numbers of reports,
+against a throwaway SQLite database. For each size it prints the time to
+stream the whole file, reports/s, bytes sent, and the peak Python memory
+allocated while streaming (tracemalloc, server and client together). That
+peak should stay flat as the export grows, since at most EXPORT_BATCH_SIZE
+rows are held at once. The app is served by uvicorn and the response read
+chunk by chunk over HTTP and discarded (httpx's ASGI transport would buffer
+the whole body and hide the difference).
+
+Run from Backend folder:
+    python -m benchmarks.bench_export --sizes 1000 10000 100000
+    python -m benchmarks.bench_export --sizes 100000 --format ndjson --gzip
+tracemalloc slows Python down; use --no-trace for throughput numbers.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_ai_pipeline import SAMPLE_TEXTS
+
+
+def seed_reports(total: int) -> None:
+    """Grow the reports table to `total` rows (one multi-row INSERT per 5000)."""
+    from sqlalchemy import func, insert, select
+
+    from models.base import engine
+    from models.report import Report
+
+    with engine.begin() as conn:
+        have = conn.execute(select(func.count(Report.id))).scalar() or 0
+        for start in range(have, total, 5000):
+            conn.execute(insert(Report), [
+                {
+                    "name": "Bench", "phone": "0780000000", "location": f"Kigali cell {i % 50}",
+                    "institution": "district", "category": "water", "status": "pending",
+                    "raw_description": f"{SAMPLE_TEXTS[i % len(SAMPLE_TEXTS)]} ({i})",
+                }
+                for i in range(start, min(total, start + 5000))
+            ])
+
+
+async def _download(base_url: str, token: str, params: dict, trace: bool) -> tuple[int, float, int]:
+    import httpx
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=None) as client:
+        if trace:
+            tracemalloc.start()
+        start = time.perf_counter()
+        size = 0
+        async with client.stream("GET", "/api/reports/export", params=params, headers={"Authorization": f"Bearer {token}"}) as response:
+            response.raise_for_status()
+            async for chunk in response.aiter_raw():
+                size += len(chunk)
+        elapsed = time.perf_counter() - start
+        peak = 0
+        if trace:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    return size, elapsed, peak
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Streaming export: time and peak memory by export size")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000], help="reports per run")
+    parser.add_argument("--format", choices=["csv", "ndjson"], default="csv")
+    parser.add_argument("--gzip", action="store_true", help="compress on the fly")
+    parser.add_argument("--no-trace", action="store_true", help="skip tracemalloc (faster, no memory column)")
+    args = parser.parse_args(argv)
+
+    tmpdir = tempfile.TemporaryDirectory(prefix="bench-export-")
+    os.environ.update({
+        "DATABASE_URL": f"sqlite:///{os.path.join(tmpdir.name, 'bench.db')}",
+        "OPENAI_API_KEY": "",
+        "PASSWORD_POOL_WORKERS": "0",
+        "SMTP_HOST": "",
+        "DEDUP_ENABLED": "false",
+    })
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    from benchmarks.bench_async_db import ServerThread, _free_port
+    from core.security import create_access_token, hash_password
+    from main import app
+    from models.base import SessionLocal, init_db
+    from models.user import User
+
+    init_db()
+    db = SessionLocal()
+    admin = User(full_name="Bench", email="bench@example.com", hashed_password=hash_password("benchpass1"), role="Admin")
+    db.add(admin)
+    db.commit()
+    token = create_access_token(subject=admin.id)
+    db.close()
+
+    params = {"format": args.format, "gzip": str(args.gzip).lower()}
+    print(f"format {args.format}{' + gzip' if args.gzip else ''}")
+    print(f"{'reports':>9} {'seconds':>8} {'reports/s':>10} {'MB sent':>8} {'peak MB':>8}")
+    port = _free_port()
+    with ServerThread(app, port, threadpool_size=40):
+        for size in sorted(args.sizes):
+            seed_reports(size)
+            sent, elapsed, peak = asyncio.run(_download(f"http://127.0.0.1:{port}", token, params, not args.no_trace))
+            peak_text = f"{peak / 1e6:8.2f}" if not args.no_trace else f"{'-':>8}"
+            print(f"{size:>9} {elapsed:8.2f} {size / elapsed:10.0f} {sent / 1e6:8.2f} {peak_text}")
+    tmpdir.cleanup()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+"""
+Benchmark: new OpenAI() client per call (old behaviour) vs the shared pooled client.
+Runs against the local stub server, so the difference is pure client setup and
+connection cost (against the real API each new connection also pays a TLS handshake).
+
+Run from Backend folder: python -m benchmarks.bench_openai_client --calls 200
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stub_llm_server import start_in_thread
+
+
+def _run(label: str, calls: int, call) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        call()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {calls} calls in {elapsed:.3f}s  ({elapsed / calls * 1000:.2f} ms/call)")
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+
+    server = start_in_thread()
+    os.environ["OPENAI_API_KEY"] = "stub"
+    os.environ["OPENAI_API_BASE"] = server.base_url
+
+    from openai import OpenAI
+    from core.config import settings
+    from services import ai_processor
+
+    settings.OPENAI_API_KEY = "stub"
+    settings.OPENAI_API_BASE = server.base_url
+
+    def per_call_client():
+        client = OpenAI(api_key="stub", base_url=server.base_url)
+        client.chat.completions.create(model="stub", messages=[{"role": "user", "content": "x"}])
+        client.close()
+
+    def shared_client():
+        ai_processor.get_client().chat.completions.create(
+            model="stub", messages=[{"role": "user", "content": "x"}]
+        )
+
+    # Warm up imports and the shared pool
+    shared_client()
+
+    conns_before = server.connections_opened
+    old = _run("new client per call", args.calls, per_call_client)
+    conns_old = server.connections_opened - conns_before
+
+    conns_before = server.connections_opened
+    new = _run("shared pooled client", args.calls, shared_client)
+    conns_new = server.connections_opened - conns_before
+
+    ai_processor.close_client()
+    server.shutdown()
+
+    saved = (old - new) / args.calls * 1000
+    print(f"connections opened: per-call={conns_old}, shared={conns_new}")
+    print(f"overhead saved: {saved:.2f} ms/call ({(1 - new / old) * 100:.1f}% faster)")
+
+
+if __name__ == "__main__":
+    main()
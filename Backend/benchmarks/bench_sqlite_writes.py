@@ -0,0 +1,173 @@
+"""
+Write benchmark for the SQLite profile and group commit: concurrent
+POST /api/reports over HTTP against a throwaway SQLite file, in three setups
+  default   rollback journal, every request commits on its own (the old behaviour)
+  tuned     SQLITE_TUNING: WAL, busy_timeout, synchronous=NORMAL, mmap
+  batched   SQLITE_TUNING + REPORT_WRITE_BATCHING (one writer thread, group commit)
+Settings are read at import time, so each setup runs in its own subprocess.
+Prints reports/s, errors (e.g. "database is locked" 500s) and p50/p95/p99
+latency for each.
+
+What group commit saves is mostly the wait for the disk at each commit. On a
+VM or SSD whose fsync returns in microseconds there is little to save;
+--commit-latency-ms makes every COMMIT wait that long in the driver's thread,
+like a disk with a slow fsync (a few ms on network block storage).
+
+Run from Backend folder:
+    python -m benchmarks.bench_sqlite_writes --requests 2000 --concurrency 64
+    python -m benchmarks.bench_sqlite_writes --variants tuned batched --batch-wait-ms 5
+    python -m benchmarks.bench_sqlite_writes --commit-latency-ms 4
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_ai_pipeline import SAMPLE_TEXTS, _summary
+
+VARIANTS = {
+    "default": {"SQLITE_TUNING": "false", "REPORT_WRITE_BATCHING": "false"},
+    "tuned": {"SQLITE_TUNING": "true", "REPORT_WRITE_BATCHING": "false"},
+    "batched": {"SQLITE_TUNING": "true", "REPORT_WRITE_BATCHING": "true"},
+}
+
+
+def add_commit_latency(latency_ms: float) -> None:
+    """Make every COMMIT on both engines wait latency_ms in the thread that runs it."""
+    from sqlalchemy import event
+    from sqlalchemy.util import await_only
+
+    from models.base import engine, get_async_engine
+
+    delay = latency_ms / 1000
+
+    def slow(raw: sqlite3.Connection) -> None:
+        raw.set_trace_callback(lambda statement: time.sleep(delay) if statement.startswith("COMMIT") else None)
+
+    @event.listens_for(engine, "connect")
+    def _sync_connect(dbapi_connection, _record) -> None:
+        slow(dbapi_connection)
+
+    @event.listens_for(get_async_engine().sync_engine, "connect")
+    def _async_connect(dbapi_connection, _record) -> None:
+        driver = dbapi_connection.driver_connection
+        await_only(driver._execute(slow, driver._conn))
+
+
+async def _drive(base_url: str, token: str, requests: int, concurrency: int):
+    import httpx
+
+    latencies: list[float] = []
+    errors = 0
+    next_index = 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, headers={"Authorization": f"Bearer {token}"}, limits=limits, timeout=120) as client:
+
+        async def worker() -> None:
+            nonlocal next_index, errors
+            while next_index < requests:
+                i = next_index
+                next_index += 1
+                body = {
+                    "name": "Bench", "phone": "0780000000", "location": f"Kigali cell {i % 50}",
+                    "institution": "district", "category": "water",
+                    "description": f"{SAMPLE_TEXTS[i % len(SAMPLE_TEXTS)]} ({i})",
+                }
+                start = time.perf_counter()
+                response = await client.post("/api/reports", json=body)
+                latencies.append(time.perf_counter() - start)
+                if response.status_code != 201:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return latencies, errors, elapsed
+
+
+def run_one(args: argparse.Namespace) -> dict:
+    """Serve the app with the current environment and drive it; returns the measurements."""
+    from benchmarks.bench_async_db import ServerThread, _free_port, seed
+    from main import app
+
+    if args.commit_latency_ms:
+        add_commit_latency(args.commit_latency_ms)
+    token, _ = seed(0)
+    port = _free_port()
+    with ServerThread(app, port, args.threadpool_size):
+        latencies, errors, elapsed = asyncio.run(
+            _drive(f"http://127.0.0.1:{port}", token, args.requests, args.concurrency)
+        )
+        from services import report_writer
+
+        writer = report_writer.stats()
+    return {"latencies": latencies, "errors": errors, "elapsed": elapsed, "avg_batch_size": writer["avg_batch_size"]}
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="SQLite write throughput: default vs tuned vs group commit")
+    parser.add_argument("--requests", type=int, default=2000, help="reports to create per setup (default 2000)")
+    parser.add_argument("--concurrency", type=int, default=64, help="concurrent clients (default 64)")
+    parser.add_argument("--threadpool-size", type=int, default=40, help="anyio threadpool size (default 40)")
+    parser.add_argument("--batch-size", type=int, default=64, help="REPORT_WRITE_BATCH_SIZE (default 64)")
+    parser.add_argument("--batch-wait-ms", type=float, default=2.0, help="REPORT_WRITE_MAX_WAIT_MS (default 2)")
+    parser.add_argument("--commit-latency-ms", type=float, default=0.0, help="emulated disk wait per COMMIT (default 0)")
+    parser.add_argument("--variants", nargs="+", choices=list(VARIANTS), default=list(VARIANTS))
+    parser.add_argument("--run-variant", choices=list(VARIANTS), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.run_variant:
+        logging.getLogger("httpx").setLevel(logging.WARNING)
+        print(json.dumps(run_one(args)))
+        return 0
+
+    print(
+        f"{args.requests} reports per setup, concurrency {args.concurrency}, batch {args.batch_size} / "
+        f"{args.batch_wait_ms:g} ms, +{args.commit_latency_ms:g} ms per commit"
+    )
+    results: dict[str, float] = {}
+    for name in args.variants:
+        with tempfile.TemporaryDirectory(prefix="bench-writes-") as tmpdir:
+            env = dict(os.environ, **VARIANTS[name], **{
+                "DATABASE_URL": f"sqlite:///{os.path.join(tmpdir, 'bench.db')}",
+                "OPENAI_API_KEY": "",
+                "PASSWORD_POOL_WORKERS": "0",
+                "SMTP_HOST": "",
+                "DEDUP_ENABLED": "false",
+                "REPORT_WRITE_BATCH_SIZE": str(args.batch_size),
+                "REPORT_WRITE_MAX_WAIT_MS": str(args.batch_wait_ms),
+            })
+            child = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_sqlite_writes", "--run-variant", name,
+                 "--requests", str(args.requests), "--concurrency", str(args.concurrency),
+                 "--threadpool-size", str(args.threadpool_size), "--commit-latency-ms", str(args.commit_latency_ms)],
+                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                env=env, capture_output=True, text=True,
+            )
+        if child.returncode != 0:
+            print(f"\n[{name}] failed:\n{child.stderr[-2000:]}")
+            continue
+        result = json.loads(child.stdout.strip().splitlines()[-1])
+        results[name] = len(result["latencies"]) / result["elapsed"] if result["elapsed"] else 0.0
+        batch = f", avg batch {result['avg_batch_size']}" if name == "batched" else ""
+        print(
+            f"\n[{name}] {len(result['latencies'])} reports in {result['elapsed']:.2f}s -> "
+            f"{results[name]:.1f} reports/s, errors={result['errors']}{batch}"
+        )
+        _summary(f"{name} latency", result["latencies"])
+    if results.get("default"):
+        print("\n" + ", ".join(f"{name} {rps / results['default']:.2f}x" for name, rps in results.items()) + " (vs default)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,221 @@
+"""
+Local OpenAI-compatible stub server for benchmarks (no API key or network needed).
+Answers POST /v1/chat/completions with a fixed structured-report JSON (or a
+JSON array for batched "### id: <id>" requests).
+
+Latency, error rate and malformed-reply rate are configurable, so the AI path
+can be exercised under realistic and unhappy conditions:
+
+    python -m benchmarks.stub_llm_server --port 8099 --latency-ms 400 \
+        --latency-dist lognormal --error-rate 0.02 --malformed-rate 0.01
+
+Then point the app at it: OPENAI_API_BASE=http://127.0.0.1:8099/v1 OPENAI_API_KEY=stub
+"""
+import argparse
+import json
+import math
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+STUB_RESULT = {
+    "structured_description": "A citizen reports that the water supply has been interrupted for three days.",
+    "suggested_title": "Water supply interruption",
+    "suggested_category": "water",
+    "suggested_institution": "district",
+}
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "exponential", "lognormal")
+
+_BATCH_ID = re.compile(r"^### id: (.+)$", re.MULTILINE)
+
+
+@dataclass
+class StubBehaviour:
+    """How the stub answers. latency_ms is the median delay for every distribution."""
+
+    latency_ms: float = 0.0
+    latency_dist: str = "fixed"
+    latency_sigma: float = 0.5  # lognormal spread
+    error_rate: float = 0.0  # share of requests answered with error_status
+    error_status: int = 500
+    malformed_rate: float = 0.0  # share of 200 replies whose content is not valid JSON
+    seed: Optional[int] = None
+
+    def __post_init__(self) -> None:
+        if self.latency_dist not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"latency_dist must be one of {LATENCY_DISTRIBUTIONS}")
+        self._rng = random.Random(self.seed)
+        self._lock = threading.Lock()
+
+    def _random(self) -> float:
+        with self._lock:
+            return self._rng.random()
+
+    def delay_seconds(self) -> float:
+        median = max(0.0, self.latency_ms) / 1000
+        if median == 0 or self.latency_dist == "fixed":
+            return median
+        with self._lock:
+            if self.latency_dist == "uniform":
+                return self._rng.uniform(0, 2 * median)
+            if self.latency_dist == "exponential":
+                return self._rng.expovariate(math.log(2) / median)
+            return self._rng.lognormvariate(math.log(median), self.latency_sigma)
+
+    def should_fail(self) -> bool:
+        return self.error_rate > 0 and self._random() < self.error_rate
+
+    def should_malform(self) -> bool:
+        return self.malformed_rate > 0 and self._random() < self.malformed_rate
+
+
+def _completion(content: str, model: str, prompt_tokens: int = 0) -> dict:
+    completion_tokens = len(content) // 4 + 1
+    return {
+        "id": "chatcmpl-stub",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 so clients can keep connections alive between calls
+    protocol_version = "HTTP/1.1"
+    # Headers and body are separate writes; without this, Nagle + delayed ACK adds ~40 ms per keep-alive call
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):  # keep benchmark output clean
+        pass
+
+    def _send_json(self, status: int, body: dict) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        request = json.loads(self.rfile.read(length) or b"{}")
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": "not found"}})
+            return
+        server: StubServer = self.server
+        behaviour = server.behaviour
+        server.count("requests_served")
+        delay = behaviour.delay_seconds()
+        if delay:
+            time.sleep(delay)
+        if behaviour.should_fail():
+            server.count("errors_sent")
+            self._send_json(behaviour.error_status, {"error": {"message": "stub error", "type": "server_error"}})
+            return
+
+        messages = request.get("messages", [])
+        # Rough token count (about 4 characters per token) so usage accounting can be exercised
+        prompt_tokens = sum(len(m.get("content") or "") for m in messages) // 4
+        user_content = next((m.get("content") or "" for m in reversed(messages) if m.get("role") == "user"), "")
+        batch_ids = _BATCH_ID.findall(user_content)
+        if batch_ids:
+            content = json.dumps([{"id": i.strip(), **STUB_RESULT} for i in batch_ids])
+        else:
+            content = json.dumps(STUB_RESULT)
+        if behaviour.should_malform():
+            server.count("malformed_sent")
+            content = content[: len(content) // 2]  # truncated JSON, like a cut-off reply
+        self._send_json(200, _completion(content, request.get("model", "stub"), prompt_tokens))
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], behaviour: Optional[StubBehaviour] = None) -> None:
+        super().__init__(address, StubHandler)
+        self.behaviour = behaviour or StubBehaviour()
+        self.requests_served = 0
+        self.connections_opened = 0
+        self.errors_sent = 0
+        self.malformed_sent = 0
+        self._counter_lock = threading.Lock()
+
+    def count(self, name: str) -> None:
+        with self._counter_lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def process_request(self, request, client_address):
+        self.count("connections_opened")
+        super().process_request(request, client_address)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+
+def start_in_thread(
+    host: str = "127.0.0.1", port: int = 0, behaviour: Optional[StubBehaviour] = None
+) -> StubServer:
+    """Start a stub server on a background thread (port 0 = pick a free port)."""
+    server = StubServer((host, port), behaviour)
+    threading.Thread(target=server.serve_forever, name="stub-llm", daemon=True).start()
+    return server
+
+
+def add_behaviour_arguments(parser: argparse.ArgumentParser) -> None:
+    """Stub behaviour flags, shared with the benchmarks that start their own stub."""
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="median reply delay (default 0)")
+    parser.add_argument("--latency-dist", choices=LATENCY_DISTRIBUTIONS, default="fixed")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="lognormal spread (default 0.5)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with an error")
+    parser.add_argument("--error-status", type=int, default=500, help="HTTP status for errors (e.g. 429, 500)")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="share of replies with truncated JSON")
+    parser.add_argument("--seed", type=int, default=None, help="random seed for repeatable runs")
+
+
+def behaviour_from_args(args: argparse.Namespace) -> StubBehaviour:
+    return StubBehaviour(
+        latency_ms=args.latency_ms,
+        latency_dist=args.latency_dist,
+        latency_sigma=args.latency_sigma,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        malformed_rate=args.malformed_rate,
+        seed=args.seed,
+    )
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="OpenAI-compatible stub server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    add_behaviour_arguments(parser)
+    args = parser.parse_args(argv)
+    server = StubServer((args.host, args.port), behaviour_from_args(args))
+    print(f"Stub LLM listening on {server.base_url} ({server.behaviour})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
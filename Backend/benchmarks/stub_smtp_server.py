@@ -0,0 +1,137 @@
+"""
+Local SMTP stand-in for the email outbox (no mail server or credentials needed).
+Speaks enough SMTP for smtplib: EHLO/HELO, AUTH PLAIN/LOGIN (any credentials),
+MAIL, RCPT, DATA, RSET, NOOP, QUIT. No STARTTLS, so use SMTP_USE_TLS=false.
+Messages are counted (and kept in memory, or printed with --print).
+
+Run from Backend folder: python -m benchmarks.stub_smtp_server --port 8025
+Then point the app at it:
+    SMTP_HOST=127.0.0.1 SMTP_PORT=8025 SMTP_USER=stub SMTP_PASSWORD=stub SMTP_USE_TLS=false
+"""
+import argparse
+import socketserver
+import threading
+import time
+from typing import Optional
+
+
+class StubSMTPHandler(socketserver.StreamRequestHandler):
+    def _reply(self, line: str) -> None:
+        self.wfile.write(f"{line}\r\n".encode("ascii"))
+        self.wfile.flush()
+
+    def _readline(self) -> Optional[str]:
+        raw = self.rfile.readline(65536)
+        return raw.decode("utf-8", "replace").rstrip("\r\n") if raw else None
+
+    def handle(self) -> None:
+        server: StubSMTPServer = self.server
+        server.count("connections_opened")
+        self._reply("220 stub-smtp ready")
+        recipients: list[str] = []
+        while True:
+            line = self._readline()
+            if line is None:
+                return
+            command = line.split(" ", 1)[0].upper()
+            if command == "EHLO":
+                self.wfile.write(b"250-stub-smtp\r\n250-AUTH PLAIN LOGIN\r\n250 8BITMIME\r\n")
+                self.wfile.flush()
+            elif command == "HELO":
+                self._reply("250 stub-smtp")
+            elif command == "AUTH":
+                parts = line.split()
+                if len(parts) >= 2 and parts[1].upper() == "LOGIN":
+                    # Username and password prompts ("VXNlcm5hbWU6" = "Username:")
+                    if len(parts) == 2:
+                        self._reply("334 VXNlcm5hbWU6")
+                        self._readline()
+                    self._reply("334 UGFzc3dvcmQ6")
+                    self._readline()
+                elif len(parts) == 2:
+                    self._reply("334 ")
+                    self._readline()
+                server.count("logins")
+                self._reply("235 2.7.0 Authentication successful")
+            elif command == "MAIL":
+                recipients = []
+                self._reply("250 OK")
+            elif command == "RCPT":
+                recipients.append(line.split(":", 1)[-1].strip().strip("<>"))
+                self._reply("250 OK")
+            elif command == "DATA":
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                data = []
+                while True:
+                    part = self._readline()
+                    if part is None or part == ".":
+                        break
+                    data.append(part[1:] if part.startswith("..") else part)
+                if server.latency_ms:
+                    time.sleep(server.latency_ms / 1000)
+                server.store(recipients, "\n".join(data))
+                self._reply("250 OK queued")
+            elif command == "RSET":
+                recipients = []
+                self._reply("250 OK")
+            elif command == "NOOP":
+                self._reply("250 OK")
+            elif command == "QUIT":
+                self._reply("221 Bye")
+                return
+            else:
+                self._reply("502 Command not implemented")
+
+
+class StubSMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address: tuple[str, int], latency_ms: float = 0.0, print_messages: bool = False) -> None:
+        super().__init__(address, StubSMTPHandler)
+        self.latency_ms = latency_ms
+        self.print_messages = print_messages
+        self.messages: list[tuple[list[str], str]] = []
+        self.connections_opened = 0
+        self.logins = 0
+        self._lock = threading.Lock()
+
+    def count(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def store(self, recipients: list[str], data: str) -> None:
+        with self._lock:
+            self.messages.append((recipients, data))
+        if self.print_messages:
+            print(f"--- message to {', '.join(recipients)} ---\n{data}\n")
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+
+def start_in_thread(host: str = "127.0.0.1", port: int = 0, latency_ms: float = 0.0) -> StubSMTPServer:
+    """Start a stub SMTP server on a background thread (port 0 = pick a free port)."""
+    server = StubSMTPServer((host, port), latency_ms=latency_ms)
+    threading.Thread(target=server.serve_forever, name="stub-smtp", daemon=True).start()
+    return server
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="SMTP stand-in for local testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8025)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="delay before accepting each message")
+    parser.add_argument("--print", dest="print_messages", action="store_true", help="print received messages")
+    args = parser.parse_args(argv)
+    server = StubSMTPServer((args.host, args.port), latency_ms=args.latency_ms, print_messages=args.print_messages)
+    print(f"Stub SMTP listening on {args.host}:{server.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+In-process caches for get_current_user: verified JWT payloads keyed by token,
+and user rows keyed by id. A repeat request with the same token is then two
+dict lookups instead of an HMAC check plus a SELECT.
+
+Cached users are plain column snapshots; each hit builds a fresh detached User
+so requests never share a mutable ORM object. Anything that changes a user
+(profile, password, role) must call invalidate_user() after committing.
+"""
+import threading
+import time
+from typing import Any, Optional
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import make_transient_to_detached
+
+from core.cache import TTLCache
+from core.config import settings
+from models.user import User
+
+_tokens = TTLCache(settings.AUTH_CACHE_MAX_ENTRIES, settings.AUTH_USER_CACHE_TTL_SECONDS)
+_users = TTLCache(settings.AUTH_CACHE_MAX_ENTRIES, settings.AUTH_USER_CACHE_TTL_SECONDS)
+_stats_lock = threading.Lock()
+_stats = {"token_hits": 0, "token_misses": 0, "user_hits": 0, "user_misses": 0, "invalidations": 0}
+
+
+def _count(name: str) -> None:
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def get_token(token: str) -> Optional[dict[str, Any]]:
+    """Payload of a token verified earlier and not yet expired, or None."""
+    if not settings.AUTH_CACHE_ENABLED:
+        return None
+    payload = _tokens.get(token)
+    _count("token_hits" if payload is not None else "token_misses")
+    return payload
+
+
+def put_token(token: str, payload: dict[str, Any]) -> None:
+    """Remember a verified payload until the token's own exp claim."""
+    if not settings.AUTH_CACHE_ENABLED:
+        return
+    exp = payload.get("exp")
+    ttl = float(exp) - time.time() if exp is not None else settings.AUTH_USER_CACHE_TTL_SECONDS
+    if ttl > 0:
+        _tokens.set(token, payload, ttl_seconds=ttl)
+
+
+def get_user(user_id: int) -> Optional[User]:
+    """Detached copy of a cached user, or None."""
+    if not settings.AUTH_CACHE_ENABLED:
+        return None
+    values = _users.get(user_id)
+    if values is None:
+        _count("user_misses")
+        return None
+    _count("user_hits")
+    user = User(**values)
+    make_transient_to_detached(user)  # db.add()/merge() treat it as the existing row
+    return user
+
+
+def put_user(user: User) -> None:
+    if not settings.AUTH_CACHE_ENABLED:
+        return
+    values = {attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs}
+    _users.set(user.id, values)
+
+
+def invalidate_user(user_id: int) -> None:
+    """Drop the cached user and every cached token issued to them (call after commit)."""
+    _users.delete(user_id)
+    _tokens.delete_where(lambda payload: str(payload.get("sub")) == str(user_id))
+    _count("invalidations")
+
+
+def stats() -> dict[str, Any]:
+    with _stats_lock:
+        data = dict(_stats)
+    data["tokens_cached"] = len(_tokens)
+    data["users_cached"] = len(_users)
+    data["enabled"] = settings.AUTH_CACHE_ENABLED
+    return data
@@ -3,6 +3,7 @@ Application configuration from environment variables.
 Never commit .env; use env.example as template.
 """
 import os
+from pathlib import Path
 from typing import List, Optional
 
 
@@ -21,6 +22,29 @@ class Settings:
             "DATABASE_URL",
             "sqlite:///./publicvoice.db"
         )
+        # API routes on the async engine (aiosqlite / asyncpg). Default: on for PostgreSQL, where
+        # queries wait on the network; off for SQLite, where aiosqlite's thread hop per statement
+        # costs more than it saves and routes run a sync Session on the threadpool instead
+        self.ASYNC_DB: bool = self._to_bool(
+            os.getenv("ASYNC_DB", "true" if self.DATABASE_URL.startswith("postgres") else "false")
+        )
+        # Driver URL for the async engine (ASYNC_DB); derived from DATABASE_URL when empty
+        self.ASYNC_DATABASE_URL: str = os.getenv("ASYNC_DATABASE_URL", "")
+        # Connections per engine (sync and async each have a pool). Async routes can run more
+        # queries at once than the threadpool has threads, so this is their concurrency cap.
+        self.DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+        self.DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+        # SQLite production profile (opt-in): WAL journal, busy_timeout, synchronous=NORMAL and
+        # mmap on every connection, so readers don't block the writer and a briefly locked
+        # database is waited on instead of failing with "database is locked"
+        self.SQLITE_TUNING: bool = self._to_bool(os.getenv("SQLITE_TUNING", "false"))
+        self.SQLITE_BUSY_TIMEOUT_MS: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+        self.SQLITE_MMAP_SIZE_MB: int = int(os.getenv("SQLITE_MMAP_SIZE_MB", "256"))
+        # Group commit: new reports are written by one writer thread that inserts everything
+        # submitted within REPORT_WRITE_MAX_WAIT_MS (up to REPORT_WRITE_BATCH_SIZE) in one transaction
+        self.REPORT_WRITE_BATCHING: bool = self._to_bool(os.getenv("REPORT_WRITE_BATCHING", "false"))
+        self.REPORT_WRITE_BATCH_SIZE: int = int(os.getenv("REPORT_WRITE_BATCH_SIZE", "64"))
+        self.REPORT_WRITE_MAX_WAIT_MS: float = float(os.getenv("REPORT_WRITE_MAX_WAIT_MS", "2"))
 
         # JWT
         self.SECRET_KEY: str = os.getenv(
@@ -31,11 +55,84 @@ class Settings:
         self.ACCESS_TOKEN_EXPIRE_MINUTES: int = int(
             os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
         )
+        # Refresh tokens (rotated on every use) let clients get new access tokens without logging in
+        self.REFRESH_TOKEN_EXPIRE_DAYS: int = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "14"))
+        # Per-process cache of authenticated users and verified tokens (skips a DB query and
+        # the JWT signature check on repeat requests). Changes made by other processes show
+        # up after AUTH_USER_CACHE_TTL_SECONDS at most.
+        self.AUTH_CACHE_ENABLED: bool = self._to_bool(os.getenv("AUTH_CACHE_ENABLED", "true"))
+        self.AUTH_USER_CACHE_TTL_SECONDS: float = float(os.getenv("AUTH_USER_CACHE_TTL_SECONDS", "60"))
+        self.AUTH_CACHE_MAX_ENTRIES: int = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000"))
+        # bcrypt runs in this many worker processes (0 = inline); beyond workers + queue
+        # concurrent password checks, register/login/reset-password answer 503 + Retry-After
+        self.PASSWORD_POOL_WORKERS: int = int(os.getenv("PASSWORD_POOL_WORKERS", "2"))
+        self.PASSWORD_POOL_MAX_QUEUE: int = int(os.getenv("PASSWORD_POOL_MAX_QUEUE", "16"))
+        self.PASSWORD_POOL_TIMEOUT_SECONDS: float = float(os.getenv("PASSWORD_POOL_TIMEOUT_SECONDS", "10"))
 
         # AI / NLP processing (OpenAI or compatible API)
         self.OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "").strip()
         self.OPENAI_API_BASE: Optional[str] = (os.getenv("OPENAI_API_BASE", "").strip() or None)  # e.g. Azure
         self.OPENAI_MODEL: str = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+        # Shared HTTP client (created once at startup, reused for every call)
+        self.OPENAI_TIMEOUT_SECONDS: float = float(os.getenv("OPENAI_TIMEOUT_SECONDS", "60"))
+        self.OPENAI_CONNECT_TIMEOUT_SECONDS: float = float(os.getenv("OPENAI_CONNECT_TIMEOUT_SECONDS", "5"))
+        self.OPENAI_MAX_CONNECTIONS: int = int(os.getenv("OPENAI_MAX_CONNECTIONS", "20"))
+        self.OPENAI_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("OPENAI_MAX_KEEPALIVE_CONNECTIONS", "10"))
+        self.OPENAI_KEEPALIVE_EXPIRY_SECONDS: float = float(os.getenv("OPENAI_KEEPALIVE_EXPIRY_SECONDS", "60"))
+        self.OPENAI_MAX_RETRIES: int = int(os.getenv("OPENAI_MAX_RETRIES", "2"))
+        # Cost control: input trimming, output cap, daily token budget (0 = unlimited)
+        self.AI_MAX_INPUT_CHARS: int = int(os.getenv("AI_MAX_INPUT_CHARS", "4000"))
+        self.AI_MAX_OUTPUT_TOKENS: int = int(os.getenv("AI_MAX_OUTPUT_TOKENS", "1024"))
+        self.AI_DAILY_TOKEN_BUDGET: int = int(os.getenv("AI_DAILY_TOKEN_BUDGET", "0"))
+        # Provider protection for every model call: in-flight cap, deadline, circuit breaker
+        self.AI_MAX_CONCURRENCY: int = int(os.getenv("AI_MAX_CONCURRENCY", "8"))
+        self.AI_CALL_DEADLINE_SECONDS: float = float(os.getenv("AI_CALL_DEADLINE_SECONDS", "30"))
+        self.AI_BREAKER_FAILURE_THRESHOLD: int = int(os.getenv("AI_BREAKER_FAILURE_THRESHOLD", "5"))
+        self.AI_BREAKER_RESET_SECONDS: float = float(os.getenv("AI_BREAKER_RESET_SECONDS", "30"))
+
+        # Background AI queue (reports are structured off the request path)
+        self.AI_WORKERS: int = int(os.getenv("AI_WORKERS", "2"))
+        self.AI_JOB_MAX_ATTEMPTS: int = int(os.getenv("AI_JOB_MAX_ATTEMPTS", "5"))
+        self.AI_JOB_RETRY_BASE_SECONDS: float = float(os.getenv("AI_JOB_RETRY_BASE_SECONDS", "10"))
+        self.AI_JOB_POLL_SECONDS: float = float(os.getenv("AI_JOB_POLL_SECONDS", "2"))
+        self.AI_JOB_LEASE_SECONDS: int = int(os.getenv("AI_JOB_LEASE_SECONDS", "300"))
+        # Batch mode: several reports per chat completion when a backlog builds up
+        self.AI_BATCH_SIZE: int = int(os.getenv("AI_BATCH_SIZE", "8"))
+        self.AI_BATCH_MAX_INPUT_TOKENS: int = int(os.getenv("AI_BATCH_MAX_INPUT_TOKENS", "6000"))
+        self.AI_BATCH_MAX_OUTPUT_TOKENS: int = int(os.getenv("AI_BATCH_MAX_OUTPUT_TOKENS", "4096"))
+
+        # Local classifier: skip the LLM for obvious, already-formal English reports
+        self.AI_LOCAL_CLASSIFIER_ENABLED: bool = self._to_bool(os.getenv("AI_LOCAL_CLASSIFIER_ENABLED", "true"))
+        self.AI_LOCAL_MIN_CONFIDENCE: float = float(os.getenv("AI_LOCAL_MIN_CONFIDENCE", "0.8"))
+        self.AI_LOCAL_MAX_CHARS: int = int(os.getenv("AI_LOCAL_MAX_CHARS", "600"))
+        self.AI_CLASSIFIER_PATH: str = os.getenv(
+            "AI_CLASSIFIER_PATH",
+            str(Path(__file__).resolve().parent.parent / "data" / "classifier.json"),
+        )
+
+        # AI result cache (in-process LRU + ai_cache table)
+        self.AI_CACHE_ENABLED: bool = self._to_bool(os.getenv("AI_CACHE_ENABLED", "true"))
+        self.AI_CACHE_MAX_ENTRIES: int = int(os.getenv("AI_CACHE_MAX_ENTRIES", "2048"))
+        self.AI_CACHE_TTL_SECONDS: int = int(os.getenv("AI_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+
+        # Near-duplicate detection (MinHash signatures in reports.minhash, LSH buckets in
+        # report_dedup_buckets); changing bands, rows or shingle size needs scripts/rebuild_dedup_index --all
+        self.DEDUP_ENABLED: bool = self._to_bool(os.getenv("DEDUP_ENABLED", "true"))
+        self.DEDUP_BANDS: int = int(os.getenv("DEDUP_BANDS", "10"))
+        self.DEDUP_ROWS: int = int(os.getenv("DEDUP_ROWS", "3"))
+        self.DEDUP_SHINGLE_SIZE: int = int(os.getenv("DEDUP_SHINGLE_SIZE", "2"))
+        # Share of MinHash values a candidate must agree on (estimated Jaccard similarity)
+        self.DEDUP_THRESHOLD: float = float(os.getenv("DEDUP_THRESHOLD", "0.5"))
+
+        # Report export (GET /api/reports/export): rows per fetch from the server-side cursor,
+        # i.e. the most rows held in memory at once, however large the export
+        self.EXPORT_BATCH_SIZE: int = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+        # Bulk ingest (POST /api/reports/bulk): body size and rows per request, rows per transaction,
+        # and how long their AI jobs wait so reports submitted live are structured first
+        self.BULK_INGEST_MAX_BYTES: int = int(os.getenv("BULK_INGEST_MAX_BYTES", str(50 * 1024 * 1024)))
+        self.BULK_INGEST_MAX_ROWS: int = int(os.getenv("BULK_INGEST_MAX_ROWS", "50000"))
+        self.BULK_INGEST_CHUNK_SIZE: int = int(os.getenv("BULK_INGEST_CHUNK_SIZE", "1000"))
+        self.BULK_AI_DEFER_SECONDS: float = float(os.getenv("BULK_AI_DEFER_SECONDS", "60"))
 
         # Security check
         if self.ENVIRONMENT == "production" and self.SECRET_KEY.startswith("change-me"):
@@ -59,12 +156,40 @@ class Settings:
         self.SMTP_PASSWORD: str = os.getenv("SMTP_PASSWORD", "").strip()
         self.SMTP_FROM_EMAIL: str = os.getenv("SMTP_FROM_EMAIL", self.SMTP_USER or "noreply@publicvoice.rw").strip()
         self.SMTP_USE_TLS: bool = self._to_bool(os.getenv("SMTP_USE_TLS", "true"))
+        self.SMTP_TIMEOUT_SECONDS: float = float(os.getenv("SMTP_TIMEOUT_SECONDS", "20"))
+        # Background sender for the email_outbox table: one SMTP session reused across messages,
+        # closed after SMTP_IDLE_SECONDS without mail; failed sends retry with exponential backoff
+        self.SMTP_IDLE_SECONDS: float = float(os.getenv("SMTP_IDLE_SECONDS", "60"))
+        self.EMAIL_BATCH_SIZE: int = int(os.getenv("EMAIL_BATCH_SIZE", "20"))
+        self.EMAIL_MAX_ATTEMPTS: int = int(os.getenv("EMAIL_MAX_ATTEMPTS", "5"))
+        self.EMAIL_RETRY_BASE_SECONDS: float = float(os.getenv("EMAIL_RETRY_BASE_SECONDS", "30"))
+        self.EMAIL_POLL_SECONDS: float = float(os.getenv("EMAIL_POLL_SECONDS", "5"))
+        # How long a claimed email is reserved; renewed before each send, so it only has to
+        # cover one message (connect, STARTTLS, login and send: a few SMTP_TIMEOUT_SECONDS)
+        self.EMAIL_LEASE_SECONDS: float = float(os.getenv("EMAIL_LEASE_SECONDS", "120"))
+        # Sent and failed emails are deleted after this long (their bodies hold password-reset links)
+        self.EMAIL_SENT_RETENTION_SECONDS: float = float(os.getenv("EMAIL_SENT_RETENTION_SECONDS", str(24 * 3600)))
+        self.EMAIL_FAILED_RETENTION_SECONDS: float = float(os.getenv("EMAIL_FAILED_RETENTION_SECONDS", str(7 * 24 * 3600)))
+        # Citizens get one digest email per NOTIFY_DIGEST_WINDOW_SECONDS for status/response changes
+        self.NOTIFY_STATUS_CHANGES: bool = self._to_bool(os.getenv("NOTIFY_STATUS_CHANGES", "true"))
+        self.NOTIFY_DIGEST_WINDOW_SECONDS: float = float(os.getenv("NOTIFY_DIGEST_WINDOW_SECONDS", "300"))
+        self.NOTIFY_MAX_USERS_PER_RUN: int = int(os.getenv("NOTIFY_MAX_USERS_PER_RUN", "500"))
 
     @property
     def email_configured(self) -> bool:
         """True if SMTP is configured so we can send password-reset emails."""
         return bool(self.SMTP_HOST and self.SMTP_USER and self.SMTP_PASSWORD)
 
+    @property
+    def notifications_enabled(self) -> bool:
+        """True if report status changes should be emailed to citizens."""
+        return self.NOTIFY_STATUS_CHANGES and self.email_configured
+
+    @property
+    def ai_enabled(self) -> bool:
+        """True if an OpenAI (or compatible) API key is configured."""
+        return bool(self.OPENAI_API_KEY)
+
     def _to_bool(self, value: str) -> bool:
         return value.lower() in ("true", "1", "yes")
 
@@ -5,21 +5,26 @@ from typing import Annotated
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from core import auth_cache, refresh_tokens
 from core.security import decode_access_token
-from models.base import get_db
+from models.base import get_async_db
 from models.user import User
 
 # Bearer token in Authorization header
 security = HTTPBearer(auto_error=False)
 
 
-def get_current_user(
-    db: Annotated[Session, Depends(get_db)],
+async def get_current_user(
+    db: Annotated[AsyncSession, Depends(get_async_db)],
     credentials: Annotated[HTTPAuthorizationCredentials | None, Depends(security)],
 ) -> User:
-    """Require valid JWT and return the authenticated user."""
+    """
+    Require valid JWT and return the authenticated user. Tokens and users seen
+    recently come from core.auth_cache (a detached User); otherwise the token is
+    verified and the user loaded from the database.
+    """
     if not credentials:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -27,12 +32,21 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    payload = decode_access_token(credentials.credentials)
-
+    token = credentials.credentials
+    payload = auth_cache.get_token(token)
     if payload is None:
+        payload = decode_access_token(token)
+        if payload is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid or expired token",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        auth_cache.put_token(token, payload)
+    if refresh_tokens.is_revoked(payload.get("sid")):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or expired token",
+            detail="Session has been revoked",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
@@ -44,18 +58,21 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    user = auth_cache.get_user(int(user_id))
+    if user is not None:
+        return user
+    user = await db.get(User, int(user_id))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
             headers={"WWW-Authenticate": "Bearer"},
         )
-
+    auth_cache.put_user(user)
     return user
 
 
-def get_current_admin(
+async def get_current_admin(
     current_user: Annotated[User, Depends(get_current_user)],
 ) -> User:
     """Require authenticated user to be an Admin."""
@@ -1,19 +1,24 @@
 """
 Send emails (e.g. password reset link) via SMTP.
 Uses Python standard library only; no extra dependencies.
+
+Requests don't send mail themselves: they add a row to the email outbox
+(services.email_outbox) and a background sender delivers it over one
+SMTPConnection that stays logged in between messages.
 """
+import html
 import smtplib
+import socket
+import time
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
+from typing import Optional
 
 from core.config import settings
 
 
-def send_password_reset_email(to_email: str, reset_link: str) -> None:
-    """
-    Send an email with the password reset link.
-    Raises on failure; caller should catch and log or return generic message.
-    """
+def password_reset_email(reset_link: str) -> tuple[str, str, str]:
+    """(subject, text body, html body) for the password reset link email."""
     app_name = settings.APP_NAME
     subject = f"{app_name} – Reset your password"
     html_body = f"""
@@ -30,18 +35,118 @@ def send_password_reset_email(to_email: str, reset_link: str) -> None:
     If you didn't request this, you can ignore this email.
     — {app_name}
     """
+    return subject, text_body.strip(), html_body.strip()
+
+
+def report_updates_email(full_name: str, updates: list[dict]) -> tuple[str, str, str]:
+    """
+    (subject, text body, html body) for a digest of report updates.
+    updates: dicts with title, status and admin_response (may be None), one per report.
+    """
+    app_name = settings.APP_NAME
+    count = len(updates)
+    subject = f"{app_name} – Update on your report" if count == 1 else f"{app_name} – Updates on {count} of your reports"
+    reports_link = f"{settings.FRONTEND_URL}/dashboard"
+
+    text_lines = [f"Hello {full_name},", "", "There are updates on your reports:", ""]
+    html_items = []
+    for update in updates:
+        text_lines.append(f"- {update['title']}: {update['status']}")
+        item = f"<strong>{html.escape(update['title'])}</strong>: {html.escape(update['status'])}"
+        if update.get("admin_response"):
+            text_lines.append(f"  Response: {update['admin_response']}")
+            item += f"<br><em>Response:</em> {html.escape(update['admin_response'])}"
+        html_items.append(f"<li>{item}</li>")
+    text_lines += ["", f"See all your reports: {reports_link}", f"— {app_name}"]
+
+    html_body = f"""
+    <p>Hello {html.escape(full_name)},</p>
+    <p>There are updates on your reports:</p>
+    <ul>{"".join(html_items)}</ul>
+    <p><a href="{reports_link}" style="color: #004C97;">See all your reports</a></p>
+    <p>— {app_name}</p>
+    """
+    return subject, "\n".join(text_lines), html_body.strip()
+
 
+def build_message(to_email: str, subject: str, text_body: str, html_body: Optional[str] = None) -> MIMEMultipart:
     msg = MIMEMultipart("alternative")
     msg["Subject"] = subject
     msg["From"] = settings.SMTP_FROM_EMAIL
     msg["To"] = to_email
-    msg.attach(MIMEText(text_body.strip(), "plain"))
-    msg.attach(MIMEText(html_body.strip(), "html"))
-
-    use_tls = settings.SMTP_USE_TLS
-    port = settings.SMTP_PORT
-    with smtplib.SMTP(settings.SMTP_HOST, port) as server:
-        if use_tls:
-            server.starttls()
-        server.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
-        server.sendmail(settings.SMTP_FROM_EMAIL, [to_email], msg.as_string())
+    msg.attach(MIMEText(text_body, "plain"))
+    if html_body:
+        msg.attach(MIMEText(html_body, "html"))
+    return msg
+
+
+class SMTPConnection:
+    """
+    One authenticated SMTP session reused across messages. Connects (STARTTLS,
+    login) on first use, drops the session after SMTP_IDLE_SECONDS unused, and
+    reconnects once if the server closed it in between. Not thread-safe: one
+    per sender thread.
+    """
+
+    def __init__(self) -> None:
+        self._smtp: Optional[smtplib.SMTP] = None
+        self._last_used = 0.0
+        self.connections_opened = 0
+        self.messages_sent = 0
+
+    @property
+    def connected(self) -> bool:
+        return self._smtp is not None
+
+    def _connect(self) -> None:
+        smtp = smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT, timeout=settings.SMTP_TIMEOUT_SECONDS)
+        try:
+            if settings.SMTP_USE_TLS:
+                smtp.starttls()
+            if settings.SMTP_USER:
+                smtp.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
+        except Exception:
+            smtp.close()
+            raise
+        self._smtp = smtp
+        self.connections_opened += 1
+
+    def close(self) -> None:
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                self._smtp.close()
+            self._smtp = None
+
+    def close_if_idle(self) -> None:
+        if self._smtp is not None and time.monotonic() - self._last_used > settings.SMTP_IDLE_SECONDS:
+            self.close()
+
+    def send(self, msg: MIMEMultipart) -> None:
+        """Send one message; raises smtplib/socket errors for the caller to retry."""
+        self.close_if_idle()
+        if self._smtp is None:
+            self._connect()
+        try:
+            self._smtp.sendmail(settings.SMTP_FROM_EMAIL, [msg["To"]], msg.as_string())
+        except (smtplib.SMTPServerDisconnected, ConnectionError, socket.timeout):
+            # Server dropped the idle session: reconnect once and retry
+            self.close()
+            self._connect()
+            self._smtp.sendmail(settings.SMTP_FROM_EMAIL, [msg["To"]], msg.as_string())
+        self._last_used = time.monotonic()
+        self.messages_sent += 1
+
+
+def send_password_reset_email(to_email: str, reset_link: str) -> None:
+    """
+    Send an email with the password reset link right away, on its own connection.
+    Raises on failure. The API queues this email in the outbox instead; this is for scripts.
+    """
+    subject, text_body, html_body = password_reset_email(reset_link)
+    connection = SMTPConnection()
+    try:
+        connection.send(build_message(to_email, subject, text_body, html_body))
+    finally:
+        connection.close()
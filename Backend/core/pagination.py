@@ -0,0 +1,138 @@
+"""
+Keyset (cursor) pagination for list endpoints ordered by (created_at, id) desc.
+
+A cursor is an opaque URL-safe string holding the (created_at, id) of the last
+row of a page. The next page is "rows before that key", which the composite
+(…, created_at, id) indexes answer by seeking, so page 1000 costs the same as
+page 1, unlike OFFSET which reads and discards every skipped row.
+
+The cursor keeps created_at exactly as the database stores it: on SQLite that
+is text ("YYYY-MM-DD HH:MM:SS" from CURRENT_TIMESTAMP) and comparing it with a
+re-formatted Python datetime would not match rows from the same second.
+
+List endpoints return the next cursor in the X-Next-Cursor header (absent on
+the last page) and, when asked for, the row count in X-Total-Count, so the
+response body stays a plain list.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, Optional
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import String, literal, text, tuple_, type_coerce
+from sqlalchemy.orm import Query, Session
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_COUNT_HEADER = "X-Total-Count"
+TOTAL_ESTIMATED_HEADER = "X-Total-Count-Estimated"
+EXPOSED_HEADERS = [NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER, TOTAL_ESTIMATED_HEADER]
+
+
+def _dialect(db: Session) -> str:
+    return db.get_bind().dialect.name
+
+
+def _is_sqlite(db: Session) -> bool:
+    return _dialect(db) == "sqlite"
+
+
+def invalid_cursor() -> HTTPException:
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def encode_cursor(key: Any, row_id: int) -> str:
+    """Cursor for the row with sort key `key` (created_at, or a search score) and id."""
+    if isinstance(key, datetime):
+        key = key.isoformat()
+    elif not isinstance(key, (int, float)):
+        key = str(key)
+    raw = json.dumps([key, row_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, key_type: type = str) -> tuple[Any, int]:
+    """(key, id) from a cursor; 400 if it wasn't produced by encode_cursor with that key type."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        key, row_id = json.loads(raw)
+    except (ValueError, TypeError):
+        raise invalid_cursor()
+    if key_type is float and isinstance(key, int) and not isinstance(key, bool):
+        key = float(key)
+    if not isinstance(key, key_type) or not isinstance(row_id, int) or isinstance(row_id, bool):
+        raise invalid_cursor()
+    return key, row_id
+
+
+def after_cursor(db: Session, query: Query, created_col, id_col, cursor: str) -> Query:
+    """Rows that come after the cursor in (created_at desc, id desc) order."""
+    created_at, row_id = decode_cursor(cursor)
+    if _is_sqlite(db):
+        key = literal(created_at, String())
+    else:
+        try:
+            key = literal(datetime.fromisoformat(created_at), created_col.type)
+        except ValueError:
+            raise invalid_cursor()
+    return query.filter(tuple_(created_col, id_col) < tuple_(key, literal(row_id)))
+
+
+def _cursor_for(db: Session, row: Any, created_col, id_col) -> str:
+    if _is_sqlite(db):
+        # Stored text, not the parsed datetime (see module docstring); one primary key lookup
+        stored = db.query(type_coerce(created_col, String())).filter(id_col == row.id).scalar()
+        return encode_cursor(stored, row.id)
+    return encode_cursor(row.created_at, row.id)
+
+
+def paginate(
+    db: Session,
+    query: Query,
+    created_col,
+    id_col,
+    limit: int,
+    skip: int = 0,
+    cursor: Optional[str] = None,
+) -> tuple[list, Optional[str]]:
+    """
+    One page of `query` (already ordered by created_at desc, id desc) and the
+    cursor for the next page, or None on the last page. With a cursor, skip is
+    ignored; without one, skip/limit work as before.
+    """
+    if cursor:
+        query = after_cursor(db, query, created_col, id_col, cursor)
+    elif skip:
+        query = query.offset(skip)
+    rows = query.limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, _cursor_for(db, rows[-1], created_col, id_col)
+
+
+def count_rows(db: Session, query: Query) -> tuple[int, bool]:
+    """
+    (row count, estimated) for the unpaginated query. On PostgreSQL this is the
+    planner's estimate from table statistics (no scan, so it costs the same at
+    any size); elsewhere it is an exact COUNT(*).
+    """
+    query = query.order_by(None)
+    if _dialect(db) != "postgresql":
+        return query.count(), False
+    statement = query.statement.compile(dialect=db.get_bind().dialect, compile_kwargs={"literal_binds": True})
+    plan = db.execute(text(f"EXPLAIN (FORMAT JSON) {statement}")).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"]), True
+
+
+def set_page_headers(
+    response: Response, next_cursor: Optional[str], total: Optional[tuple[int, bool]] = None
+) -> None:
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    if total is not None:
+        count, estimated = total
+        response.headers[TOTAL_COUNT_HEADER] = str(count)
+        response.headers[TOTAL_ESTIMATED_HEADER] = "true" if estimated else "false"
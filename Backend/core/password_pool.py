@@ -0,0 +1,241 @@
+"""
+bcrypt hashing/verification on a bounded process pool.
+
+bcrypt at 12 rounds takes ~0.25 s of CPU per call. Run inline in sync
+endpoints, a login storm fills the shared threadpool and competes for the GIL,
+slowing every other endpoint. Here the work runs in PASSWORD_POOL_WORKERS
+separate processes; at most workers + PASSWORD_POOL_MAX_QUEUE calls may be in
+flight, and anything beyond that is rejected right away with 503 + Retry-After
+instead of queueing behind the storm.
+
+Without a started pool (scripts, PASSWORD_POOL_WORKERS=0) calls run inline;
+the *_async variants used by async endpoints run them on a thread instead,
+so the event loop never blocks on bcrypt.
+"""
+import asyncio
+import logging
+import math
+import multiprocessing
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+from fastapi import HTTPException, status
+from starlette.concurrency import run_in_threadpool
+
+from core import security
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _warm_up() -> bool:
+    """Load the bcrypt backend in a worker so the first real call isn't slower."""
+    security.pwd_context.hash("warm-up")
+    return True
+
+
+class PasswordPool:
+    """ProcessPoolExecutor plus an in-flight limit and latency counters."""
+
+    def __init__(self, workers: int, max_queue: int, timeout_seconds: float) -> None:
+        self.workers = max(1, workers)
+        self.limit = self.workers + max(0, max_queue)
+        self.timeout_seconds = timeout_seconds
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._restart_lock = threading.Lock()
+        self._in_flight = 0
+        self._latencies: deque[float] = deque(maxlen=1000)
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.restarts = 0
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        # spawn, not fork: the API process already runs threads (AI workers, email sender)
+        executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        for _ in range(self.workers):
+            executor.submit(_warm_up)
+        return executor
+
+    def start(self) -> None:
+        self._executor = self._new_executor()
+        logger.info("Password pool: started %s worker process(es)", self.workers)
+
+    def stop(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _retry_after(self) -> int:
+        """Seconds until the current backlog should have drained."""
+        avg = sum(self._latencies) / len(self._latencies) if self._latencies else 0.3
+        return max(1, math.ceil(avg * self._in_flight / self.workers))
+
+    def _busy(self) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many sign-in requests right now. Please try again shortly.",
+            headers={"Retry-After": str(self._retry_after())},
+        )
+
+    def _admit(self) -> float:
+        with self._lock:
+            if self._in_flight >= self.limit:
+                self.rejected += 1
+                raise self._busy()
+            self._in_flight += 1
+        return time.perf_counter()
+
+    def _release(self, start: float) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self._latencies.append(time.perf_counter() - start)
+            self.completed += 1
+
+    def _timed_out(self) -> HTTPException:
+        with self._lock:
+            self.timeouts += 1
+        return self._busy()
+
+    def _restart(self, failed: ProcessPoolExecutor) -> None:
+        """Replace a broken executor, once: callers that saw the same failure find it already replaced."""
+        with self._restart_lock:
+            if self._executor is not failed:
+                return
+            logger.error("Password pool worker died; restarting the pool")
+            failed.shutdown(wait=False, cancel_futures=True)
+            self._executor = self._new_executor()
+            self.restarts += 1
+
+    def _submit(self, executor: ProcessPoolExecutor, fn: Callable[..., Any], args: tuple, start: float) -> Future:
+        """Submit an admitted call. Its slot is freed when the worker is done, even if the caller stops waiting."""
+        try:
+            future = executor.submit(fn, *args)
+        except RuntimeError as e:
+            # Executor shut down by a concurrent restart or stop
+            self._release(start)
+            raise BrokenProcessPool(str(e)) from e
+        except BaseException:
+            self._release(start)
+            raise
+        future.add_done_callback(lambda _: self._release(start))
+        return future
+
+    def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run fn(*args) in a worker process, or raise 503 if the pool is saturated."""
+        start = self._admit()
+        executor = self._executor
+        if executor is None:
+            try:
+                return fn(*args)
+            finally:
+                self._release(start)
+        try:
+            return self._submit(executor, fn, args, start).result(timeout=self.timeout_seconds)
+        except FutureTimeout:
+            raise self._timed_out()
+        except BrokenProcessPool:
+            self._restart(executor)
+            raise self._busy()
+
+    async def run_async(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Like run(), but awaits the worker instead of blocking the event loop."""
+        start = self._admit()
+        executor = self._executor
+        if executor is None:
+            try:
+                return await run_in_threadpool(fn, *args)
+            finally:
+                self._release(start)
+        try:
+            future = asyncio.wrap_future(self._submit(executor, fn, args, start))
+            return await asyncio.wait_for(future, timeout=self.timeout_seconds)
+        except asyncio.TimeoutError:
+            raise self._timed_out()
+        except BrokenProcessPool:
+            # Spawning the new worker processes blocks; keep it off the event loop
+            await run_in_threadpool(self._restart, executor)
+            raise self._busy()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            recent = sorted(self._latencies)
+            in_flight = self._in_flight
+
+        def pct(p: float) -> Optional[float]:
+            return round(recent[min(len(recent) - 1, int(p * len(recent)))], 4) if recent else None
+
+        return {
+            "workers": self.workers,
+            "max_in_flight": self.limit,
+            "in_flight": in_flight,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+            "restarts": self.restarts,
+            "latency_p50_seconds": pct(0.50),
+            "latency_p95_seconds": pct(0.95),
+            "latency_max_seconds": round(recent[-1], 4) if recent else None,
+        }
+
+
+_pool: Optional[PasswordPool] = None
+
+
+def start_pool() -> None:
+    """Start the process-wide pool (called from app lifespan)."""
+    global _pool
+    if _pool is None and settings.PASSWORD_POOL_WORKERS > 0:
+        _pool = PasswordPool(
+            settings.PASSWORD_POOL_WORKERS,
+            settings.PASSWORD_POOL_MAX_QUEUE,
+            settings.PASSWORD_POOL_TIMEOUT_SECONDS,
+        )
+        _pool.start()
+
+
+def stop_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.stop()
+        _pool = None
+
+
+def hash_password(plain_password: str) -> str:
+    """security.hash_password on the pool (inline if no pool is running)."""
+    if _pool is None:
+        return security.hash_password(plain_password)
+    return _pool.run(security.hash_password, plain_password)
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """security.verify_password on the pool (inline if no pool is running)."""
+    if _pool is None:
+        return security.verify_password(plain_password, hashed_password)
+    return _pool.run(security.verify_password, plain_password, hashed_password)
+
+
+async def hash_password_async(plain_password: str) -> str:
+    """hash_password for async endpoints."""
+    if _pool is None:
+        return await run_in_threadpool(security.hash_password, plain_password)
+    return await _pool.run_async(security.hash_password, plain_password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password for async endpoints."""
+    if _pool is None:
+        return await run_in_threadpool(security.verify_password, plain_password, hashed_password)
+    return await _pool.run_async(security.verify_password, plain_password, hashed_password)
+
+
+def stats() -> dict[str, Any]:
+    if _pool is None:
+        return {"workers": 0, "inline": True}
+    return _pool.stats()
@@ -0,0 +1,205 @@
+"""
+Rotating refresh tokens.
+
+Login opens a refresh session (a refresh_tokens row) and returns a refresh JWT
+carrying its id ("sid") and generation ("gen"). /api/auth/refresh swaps it for
+a new access token and the next generation with one conditional UPDATE: no
+SELECT and no bcrypt. If the UPDATE matches nothing, the token was already
+used (replay, e.g. a stolen copy) or the session was revoked, so the session
+is revoked as a whole.
+
+Revoked session ids are also kept in memory (loaded at startup, added on
+revoke), so replays and access tokens from logged-out sessions are rejected
+without touching the database. Each entry lives until the session's expiry,
+after which no token of the session verifies anyway: is_revoked drops the
+expired entry it finds and revocations sweep the rest every
+_PRUNE_INTERVAL_SECONDS. Other processes learn about a revocation from
+the table on the next refresh; their access tokens for it expire on their own.
+"""
+import logging
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import delete, update
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from core.security import create_refresh_token, decode_refresh_token
+from models.base import SessionLocal
+from models.refresh_token import RefreshToken
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+# Revoked session id -> epoch seconds after which none of its tokens verify
+_revoked: dict[str, float] = {}
+_PRUNE_INTERVAL_SECONDS = 3600
+_last_prune = 0.0
+_stats = {"issued": 0, "refreshed": 0, "rejected_in_memory": 0, "replays": 0, "revoked": 0}
+
+
+def _count(name: str, n: int = 1) -> None:
+    with _lock:
+        _stats[name] += n
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _unauthorized(detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def is_revoked(session_id: Optional[str]) -> bool:
+    """True if this process knows the session was revoked (memory only)."""
+    if session_id is None:
+        return False
+    expires = _revoked.get(session_id)
+    if expires is None:
+        return False
+    if expires > time.time():
+        return True
+    with _lock:
+        _revoked.pop(session_id, None)
+    return False
+
+
+def _revoked_until(expires_at: Optional[datetime]) -> float:
+    """
+    When a revoked session's entry can go: its refresh expiry, and no sooner
+    than the access tokens issued up to now. Without a known expiry (row
+    already revoked), the longest a refresh token issued up to now can live.
+    """
+    now = time.time()
+    if expires_at is None:
+        return now + settings.REFRESH_TOKEN_EXPIRE_DAYS * 86400
+    if expires_at.tzinfo is None:  # SQLite returns naive UTC
+        expires_at = expires_at.replace(tzinfo=timezone.utc)
+    return max(expires_at.timestamp(), now + settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+
+
+def _mark_revoked(sessions: dict[str, Optional[datetime]], count: bool = True) -> None:
+    global _last_prune
+    entries = {session_id: _revoked_until(expires_at) for session_id, expires_at in sessions.items()}
+    now = time.time()
+    with _lock:
+        _revoked.update(entries)
+        if count:
+            _stats["revoked"] += len(entries)
+        if now - _last_prune >= _PRUNE_INTERVAL_SECONDS:
+            _last_prune = now
+            for session_id in [sid for sid, expires in _revoked.items() if expires <= now]:
+                del _revoked[session_id]
+
+
+def load_revoked() -> None:
+    """Startup: drop expired sessions and load unexpired revoked ones into memory."""
+    db = SessionLocal()
+    try:
+        db.execute(delete(RefreshToken).where(RefreshToken.expires_at < _now()))
+        db.commit()
+        sessions = {
+            row.id: row.expires_at
+            for row in db.query(RefreshToken.id, RefreshToken.expires_at).filter(RefreshToken.revoked_at.isnot(None))
+        }
+    finally:
+        db.close()
+    _mark_revoked(sessions, count=False)
+    logger.info("Refresh tokens: %s revoked session(s) loaded", len(sessions))
+
+
+def issue(db: Session, user_id: int) -> tuple[str, str]:
+    """Open a refresh session. Returns (session id, refresh token). Caller commits."""
+    session_id = uuid.uuid4().hex
+    expires_at = _now() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    db.add(RefreshToken(id=session_id, user_id=user_id, generation=0, expires_at=expires_at))
+    _count("issued")
+    return session_id, create_refresh_token(user_id, session_id, 0, expires_at)
+
+
+def rotate(db: Session, token: str) -> tuple[int, str, str]:
+    """
+    Exchange a refresh token for the next generation.
+    Returns (user id, session id, new refresh token); raises 401 otherwise.
+    """
+    payload = decode_refresh_token(token)
+    if payload is None:
+        raise _unauthorized("Invalid or expired refresh token")
+    session_id, generation, user_id = payload.get("sid"), payload.get("gen"), payload.get("sub")
+    if not session_id or generation is None or not user_id:
+        raise _unauthorized("Invalid token payload")
+    if is_revoked(session_id):
+        _count("rejected_in_memory")
+        raise _unauthorized("Session has been revoked")
+
+    expires_at = _now() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    rotated = db.execute(
+        update(RefreshToken)
+        .where(
+            RefreshToken.id == session_id,
+            RefreshToken.generation == generation,
+            RefreshToken.revoked_at.is_(None),
+        )
+        .values(generation=generation + 1, expires_at=expires_at)
+    ).rowcount
+    if not rotated:
+        # Old generation replayed, or revoked by another process: end the session everywhere
+        expires_at = db.execute(
+            update(RefreshToken)
+            .where(RefreshToken.id == session_id, RefreshToken.revoked_at.is_(None))
+            .values(revoked_at=_now())
+            .returning(RefreshToken.expires_at)
+        ).scalar()
+        db.commit()
+        _mark_revoked({session_id: expires_at})
+        _count("replays")
+        logger.warning("Refresh token reuse or revoked session %s (user %s)", session_id, user_id)
+        raise _unauthorized("Session has been revoked")
+    db.commit()
+    _count("refreshed")
+    return int(user_id), session_id, create_refresh_token(user_id, session_id, generation + 1, expires_at)
+
+
+def revoke(db: Session, token: str) -> None:
+    """Revoke the session of a refresh token (logout). Invalid tokens are ignored. Caller commits."""
+    payload = decode_refresh_token(token)
+    session_id = payload.get("sid") if payload else None
+    if not session_id:
+        return
+    expires_at = db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.id == session_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=_now())
+        .returning(RefreshToken.expires_at)
+    ).scalar()
+    _mark_revoked({session_id: expires_at})
+
+
+def revoke_user(db: Session, user_id: int) -> int:
+    """Revoke all of a user's sessions (logout everywhere, password reset). Caller commits."""
+    sessions = {
+        row.id: row.expires_at
+        for row in db.query(RefreshToken.id, RefreshToken.expires_at).filter(
+            RefreshToken.user_id == user_id, RefreshToken.revoked_at.is_(None)
+        )
+    }
+    if sessions:
+        db.execute(update(RefreshToken).where(RefreshToken.id.in_(list(sessions))).values(revoked_at=_now()))
+        _mark_revoked(sessions)
+    return len(sessions)
+
+
+def stats() -> dict[str, Any]:
+    with _lock:
+        data = dict(_stats)
+        data["revoked_in_memory"] = len(_revoked)
+    return data
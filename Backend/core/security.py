@@ -46,18 +46,40 @@ def create_access_token(
     )
 
 
-def decode_access_token(token: str) -> dict[str, Any] | None:
-    """Decode and validate JWT. Returns payload or None if invalid."""
+def create_refresh_token(subject: str | int, session_id: str, generation: int, expires_at: datetime) -> str:
+    """Create a JWT refresh token for one generation of a refresh session."""
+    to_encode = {
+        "sub": str(subject),
+        "sid": session_id,
+        "gen": generation,
+        "exp": expires_at,
+        "iat": datetime.now(timezone.utc),
+        "type": "refresh",
+    }
+    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+
+def _decode_token(token: str, token_type: str) -> dict[str, Any] | None:
     try:
         payload = jwt.decode(
             token,
             settings.SECRET_KEY,
             algorithms=[settings.ALGORITHM],
         )
-        if payload.get("type") != "access":
+        if payload.get("type") != token_type:
             return None
         return payload
     except JWTError as e:
         # Optional: log JWT errors for debugging
         print("JWT decode error:", e)
         return None
+
+
+def decode_access_token(token: str) -> dict[str, Any] | None:
+    """Decode and validate JWT. Returns payload or None if invalid."""
+    return _decode_token(token, "access")
+
+
+def decode_refresh_token(token: str) -> dict[str, Any] | None:
+    """Decode and validate a refresh JWT. Returns payload or None if invalid."""
+    return _decode_token(token, "refresh")
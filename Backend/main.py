@@ -16,21 +16,43 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
 
+from core import password_pool, refresh_tokens
 from core.config import settings
-from models.base import init_db
-from routers import auth, reports, users
+from core.pagination import EXPOSED_HEADERS
+from models.base import dispose_async_engine, init_db
+from routers import auth, metrics, reports, users
+from services import ai_processor, ai_queue, email_outbox, notifications, report_stats, report_writer
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Create DB tables on startup; log AI/NLP status."""
+    """Create DB tables on startup; log AI/NLP status and start the AI queue workers and email sender."""
     init_db()
-    if getattr(settings, "OPENAI_API_KEY", None) and settings.OPENAI_API_KEY.strip():
+    refresh_tokens.load_revoked()
+    report_stats.ensure_built()
+    password_pool.start_pool()
+    if settings.REPORT_WRITE_BATCHING:
+        report_writer.start_writer()
+    if settings.email_configured:
+        email_outbox.start_sender()
+    if settings.notifications_enabled:
+        notifications.start_worker()
+    if settings.ai_enabled:
         logger.info("AI/NLP enabled: citizen reports will be translated, rewritten formally, and structured (set OPENAI_API_KEY in .env).")
+        ai_processor.init_client()
+        ai_queue.start_workers()
     else:
         logger.info("AI/NLP disabled: set OPENAI_API_KEY in .env to enable (Kinyarwanda → English, formal rewriting, structuring).")
     yield
-    # shutdown: nothing to close for SQLite/PSQL with current setup
+    # shutdown: write reports already accepted, then let AI workers finish their current job;
+    # queued jobs stay in the table
+    report_writer.stop_writer()
+    ai_queue.stop_workers()
+    ai_processor.close_client()
+    password_pool.stop_pool()
+    notifications.stop_worker()
+    email_outbox.stop_sender()
+    await dispose_async_engine()
 
 
 app = FastAPI(
@@ -46,6 +68,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=EXPOSED_HEADERS,  # pagination cursor and counts for the frontend
 )
 
 
@@ -82,6 +105,7 @@ async def validation_exception_handler(_request: Request, exc: RequestValidation
 app.include_router(auth.router)
 app.include_router(reports.router)
 app.include_router(users.router)
+app.include_router(metrics.router)
 
 # Serve uploaded files (e.g. profile images)
 uploads_dir = Path(__file__).resolve().parent / "uploads"
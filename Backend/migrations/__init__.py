@@ -0,0 +1,4 @@
+"""
+Versioned schema migrations: runner.py applies the numbered steps in
+versions.py and records them in schema_version. Run: python -m scripts.migrate
+"""
@@ -0,0 +1,223 @@
+"""
+Versioned migration runner.
+
+Migrations (migrations/versions.py) are numbered steps applied in order; each
+applied version is recorded in the schema_version table with its duration, so
+a run only does what is missing. Every step goes through the Migrator helpers,
+which check the live schema first (add_column skips an existing column,
+create_index an existing valid index). A step interrupted half-way can
+therefore be run again, and a database created by init_db() simply gets its
+versions recorded.
+
+Statements run in autocommit mode: CREATE INDEX CONCURRENTLY needs it, and a
+data backfill commits each batch on its own, so no statement holds locks on
+reports for longer than one batch. On PostgreSQL an advisory lock keeps two
+runners from migrating at the same time.
+"""
+import time
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, inspect, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import DBAPIError
+
+# Not on models.base.Base: the runner creates it, create_all doesn't need to know about it
+schema_version = Table(
+    "schema_version",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("name", String(100), nullable=False),
+    Column("applied_at", DateTime(timezone=True), nullable=False),
+    Column("duration_ms", Integer, nullable=False),
+)
+
+# pg_advisory_lock key (any constant shared by all runners)
+ADVISORY_LOCK_KEY = 72_310_022
+
+
+class Migration:
+    """One numbered schema or data change; `apply` gets a Migrator."""
+
+    def __init__(self, version: int, name: str, apply: Callable[["Migrator"], None]) -> None:
+        self.version = version
+        self.name = name
+        self.apply = apply
+
+    @property
+    def description(self) -> str:
+        return (self.apply.__doc__ or "").strip().splitlines()[0] if self.apply.__doc__ else ""
+
+
+class Migrator:
+    """Schema helpers bound to one autocommit connection; in dry-run they print instead of executing."""
+
+    def __init__(
+        self,
+        conn: Connection,
+        dry_run: bool = False,
+        batch_size: int = 5000,
+        batch_pause: float = 0.05,
+        log: Callable[[str], None] = print,
+    ) -> None:
+        self.conn = conn
+        self.dry_run = dry_run
+        self.batch_size = max(1, batch_size)
+        self.batch_pause = max(0.0, batch_pause)
+        self.log = log
+
+    @property
+    def dialect(self) -> str:
+        return self.conn.dialect.name
+
+    def execute(self, sql: str, **params) -> None:
+        """Run one statement (print it in dry-run)."""
+        if self.dry_run:
+            self.log(f"    would run: {sql}")
+            return
+        self.conn.execute(text(sql), params)
+
+    def has_table(self, table: str) -> bool:
+        return inspect(self.conn).has_table(table)
+
+    def has_column(self, table: str, column: str) -> bool:
+        return column in {c["name"] for c in inspect(self.conn).get_columns(table)}
+
+    def add_column(self, table: str, column: str, sqlite_type: str, pg_type: Optional[str] = None) -> None:
+        """ALTER TABLE ... ADD COLUMN unless it exists. Keep types default-free (or constant) so no table rewrite."""
+        if not self.has_table(table):
+            self.log(f"    {table} missing (init_db creates it with every column)")
+            return
+        if self.has_column(table, column):
+            self.log(f"    {table}.{column} exists")
+            return
+        typ = sqlite_type if self.dialect == "sqlite" else (pg_type or sqlite_type)
+        self.execute(f"ALTER TABLE {table} ADD COLUMN {column} {typ}")
+        if not self.dry_run:
+            self.log(f"    added {table}.{column} {typ}")
+
+    def _pg_index_valid(self, name: str) -> Optional[bool]:
+        row = self.conn.execute(
+            text(
+                "SELECT i.indisvalid FROM pg_class c JOIN pg_index i ON i.indexrelid = c.oid "
+                "WHERE c.relname = :name"
+            ),
+            {"name": name},
+        ).first()
+        return None if row is None else bool(row[0])
+
+    def create_index(self, name: str, definition: str, unique: bool = False) -> None:
+        """
+        CREATE INDEX name <definition> ("ON table (cols)"). On PostgreSQL it is
+        built CONCURRENTLY (writes continue) and an invalid index left by an
+        interrupted build is dropped and rebuilt.
+        """
+        create = "CREATE UNIQUE INDEX" if unique else "CREATE INDEX"
+        if self.dialect != "postgresql":
+            self.execute(f"{create} IF NOT EXISTS {name} {definition}")
+            return
+        valid = self._pg_index_valid(name)
+        if valid:
+            self.log(f"    index {name} exists")
+            return
+        if valid is False:
+            self.log(f"    index {name} is invalid (interrupted build), rebuilding")
+            self.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+        self.execute(f"{create} CONCURRENTLY IF NOT EXISTS {name} {definition}")
+
+    def backfill(self, table: str, set_sql: str, where_sql: str) -> int:
+        """
+        UPDATE table SET <set_sql> WHERE <where_sql>, walking the primary key
+        `id` in batches of batch_size rows, each batch its own transaction,
+        sleeping batch_pause between batches. Returns rows updated.
+        """
+        if not self.has_table(table):
+            return 0
+        if self.dry_run:
+            try:
+                pending = self.conn.execute(text(f"SELECT count(*) FROM {table} WHERE {where_sql}")).scalar() or 0
+            except DBAPIError:
+                # Columns this migration would add don't exist yet: every row is pending
+                pending = self.conn.execute(text(f"SELECT count(*) FROM {table}")).scalar() or 0
+            batches = -(-pending // self.batch_size)
+            self.log(f"    would update up to {pending} rows in ~{batches} batches: UPDATE {table} SET {set_sql} WHERE {where_sql}")
+            return 0
+        start = time.perf_counter()
+        last_id, updated, batches = 0, 0, 0
+        while True:
+            # Upper id of the next batch; the UPDATE then touches one bounded id range
+            upper = self.conn.execute(
+                text(f"SELECT max(id) FROM (SELECT id FROM {table} WHERE id > :after ORDER BY id LIMIT :n) batch"),
+                {"after": last_id, "n": self.batch_size},
+            ).scalar()
+            if upper is None:
+                break
+            updated += self.conn.execute(
+                text(f"UPDATE {table} SET {set_sql} WHERE id > :after AND id <= :upper AND ({where_sql})"),
+                {"after": last_id, "upper": upper},
+            ).rowcount
+            last_id, batches = upper, batches + 1
+            if batches % 20 == 0:
+                elapsed = time.perf_counter() - start
+                self.log(f"    ... {updated} rows updated up to id {last_id} ({updated / elapsed:.0f} rows/s)")
+            if self.batch_pause:
+                time.sleep(self.batch_pause)
+        self.log(f"    backfilled {updated} rows of {table} in {batches} batches ({time.perf_counter() - start:.2f}s)")
+        return updated
+
+
+def applied_versions(conn: Connection) -> dict[int, dict]:
+    """{version: row} of applied migrations ({} before the first run)."""
+    if not inspect(conn).has_table(schema_version.name):
+        return {}
+    return {row.version: row._asdict() for row in conn.execute(schema_version.select())}
+
+
+def pending(conn: Connection, migrations: list[Migration], target: Optional[int] = None) -> list[Migration]:
+    done = applied_versions(conn)
+    return [
+        m for m in sorted(migrations, key=lambda m: m.version)
+        if m.version not in done and (target is None or m.version <= target)
+    ]
+
+
+def migrate(
+    engine: Engine,
+    migrations: list[Migration],
+    target: Optional[int] = None,
+    dry_run: bool = False,
+    batch_size: int = 5000,
+    batch_pause: float = 0.05,
+    log: Callable[[str], None] = print,
+) -> list[Migration]:
+    """Apply pending migrations up to `target` (all by default) and record them. Returns those applied."""
+    applied: list[Migration] = []
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        locked = conn.dialect.name == "postgresql"
+        if locked:
+            conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": ADVISORY_LOCK_KEY})
+        try:
+            if not dry_run:
+                schema_version.create(conn, checkfirst=True)
+            todo = pending(conn, migrations, target)
+            if not todo:
+                log("Database is up to date.")
+            migrator = Migrator(conn, dry_run=dry_run, batch_size=batch_size, batch_pause=batch_pause, log=log)
+            for migration in todo:
+                log(f"{'[dry-run] ' if dry_run else ''}{migration.version:04d} {migration.name}: {migration.description}")
+                start = time.perf_counter()
+                migration.apply(migrator)
+                duration = time.perf_counter() - start
+                if not dry_run:
+                    conn.execute(schema_version.insert().values(
+                        version=migration.version,
+                        name=migration.name,
+                        applied_at=datetime.now(timezone.utc),
+                        duration_ms=int(duration * 1000),
+                    ))
+                log(f"  done in {duration:.2f}s")
+                applied.append(migration)
+        finally:
+            if locked:
+                conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": ADVISORY_LOCK_KEY})
+    return applied
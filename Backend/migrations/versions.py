@@ -0,0 +1,133 @@
+"""
+Schema migrations, in order. Add new ones at the end with the next version
+number; never renumber or edit one that has shipped.
+
+Versions 1-8 replace the old scripts/migrate_*.py files: a database that
+already ran some of them just records those versions (the helpers skip
+existing columns and indexes).
+"""
+from core.config import settings
+from migrations.runner import Migration, Migrator
+from models.report_search import POSTGRES_INDEX_NAME, POSTGRES_INDEX_SQL, SQLITE_DDL, rebuild_sqlite_index
+from services import dedup
+
+
+def users_reset_password(m: Migrator) -> None:
+    """users.reset_token / reset_token_expires (forgot password)."""
+    m.add_column("users", "reset_token", "VARCHAR(255)")
+    m.add_column("users", "reset_token_expires", "DATETIME", "TIMESTAMP WITH TIME ZONE")
+
+
+def users_profile_image(m: Migrator) -> None:
+    """users.profile_image."""
+    m.add_column("users", "profile_image", "VARCHAR(512)")
+
+
+def reports_extra_columns(m: Migrator) -> None:
+    """reports.user_id, title, structured_description, admin_response."""
+    m.add_column("reports", "user_id", "INTEGER", "INTEGER REFERENCES users(id)")
+    m.add_column("reports", "title", "VARCHAR(255)")
+    m.add_column("reports", "structured_description", "TEXT")
+    m.add_column("reports", "admin_response", "TEXT")
+
+
+def reports_ai_status(m: Migrator) -> None:
+    """reports.ai_status (background AI queue)."""
+    m.add_column("reports", "ai_status", "VARCHAR(20)")
+
+
+def reports_cluster_id(m: Migrator) -> None:
+    """reports.cluster_id (near-duplicate clusters) and its index."""
+    m.add_column("reports", "cluster_id", "INTEGER")
+    m.create_index("ix_reports_cluster_id", "ON reports (cluster_id)")
+
+
+def reports_priority_updated_at(m: Migrator) -> None:
+    """reports.priority and reports.updated_at, backfilled in batches."""
+    # Added without a default: on PostgreSQL a NOW() default rewrites the whole table under an
+    # exclusive lock, and SQLite refuses CURRENT_TIMESTAMP defaults on ADD COLUMN. New rows
+    # get both values from the model; existing rows from the batched backfill.
+    m.add_column("reports", "priority", "VARCHAR(50)")
+    m.add_column("reports", "updated_at", "DATETIME", "TIMESTAMP WITH TIME ZONE")
+    m.backfill(
+        "reports",
+        "priority = coalesce(priority, 'normal'), updated_at = coalesce(updated_at, created_at)",
+        "priority IS NULL OR updated_at IS NULL",
+    )
+    if m.dialect == "postgresql":
+        # Catalog-only changes (no rewrite): defaults for rows inserted outside the API
+        m.execute("ALTER TABLE reports ALTER COLUMN priority SET DEFAULT 'normal'")
+        m.execute("ALTER TABLE reports ALTER COLUMN updated_at SET DEFAULT now()")
+
+
+# (name, table, columns, unique): the indexes Report and User declared when version 7 shipped.
+# Listed literally so an index added to a model later needs its own migration.
+LIST_INDEXES = [
+    ("ix_reports_category_created", "reports", "category, created_at, id", False),
+    ("ix_reports_cluster_id", "reports", "cluster_id", False),
+    ("ix_reports_created", "reports", "created_at, id", False),
+    ("ix_reports_id", "reports", "id", False),
+    ("ix_reports_status_created", "reports", "status, created_at, id", False),
+    ("ix_reports_user_created", "reports", "user_id, created_at, id", False),
+    ("ix_reports_user_id", "reports", "user_id", False),
+    ("ix_users_created", "users", "created_at, id", False),
+    ("ix_users_email", "users", "email", True),
+    ("ix_users_id", "users", "id", False),
+    ("ix_users_reset_token", "users", "reset_token", False),
+    ("ix_users_role_created", "users", "role, created_at, id", False),
+]
+
+
+def list_indexes(m: Migrator) -> None:
+    """Indexes for the list endpoints (and the other model indexes of the time), then fresh planner statistics."""
+    for name, table, columns, unique in LIST_INDEXES:
+        m.create_index(name, f"ON {table} ({columns})", unique=unique)
+    m.execute("ANALYZE")
+
+
+def report_search(m: Migrator) -> None:
+    """Full-text search index (SQLite FTS5 + triggers, or PostgreSQL GIN)."""
+    if m.dialect == "postgresql":
+        m.create_index(POSTGRES_INDEX_NAME, POSTGRES_INDEX_SQL)
+        return
+    if m.dialect != "sqlite":
+        return
+    existed = m.has_table("reports_fts")
+    for statement in SQLITE_DDL:
+        m.execute(statement)
+    if not existed:
+        # Index the reports that were there before the table
+        if m.dry_run:
+            m.log("    would index existing reports into reports_fts")
+        else:
+            rebuild_sqlite_index(m.conn)
+
+
+def reports_minhash(m: Migrator) -> None:
+    """reports.minhash and the report_dedup_buckets rows of existing reports (near-duplicate index)."""
+    m.add_column("reports", "minhash", "BLOB", "BYTEA")
+    if m.dry_run:
+        m.log("    would store MinHash signatures and buckets of existing reports")
+    elif not settings.DEDUP_ENABLED:
+        m.log("    DEDUP_ENABLED is off; index existing reports later with python -m scripts.rebuild_dedup_index")
+    else:
+        dedup.backfill(m.conn, batch_size=m.batch_size, log=m.log)
+
+
+def reports_cluster_backfill(m: Migrator) -> None:
+    """reports.cluster_id = id for reports stored before clustering, so clusters include their first report."""
+    m.backfill("reports", "cluster_id = id", "cluster_id IS NULL")
+
+
+MIGRATIONS = [
+    Migration(1, "users_reset_password", users_reset_password),
+    Migration(2, "users_profile_image", users_profile_image),
+    Migration(3, "reports_extra_columns", reports_extra_columns),
+    Migration(4, "reports_ai_status", reports_ai_status),
+    Migration(5, "reports_cluster_id", reports_cluster_id),
+    Migration(6, "reports_priority_updated_at", reports_priority_updated_at),
+    Migration(7, "list_indexes", list_indexes),
+    Migration(8, "report_search", report_search),
+    Migration(9, "reports_minhash", reports_minhash),
+    Migration(10, "reports_cluster_backfill", reports_cluster_backfill),
+]
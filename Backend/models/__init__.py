@@ -1,5 +1,16 @@
 from models.base import Base, get_db, init_db
 from models.user import User
 from models.report import Report
+from models.ai_job import AIJob
+from models.ai_cache import AICacheEntry
+from models.refresh_token import RefreshToken
+from models.email_outbox import EmailOutbox
+from models.report_notification import ReportNotification
+from models.report_stat import ReportStat
+from models.ai_token_usage import AITokenUsage
+from models.report_dedup_bucket import ReportDedupBucket
 
-__all__ = ["Base", "get_db", "init_db", "User", "Report"]
+__all__ = [
+    "Base", "get_db", "init_db", "User", "Report", "AIJob", "AICacheEntry", "RefreshToken", "EmailOutbox",
+    "ReportNotification", "ReportStat", "AITokenUsage", "ReportDedupBucket",
+]
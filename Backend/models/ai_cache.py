@@ -0,0 +1,18 @@
+"""
+Persistent tier of the AI result cache, shared by all workers and kept across restarts.
+Keyed by a hash of the normalized raw text, model name and prompt version.
+"""
+from sqlalchemy import Column, String, Text, DateTime
+from sqlalchemy.sql import func
+
+from models.base import Base
+
+
+class AICacheEntry(Base):
+    __tablename__ = "ai_cache"
+
+    cache_key = Column(String(64), primary_key=True)  # sha256 hex
+    model = Column(String(100), nullable=False)
+    prompt_version = Column(String(20), nullable=False)
+    result = Column(Text, nullable=False)  # JSON of _validate_and_normalize output
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
@@ -0,0 +1,18 @@
+"""
+Tokens spent per UTC day and model, shared by every API worker and script.
+services.ai_usage adds each call's tokens with an upsert and checks the daily
+budget against the day's total, so restarts and extra processes can't exceed it.
+"""
+from sqlalchemy import BigInteger, Column, Date, Integer, String
+
+from models.base import Base
+
+
+class AITokenUsage(Base):
+    __tablename__ = "ai_token_usage"
+
+    day = Column(Date, primary_key=True)  # UTC
+    model = Column(String(100), primary_key=True)
+    calls = Column(Integer, nullable=False, default=0)
+    prompt_tokens = Column(BigInteger, nullable=False, default=0)
+    completion_tokens = Column(BigInteger, nullable=False, default=0)
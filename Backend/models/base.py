@@ -1,8 +1,27 @@
 """
-Database engine and session. Supports SQLite and PostgreSQL.
+Database engines and sessions. Supports SQLite and PostgreSQL.
+
+API routes get their session from get_async_db and await every database call.
+With ASYNC_DB (default for PostgreSQL) that is an AsyncSession on the async
+engine (asyncpg / aiosqlite), so a request waiting on the database doesn't
+hold a thread. Otherwise (default for SQLite) it is a ThreadedSession: the
+same awaitable interface over a sync Session whose calls run on the
+threadpool, which is faster when queries are local file reads. Background
+workers and scripts use the sync engine and SessionLocal.
+
+With SQLITE_TUNING, every SQLite connection of both engines gets the pragmas
+from sqlite_pragmas() (WAL, busy_timeout, synchronous=NORMAL, mmap).
 """
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+import threading
+from typing import Any, AsyncIterator, Callable, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from starlette.concurrency import run_in_threadpool
 
 from core.config import settings
 
@@ -11,15 +30,167 @@ connect_args = {}
 if settings.DATABASE_URL.startswith("sqlite"):
     connect_args["check_same_thread"] = False
 
+
+
+def pool_sizing(url: str) -> dict[str, int]:
+    """
+    pool_size / max_overflow for an engine on `url`; none for in-memory SQLite
+    (sqlite://, :memory:): SQLAlchemy gives it a single-connection pool that
+    takes no sizing, and more connections would each see an empty database.
+    """
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and (
+        parsed.database in (None, "", ":memory:") or parsed.query.get("mode") == "memory"
+    ):
+        return {}
+    return {"pool_size": settings.DB_POOL_SIZE, "max_overflow": settings.DB_MAX_OVERFLOW}
+
+
 engine = create_engine(
     settings.DATABASE_URL,
     connect_args=connect_args,
     echo=settings.DEBUG,
     pool_pre_ping=True,  # helps keep PostgreSQL connections alive
+    **pool_sizing(settings.DATABASE_URL),
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+def async_database_url(url: str) -> tuple[str, dict[str, Any]]:
+    """(async driver URL, connect_args) for a sync DATABASE_URL."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend == "sqlite":
+        return parsed.set(drivername="sqlite+aiosqlite").render_as_string(hide_password=False), {}
+    if backend in ("postgresql", "postgres"):
+        # asyncpg takes ssl as a connect argument, not libpq's sslmode query parameter
+        query = dict(parsed.query)
+        sslmode = query.pop("sslmode", None)
+        parsed = parsed.set(drivername="postgresql+asyncpg", query=query)
+        return parsed.render_as_string(hide_password=False), ({"ssl": sslmode} if sslmode else {})
+    return url, {}
+
+
+_async_engine: Optional[AsyncEngine] = None
+_async_engine_lock = threading.Lock()
+
+
+def get_async_engine() -> AsyncEngine:
+    """The async engine, created on first use (only ASYNC_DB routes and the export stream need it)."""
+    global _async_engine
+    with _async_engine_lock:
+        if _async_engine is None:
+            url, connect_args = async_database_url(settings.DATABASE_URL)
+            if settings.ASYNC_DATABASE_URL:
+                url, connect_args = settings.ASYNC_DATABASE_URL, {}
+            sizing = pool_sizing(url)
+            _async_engine = create_async_engine(
+                url,
+                # SQLAlchemy 2.0 gives aiosqlite files a NullPool: a new connection (and aiosqlite thread)
+                # per request. In-memory databases keep their default single shared connection.
+                **({"poolclass": AsyncAdaptedQueuePool, **sizing} if sizing else {}),
+                connect_args=connect_args,
+                echo=settings.DEBUG,
+                pool_pre_ping=True,
+            )
+            if settings.SQLITE_TUNING and _async_engine.dialect.name == "sqlite":
+                event.listen(_async_engine.sync_engine, "connect", _apply_sqlite_pragmas)
+        return _async_engine
+
+
+async def dispose_async_engine() -> None:
+    """Close the async engine's pool if it was created (app shutdown)."""
+    if _async_engine is not None:
+        await _async_engine.dispose()
+
+
+# expire_on_commit=False: returned objects are serialized after commit, and an
+# expired attribute can't be lazy-loaded outside the session's greenlet
+AsyncSessionLocal = async_sessionmaker(expire_on_commit=False, autoflush=False)
+# Same options for the ThreadedSession behind routes without ASYNC_DB
+ThreadedSessionLocal = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+
+
+class ThreadedSession:
+    """
+    The part of AsyncSession the routes use, over a sync Session. Each awaited
+    call runs on the threadpool (one call at a time, never concurrently), so
+    route code is the same with or without ASYNC_DB. Results are buffered
+    before returning to the event loop, as with AsyncSession.
+    """
+
+    def __init__(self, session: Session) -> None:
+        self.sync_session = session
+
+    def add(self, instance: Any) -> None:
+        self.sync_session.add(instance)
+
+    def add_all(self, instances: Any) -> None:
+        self.sync_session.add_all(instances)
+
+    async def run_sync(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        return await run_in_threadpool(fn, self.sync_session, *args, **kwargs)
+
+    async def execute(self, statement: Any, *args: Any, **kwargs: Any):
+        def buffered(session: Session):
+            result = session.execute(statement, *args, **kwargs)
+            # ORM results always have rows; a Core DML CursorResult may not
+            return result.freeze()() if getattr(result, "returns_rows", True) else result
+
+        return await self.run_sync(buffered)
+
+    async def scalars(self, statement: Any, *args: Any, **kwargs: Any):
+        return (await self.execute(statement, *args, **kwargs)).scalars()
+
+    async def scalar(self, statement: Any, *args: Any, **kwargs: Any) -> Any:
+        return await run_in_threadpool(self.sync_session.scalar, statement, *args, **kwargs)
+
+    async def get(self, entity: Any, ident: Any, **kwargs: Any) -> Any:
+        return await run_in_threadpool(self.sync_session.get, entity, ident, **kwargs)
+
+    async def refresh(self, instance: Any, *args: Any, **kwargs: Any) -> None:
+        await run_in_threadpool(self.sync_session.refresh, instance, *args, **kwargs)
+
+    async def flush(self) -> None:
+        await run_in_threadpool(self.sync_session.flush)
+
+    async def commit(self) -> None:
+        await run_in_threadpool(self.sync_session.commit)
+
+    async def rollback(self) -> None:
+        await run_in_threadpool(self.sync_session.rollback)
+
+    async def close(self) -> None:
+        await run_in_threadpool(self.sync_session.close)
+
+
+def sqlite_pragmas() -> list[str]:
+    """PRAGMA statements of the SQLite production profile (SQLITE_TUNING)."""
+    return [
+        # Readers see the last commit while one writer appends to the WAL; persistent in the file
+        "PRAGMA journal_mode=WAL",
+        # Wait for a lock instead of failing at once with "database is locked"
+        f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}",
+        # In WAL mode: fsync at checkpoints, not every commit (a power cut may lose the last commits, never corrupts)
+        "PRAGMA synchronous=NORMAL",
+        f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE_MB * 1024 * 1024}",
+    ]
+
+
+def _apply_sqlite_pragmas(dbapi_connection, _connection_record) -> None:
+    # Works for aiosqlite too: SQLAlchemy's adapter runs the cursor calls on its thread
+    cursor = dbapi_connection.cursor()
+    try:
+        for statement in sqlite_pragmas():
+            cursor.execute(statement)
+    finally:
+        cursor.close()
+
+
+if settings.SQLITE_TUNING and engine.dialect.name == "sqlite":
+    event.listen(engine, "connect", _apply_sqlite_pragmas)
+
 Base = declarative_base()
 
 
@@ -32,11 +203,24 @@ def get_db():
         db.close()
 
 
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """Yield the API routes' session for FastAPI Depends: AsyncSession with ASYNC_DB, else ThreadedSession."""
+    if settings.ASYNC_DB:
+        async with AsyncSessionLocal(bind=get_async_engine()) as db:
+            yield db
+        return
+    db = ThreadedSession(ThreadedSessionLocal())
+    try:
+        yield db
+    finally:
+        await db.close()
+
+
 def init_db() -> None:
     """
     Create tables (development only).
     In production, use Alembic migrations instead.
     """
-    from models import user, report  # register models
+    from models import user, report, ai_job, ai_cache, refresh_token, email_outbox, report_notification, report_stat, ai_token_usage, report_dedup_bucket, report_search  # register models (+ search index DDL)
 
     Base.metadata.create_all(bind=engine)
@@ -0,0 +1,20 @@
+"""
+Refresh-token sessions. One row per login (not per refresh): each refresh
+rotates the token by bumping `generation`, so a replayed older token is
+detected and the whole session revoked.
+"""
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy.sql import func
+
+from models.base import Base
+
+
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+
+    id = Column(String(32), primary_key=True)  # session id, the "sid" claim in tokens
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    generation = Column(Integer, nullable=False, default=0)  # the only token of this session still valid
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    revoked_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
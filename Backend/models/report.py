@@ -1,6 +1,6 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, CheckConstraint
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, CheckConstraint, Index, LargeBinary
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 from models.base import Base
 
 class Report(Base):
@@ -14,8 +14,18 @@ class Report(Base):
             "category IN ('roads','water','security','sanitation','electricity','health','education','other')",
             name="check_category_valid"
         ),
+        # Match the list endpoints: equality filter, then newest first (id breaks ties),
+        # so they read rows in index order instead of scanning and sorting the table
+        Index("ix_reports_user_created", "user_id", "created_at", "id"),
+        Index("ix_reports_status_created", "status", "created_at", "id"),
+        Index("ix_reports_category_created", "category", "created_at", "id"),
+        Index("ix_reports_created", "created_at", "id"),
     )
 
+    # Fetch updated_at (set by the database on UPDATE) with RETURNING, so a report stays
+    # readable after commit without another SELECT (async sessions can't lazy-load it)
+    __mapper_args__ = {"eager_defaults": True}
+
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
 
@@ -32,7 +42,17 @@ class Report(Base):
     admin_response = Column(Text, nullable=True)
 
     status = Column(String(50), nullable=False, default="pending")
+    priority = Column(String(50), nullable=True, default="normal", server_default="normal")
+    # AI structuring state: processing | done | failed (None when AI is disabled)
+    ai_status = Column(String(20), nullable=True)
+    # Near-duplicate cluster: id of the first report about the same issue (own id if unique)
+    cluster_id = Column(Integer, nullable=True, index=True)
+    # MinHash signature of raw_description (services.dedup), compared against new reports;
+    # deferred so report listings don't read it
+    minhash = deferred(Column(LargeBinary, nullable=True))
 
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # default= as well: SQLite can't ADD COLUMN with a CURRENT_TIMESTAMP default, so migrated files have none
+    updated_at = Column(DateTime(timezone=True), default=func.now(), server_default=func.now(), onupdate=func.now())
 
     user = relationship("User", back_populates="reports")
@@ -0,0 +1,17 @@
+"""
+Near-duplicate LSH buckets: one row per (category, location, MinHash band)
+key, pointing at the first report that filled it. services.dedup adds a
+report's buckets in the same transaction as the report and looks up a new
+report's keys with one primary-key SELECT, so every worker and process shares
+one index and none keeps it in memory.
+"""
+from sqlalchemy import BigInteger, Column, Integer
+
+from models.base import Base
+
+
+class ReportDedupBucket(Base):
+    __tablename__ = "report_dedup_buckets"
+
+    key = Column(BigInteger, primary_key=True, autoincrement=False)  # signed 64-bit hash of the band
+    report_id = Column(Integer, nullable=False)
@@ -0,0 +1,24 @@
+"""
+Pending status-change notifications for citizens. update_report adds one row
+per change; services.notifications folds a user's rows into one digest email
+and deletes them.
+"""
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
+
+from models.base import Base
+
+
+class ReportNotification(Base):
+    __tablename__ = "report_notifications"
+    __table_args__ = (
+        # The digester looks for unclaimed rows older than the coalescing window
+        Index("ix_report_notifications_batch_created", "batch_id", "created_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    report_id = Column(Integer, ForeignKey("reports.id"), nullable=False)
+    status = Column(String(50), nullable=False)
+    admin_response = Column(Text, nullable=True)
+    batch_id = Column(String(32), nullable=True)  # set when a digest run claims the row
+    created_at = Column(DateTime(timezone=True), nullable=False)
@@ -0,0 +1,70 @@
+"""
+Full-text index over report title, raw_description, structured_description and location.
+
+SQLite: an FTS5 table (reports_fts) that stores no text of its own
+(content='reports'), kept in sync by insert/update/delete triggers on reports.
+PostgreSQL: a GIN index on the to_tsvector() of the same columns; search
+queries use the identical expression (DOCUMENT_SQL) so the planner can use it,
+and PostgreSQL maintains it on every write.
+
+Created together with the reports table (create_all); existing databases get
+it from migration 8 (python -m scripts.migrate), which also fills the SQLite index.
+"""
+from sqlalchemy import event, text
+from sqlalchemy.engine import Connection
+
+from models.report import Report
+
+# 'simple': lowercase words without English stemming, since reports mix Kinyarwanda and English
+TS_CONFIG = "simple"
+
+DOCUMENT_SQL = (
+    f"to_tsvector('{TS_CONFIG}', coalesce(reports.title, '') || ' ' || coalesce(reports.raw_description, '') "
+    "|| ' ' || coalesce(reports.structured_description, '') || ' ' || coalesce(reports.location, ''))"
+)
+
+SQLITE_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS reports_fts USING fts5(
+        title, raw_description, structured_description, location,
+        content='reports', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS reports_fts_insert AFTER INSERT ON reports BEGIN
+        INSERT INTO reports_fts(rowid, title, raw_description, structured_description, location)
+        VALUES (new.id, new.title, new.raw_description, new.structured_description, new.location);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS reports_fts_delete AFTER DELETE ON reports BEGIN
+        INSERT INTO reports_fts(reports_fts, rowid, title, raw_description, structured_description, location)
+        VALUES ('delete', old.id, old.title, old.raw_description, old.structured_description, old.location);
+    END""",
+    # Only when indexed text changes; status/admin_response updates don't touch the index
+    """CREATE TRIGGER IF NOT EXISTS reports_fts_update
+        AFTER UPDATE OF title, raw_description, structured_description, location ON reports BEGIN
+        INSERT INTO reports_fts(reports_fts, rowid, title, raw_description, structured_description, location)
+        VALUES ('delete', old.id, old.title, old.raw_description, old.structured_description, old.location);
+        INSERT INTO reports_fts(rowid, title, raw_description, structured_description, location)
+        VALUES (new.id, new.title, new.raw_description, new.structured_description, new.location);
+    END""",
+]
+
+POSTGRES_INDEX_NAME = "ix_reports_fulltext"
+POSTGRES_INDEX_SQL = f"ON reports USING GIN (({DOCUMENT_SQL}))"
+
+
+def create_search_index(conn: Connection) -> None:
+    """Create the index for the connection's dialect (idempotent). Caller commits."""
+    dialect = conn.dialect.name
+    if dialect == "sqlite":
+        for statement in SQLITE_DDL:
+            conn.execute(text(statement))
+    elif dialect == "postgresql":
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS {POSTGRES_INDEX_NAME} {POSTGRES_INDEX_SQL}"))
+
+
+def rebuild_sqlite_index(conn: Connection) -> None:
+    """Re-read every report into reports_fts (after creating it on a table that already has rows)."""
+    conn.execute(text("INSERT INTO reports_fts(reports_fts) VALUES ('rebuild')"))
+
+
+@event.listens_for(Report.__table__, "after_create")
+def _create_with_table(target, connection: Connection, **kw) -> None:
+    create_search_index(connection)
@@ -0,0 +1,18 @@
+"""
+Precomputed dashboard counters: one row per (dimension, value), e.g.
+("status", "pending") or ("category", "water"). services.report_stats updates
+them in the same transaction as the report/user change, so reading the whole
+table (a few dozen rows) gives exact counts without scanning reports.
+"""
+from sqlalchemy import Column, Integer, String
+
+from models.base import Base
+
+
+class ReportStat(Base):
+    __tablename__ = "report_stats"
+
+    # total | status | category | institution | user_role
+    dimension = Column(String(20), primary_key=True)
+    value = Column(String(100), primary_key=True, default="")
+    count = Column(Integer, nullable=False, default=0)
@@ -2,7 +2,7 @@
 User model for authentication.
 Admins manage the system; users may submit/track reports.
 """
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import Column, Integer, String, DateTime, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import enum
@@ -17,6 +17,11 @@ class UserRole(str, enum.Enum):
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # list_users: role = 'User', newest first; created_at alone with include_admin
+        Index("ix_users_role_created", "role", "created_at", "id"),
+        Index("ix_users_created", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     full_name = Column(String(255), nullable=False)
@@ -1,8 +1,9 @@
 """
-Auth: user registration, login, forgot/reset password, profile update, and current user info.
+Auth: user registration, login, token refresh/logout, forgot/reset password, profile update, and current user info.
 - Users can self-register.
 - Admin is created manually via script.
 - Both can login and access their respective dashboards.
+- Login also returns a rotating refresh token for /refresh, so clients don't log in again every ACCESS_TOKEN_EXPIRE_MINUTES.
 """
 import secrets
 import uuid
@@ -11,18 +12,26 @@ from pathlib import Path
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 
+from core import auth_cache, refresh_tokens
 from core.config import settings
-from core.security import hash_password, verify_password, create_access_token
-from core.email import send_password_reset_email
-from core.deps import get_current_user, CurrentUser
-from models.base import get_db
+from core.password_pool import hash_password_async, verify_password_async
+from core.security import create_access_token
+from core.email import password_reset_email
+from core.deps import CurrentUser
+from models.base import get_async_db
 from models.user import User
+from services import report_stats
+from services.email_outbox import enqueue_email, notify_sender
 from schemas.auth import (
     UserRegister,
     UserLogin,
     LoginResponse,
+    RefreshRequest,
+    TokenResponse,
     UserResponse,
     ForgotPasswordRequest,
     ForgotPasswordResponse,
@@ -33,12 +42,12 @@ router = APIRouter(prefix="/api/auth", tags=["auth"])
 
 
 @router.post("/register", response_model=UserResponse)
-def register(
+async def register(
     payload: UserRegister,
-    db: Annotated[Session, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_async_db)],
 ) -> User:
     """Register a new user (citizen). Role is automatically 'User'."""
-    existing = db.query(User).filter(User.email == payload.email.lower()).first()
+    existing = await db.scalar(select(User).where(User.email == payload.email.lower()))
     if existing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -47,28 +56,31 @@ def register(
     user = User(
         full_name=payload.full_name.strip(),
         email=payload.email.lower().strip(),
-        hashed_password=hash_password(payload.password),
+        hashed_password=await hash_password_async(payload.password),
         role="User",  # Always 'User' for self-registration
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.run_sync(report_stats.user_created, user)
+    await db.commit()
+    await db.refresh(user)
     return user
 
 
 @router.post("/login", response_model=LoginResponse)
-def login(
+async def login(
     payload: UserLogin,
-    db: Annotated[Session, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_async_db)],
 ) -> LoginResponse:
-    """Login with email/password. Returns JWT and user (including role) so frontend can redirect Admin vs User."""
-    user = db.query(User).filter(User.email == payload.email.lower().strip()).first()
-    if not user or not verify_password(payload.password, user.hashed_password):
+    """Login with email/password. Returns JWT, a refresh token and user (including role) so frontend can redirect Admin vs User."""
+    user = await db.scalar(select(User).where(User.email == payload.email.lower().strip()))
+    if not user or not await verify_password_async(payload.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password",
         )
-    token = create_access_token(subject=user.id)
+    session_id, refresh_token = await db.run_sync(refresh_tokens.issue, user.id)
+    await db.commit()
+    token = create_access_token(subject=user.id, extra_claims={"sid": session_id})
     role = (user.role or "User").strip()
     is_admin = role.lower() == "admin"
     user_payload = UserResponse(
@@ -84,9 +96,48 @@ def login(
         expires_in_minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES,
         user=user_payload,
         is_admin=is_admin,
+        refresh_token=refresh_token,
     )
 
 
+@router.post("/refresh", response_model=TokenResponse)
+async def refresh(
+    payload: RefreshRequest,
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+) -> TokenResponse:
+    """Exchange a refresh token for a new access token. The refresh token is rotated: use the returned one next time; reusing an old one revokes the session."""
+    user_id, session_id, refresh_token = await db.run_sync(refresh_tokens.rotate, payload.refresh_token)
+    return TokenResponse(
+        access_token=create_access_token(subject=user_id, extra_claims={"sid": session_id}),
+        token_type="bearer",
+        expires_in_minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES,
+        refresh_token=refresh_token,
+    )
+
+
+@router.post("/logout")
+async def logout(
+    payload: RefreshRequest,
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+) -> dict:
+    """End the session of this refresh token; its access tokens stop working too."""
+    await db.run_sync(refresh_tokens.revoke, payload.refresh_token)
+    await db.commit()
+    return {"message": "Logged out."}
+
+
+@router.post("/logout-all")
+async def logout_all(
+    current_user: CurrentUser,
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+) -> dict:
+    """End every session of the current user (all devices)."""
+    count = await db.run_sync(refresh_tokens.revoke_user, current_user.id)
+    await db.commit()
+    auth_cache.invalidate_user(current_user.id)
+    return {"message": f"Logged out of {count} session(s)."}
+
+
 def _user_to_response(user: User) -> UserResponse:
     return UserResponse(
         id=user.id,
@@ -98,7 +149,7 @@ def _user_to_response(user: User) -> UserResponse:
 
 
 @router.get("/me", response_model=UserResponse)
-def me(current_user: CurrentUser) -> UserResponse:
+async def me(current_user: CurrentUser) -> UserResponse:
     """Return current authenticated user (User or Admin). Explicit payload so role is always included."""
     return _user_to_response(current_user)
 
@@ -109,15 +160,17 @@ MAX_IMAGE_SIZE = 5 * 1024 * 1024  # 5 MB
 
 
 @router.patch("/me", response_model=UserResponse)
-def update_me(
+async def update_me(
     current_user: CurrentUser,
-    db: Annotated[Session, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_async_db)],
     full_name: str | None = Form(None),
     profile_image: UploadFile | None = File(None),
 ) -> UserResponse:
     """Update current user profile: full_name and/or profile image."""
+    # current_user may be a detached copy from the auth cache; change the session's row
+    user = await db.get(User, current_user.id)
     if full_name is not None and full_name.strip():
-        current_user.full_name = full_name.strip()
+        user.full_name = full_name.strip()
     if profile_image is not None and profile_image.filename:
         ext = Path(profile_image.filename).suffix.lower()
         if ext not in ALLOWED_IMAGE_EXTENSIONS:
@@ -125,39 +178,38 @@ def update_me(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Allowed image types: JPG, PNG, GIF, WEBP",
             )
-        content = profile_image.file.read()
+        content = await profile_image.read()
         if len(content) > MAX_IMAGE_SIZE:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Image must be under 5 MB",
             )
         UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
-        safe_name = f"{current_user.id}_{uuid.uuid4().hex[:12]}{ext}"
+        safe_name = f"{user.id}_{uuid.uuid4().hex[:12]}{ext}"
         file_path = UPLOAD_DIR / safe_name
-        with open(file_path, "wb") as f:
-            f.write(content)
+        await run_in_threadpool(file_path.write_bytes, content)
         rel_path = f"uploads/avatars/{safe_name}"
-        if current_user.profile_image:
-            old_path = Path(__file__).resolve().parent.parent / current_user.profile_image
+        if user.profile_image:
+            old_path = Path(__file__).resolve().parent.parent / user.profile_image
             if old_path.exists():
                 try:
                     old_path.unlink()
                 except OSError:
                     pass
-        current_user.profile_image = rel_path
-    db.add(current_user)
-    db.commit()
-    db.refresh(current_user)
-    return _user_to_response(current_user)
+        user.profile_image = rel_path
+    await db.commit()
+    await db.refresh(user)
+    auth_cache.invalidate_user(user.id)
+    return _user_to_response(user)
 
 
 @router.post("/forgot-password", response_model=ForgotPasswordResponse)
-def forgot_password(
+async def forgot_password(
     payload: ForgotPasswordRequest,
-    db: Annotated[Session, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_async_db)],
 ) -> ForgotPasswordResponse:
-    """Request a password reset. If the email exists, a reset token is created and an email with the link is sent (if SMTP configured). Same message either way (no email enumeration)."""
-    user = db.query(User).filter(User.email == payload.email.lower().strip()).first()
+    """Request a password reset. If the email exists, a reset token is created and an email with the link is queued for sending (if SMTP configured). Same message either way (no email enumeration)."""
+    user = await db.scalar(select(User).where(User.email == payload.email.lower().strip()))
     message = "If an account exists for this email, we've sent instructions to reset your password. Check your inbox."
     reset_token = None
     if user:
@@ -165,42 +217,41 @@ def forgot_password(
         user.reset_token = reset_token
         user.reset_token_expires = datetime.now(timezone.utc) + timedelta(hours=1)
         db.add(user)
-        db.commit()
         if settings.email_configured:
+            # Sent by the background outbox sender; this request never waits on SMTP
             reset_link = f"{settings.FRONTEND_URL}/reset-password?token={reset_token}"
-            try:
-                send_password_reset_email(user.email, reset_link)
-            except Exception as e:
-                import logging
-                logging.getLogger(__name__).exception("Failed to send password reset email: %s", e)
+            subject, text_body, html_body = password_reset_email(reset_link)
+            await db.run_sync(enqueue_email, user.email, subject, text_body, html_body)
+        await db.commit()
+        notify_sender()
     if settings.DEBUG and reset_token and not settings.email_configured:
         return ForgotPasswordResponse(message=message, reset_token=reset_token)
     return ForgotPasswordResponse(message=message)
 
 
 @router.post("/reset-password")
-def reset_password(
+async def reset_password(
     payload: ResetPasswordRequest,
-    db: Annotated[Session, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_async_db)],
 ) -> dict:
     """Reset password using the token from forgot-password. Token is single-use and expires in 1 hour."""
-    user = (
-        db.query(User)
-        .filter(
+    user = await db.scalar(
+        select(User).where(
             User.reset_token == payload.token,
             User.reset_token_expires.isnot(None),
             User.reset_token_expires > datetime.now(timezone.utc),
         )
-        .first()
     )
     if not user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid or expired reset link. Please request a new one.",
         )
-    user.hashed_password = hash_password(payload.new_password)
+    user.hashed_password = await hash_password_async(payload.new_password)
     user.reset_token = None
     user.reset_token_expires = None
     db.add(user)
-    db.commit()
+    await db.run_sync(refresh_tokens.revoke_user, user.id)  # sign out everywhere with the old password
+    await db.commit()
+    auth_cache.invalidate_user(user.id)
     return {"message": "Password has been reset. You can sign in with your new password."}
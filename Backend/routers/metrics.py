@@ -0,0 +1,97 @@
+"""
+Metrics: operational counters for monitoring (admin only).
+"""
+from typing import Annotated
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from core import auth_cache, password_pool, refresh_tokens
+from core.deps import CurrentAdmin
+from models.base import get_db
+from services import ai_cache, ai_processor, ai_usage, classifier, dedup, notifications, report_writer
+from services.ai_queue import queue_depth
+from services.email_outbox import outbox_depth
+
+router = APIRouter(prefix="/api/metrics", tags=["metrics"])
+
+
+@router.get("/ai-queue")
+def ai_queue(
+    db: Annotated[Session, Depends(get_db)],
+    current_admin: CurrentAdmin,
+) -> dict:
+    """AI job queue depth: jobs by status, oldest pending job age, worker count."""
+    return queue_depth(db)
+
+
+@router.get("/email-outbox")
+def email_outbox(
+    db: Annotated[Session, Depends(get_db)],
+    current_admin: CurrentAdmin,
+) -> dict:
+    """Email outbox: emails by status, oldest unsent email age, SMTP sessions opened vs messages sent."""
+    return outbox_depth(db)
+
+
+@router.get("/notifications")
+def notification_stats(
+    db: Annotated[Session, Depends(get_db)],
+    current_admin: CurrentAdmin,
+) -> dict:
+    """Status-change notifications waiting for a digest, and digests sent (this process)."""
+    return notifications.pending_stats(db)
+
+
+@router.get("/ai-cache")
+def ai_cache_stats(current_admin: CurrentAdmin) -> dict:
+    """AI result cache hit/miss counters for this process."""
+    return ai_cache.stats()
+
+
+@router.get("/ai-classifier")
+def ai_classifier_stats(current_admin: CurrentAdmin) -> dict:
+    """Reports handled by the local classifier vs sent to the LLM (this process)."""
+    return classifier.stats()
+
+
+@router.get("/ai-provider")
+def ai_provider_stats(current_admin: CurrentAdmin) -> dict:
+    """AI provider circuit breaker state and in-flight model calls."""
+    return ai_processor.provider_stats()
+
+
+@router.get("/ai-usage")
+def ai_usage_stats(current_admin: CurrentAdmin) -> dict:
+    """AI token usage and latency per model, and today's budget use (this process)."""
+    return ai_usage.stats()
+
+
+@router.get("/auth-cache")
+def auth_cache_stats(current_admin: CurrentAdmin) -> dict:
+    """Authenticated user / verified token cache counters (this process)."""
+    return auth_cache.stats()
+
+
+@router.get("/password-pool")
+def password_pool_stats(current_admin: CurrentAdmin) -> dict:
+    """bcrypt process pool: in-flight calls, rejections (503s) and recent latency (this process)."""
+    return password_pool.stats()
+
+
+@router.get("/refresh-tokens")
+def refresh_token_stats(current_admin: CurrentAdmin) -> dict:
+    """Refresh sessions issued/rotated, replays detected and revocations (this process)."""
+    return refresh_tokens.stats()
+
+
+@router.get("/dedup")
+def dedup_stats(current_admin: CurrentAdmin) -> dict:
+    """Near-duplicate lookups, verified candidates and matches (this process)."""
+    return dedup.stats()
+
+
+@router.get("/report-writer")
+def report_writer_stats(current_admin: CurrentAdmin) -> dict:
+    """Group-commit writer: batches written, average batch size, queued reports (this process)."""
+    return report_writer.stats()
@@ -1,85 +1,297 @@
+import asyncio
+from datetime import datetime, timezone
 from typing import Annotated, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
-from core.deps import get_current_user, get_current_admin, CurrentUser, CurrentAdmin
-from models.base import get_db
+from core.config import settings
+from core.deps import CurrentUser, CurrentAdmin
+from core.pagination import count_rows, paginate, set_page_headers
+from models.base import get_async_db
 from models.report import Report
-from schemas.report import ReportCreate, ReportResponse, ReportUpdate
-from services.ai_processor import process_issue_text
+from schemas.report import (
+    BulkIngestResponse,
+    BulkIngestRow,
+    ReportBulkUpdate,
+    ReportBulkUpdateResponse,
+    ReportClusterResponse,
+    ReportCreate,
+    ReportResponse,
+    ReportStatsResponse,
+    ReportUpdate,
+)
+from services import bulk_ingest, bulk_update, dedup, export, notifications, report_stats, report_writer, search
+from services.ai_queue import notify_workers
 
 router = APIRouter(prefix="/api/reports", tags=["reports"])
 
 
+# Endpoints are async and await their session (AsyncSession, or ThreadedSession
+# without ASYNC_DB); sync helpers shared with workers and scripts (query
+# builders, pagination, counters, dedup) run through db.run_sync.
+
+# Query builders shared with scripts/check_query_plans.py, which EXPLAINs them
+def my_reports_query(db: Session, user_id: int):
+    """A user's reports, newest first (served by ix_reports_user_created)."""
+    return (
+        db.query(Report)
+        .filter(Report.user_id == user_id)
+        .order_by(Report.created_at.desc(), Report.id.desc())
+    )
+
+
+def reports_query(
+    db: Session,
+    status_filter: Optional[str] = None,
+    category_filter: Optional[str] = None,
+    cluster_filter: Optional[int] = None,
+):
+    """All reports with optional filters, newest first (ix_reports_*_created indexes)."""
+    query = db.query(Report)
+    if status_filter:
+        query = query.filter(Report.status == status_filter)
+    if category_filter:
+        query = query.filter(Report.category == category_filter)
+    if cluster_filter is not None:
+        query = query.filter(Report.cluster_id == cluster_filter)
+    return query.order_by(Report.created_at.desc(), Report.id.desc())
+
+
 # ---------------- User endpoints ----------------
 @router.post("", response_model=ReportResponse, status_code=status.HTTP_201_CREATED)
-def create_report(
+async def create_report(
     payload: ReportCreate,
-    db: Annotated[Session, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_async_db)],
     current_user: CurrentUser,
 ) -> ReportResponse:
-    """Submit a report. Auth required (user or admin). Raw text is sent to AI for translation, formal rewriting, and structuring; result stored as structured_description."""
-    raw_description = payload.description
-    structured_description = None
-    title = payload.title or None
-    institution = payload.institution
-    category = payload.category
-
-    ai_result = process_issue_text(raw_description)
-    if ai_result:
-        structured_description = ai_result.get("structured_description")
-        if ai_result.get("suggested_title"):
-            title = ai_result["suggested_title"]
-        if ai_result.get("suggested_institution"):
-            institution = ai_result["suggested_institution"]
-        if ai_result.get("suggested_category"):
-            category = ai_result["suggested_category"]
-
-    report = Report(
+    """Submit a report. Auth required (user or admin). The report is stored right away; AI translation, formal rewriting, and structuring run in the background queue and fill structured_description later. Near-duplicates of an earlier report get that report's cluster_id."""
+    minhash = dedup.signature(payload.description)
+    cluster_id = await db.run_sync(dedup.find_cluster, minhash, payload.location, payload.category)
+    values = dict(
         user_id=current_user.id,
-        title=title,
+        title=payload.title or None,
         name=payload.name,
         phone=payload.phone,
         location=payload.location,
-        institution=institution,
-        category=category,
-        raw_description=raw_description,
-        structured_description=structured_description,
+        institution=payload.institution,
+        category=payload.category,
+        raw_description=payload.description,
         status="pending",
+        cluster_id=cluster_id,
+        minhash=minhash,
     )
-    db.add(report)
-    db.commit()
-    db.refresh(report)
+    if report_writer.running():
+        # Group commit: the writer thread inserts this with other concurrent reports in one transaction
+        return await asyncio.wrap_future(report_writer.submit(values))
+
+    reports = await db.run_sync(report_writer.insert_reports, [values])
+    await db.commit()
+    report = reports[0]
+    if settings.ai_enabled:
+        notify_workers()
     return report
 
 
 @router.get("/mine", response_model=List[ReportResponse])
-def list_my_reports(
-    db: Annotated[Session, Depends(get_db)],
+async def list_my_reports(
+    response: Response,
+    db: Annotated[AsyncSession, Depends(get_async_db)],
     current_user: CurrentUser,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page (skip is ignored)"),
+    include_total: bool = Query(False, description="Return the report count in X-Total-Count"),
 ) -> List[ReportResponse]:
-    """List reports submitted by the current user."""
-    return (
-        db.query(Report)
-        .filter(Report.user_id == current_user.id)
-        .order_by(Report.created_at.desc())
+    """List reports submitted by the current user. The X-Next-Cursor response header holds the cursor for the next page."""
+    def page(sync_db: Session):
+        query = my_reports_query(sync_db, current_user.id)
+        reports, next_cursor = paginate(sync_db, query, Report.created_at, Report.id, limit, skip, cursor)
+        return reports, next_cursor, count_rows(sync_db, query) if include_total else None
+
+    reports, next_cursor, total = await db.run_sync(page)
+    set_page_headers(response, next_cursor, total)
+    return reports
+
+
+@router.get("/clusters", response_model=List[ReportClusterResponse])
+async def list_clusters(
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    current_admin: CurrentAdmin,
+    min_size: int = Query(2, ge=1, description="Smallest cluster to include"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=200),
+) -> List[ReportClusterResponse]:
+    """List near-duplicate clusters, largest first. Admin only. Use GET /api/reports?cluster_filter=<id> for the reports."""
+    size = func.count(Report.id).label("size")
+    groups = (await db.execute(
+        select(
+            Report.cluster_id,
+            size,
+            func.min(Report.created_at).label("first_reported_at"),
+            func.max(Report.created_at).label("last_reported_at"),
+        )
+        .where(Report.cluster_id.isnot(None))
+        .group_by(Report.cluster_id)
+        .having(size >= min_size)
+        .order_by(size.desc(), Report.cluster_id.desc())
         .offset(skip)
         .limit(limit)
-        .all()
+    )).all()
+    firsts = {
+        r.id: r
+        for r in (await db.scalars(select(Report).where(Report.id.in_([g.cluster_id for g in groups])))).all()
+    } if groups else {}
+    clusters = []
+    for g in groups:
+        first = firsts.get(g.cluster_id)
+        clusters.append(ReportClusterResponse(
+            cluster_id=g.cluster_id,
+            size=g.size,
+            category=first.category if first else "",
+            location=first.location if first else "",
+            title=first.title if first else None,
+            first_reported_at=g.first_reported_at,
+            last_reported_at=g.last_reported_at,
+        ))
+    return clusters
+
+
+@router.get("/stats", response_model=ReportStatsResponse)
+async def get_report_stats(
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    current_admin: CurrentAdmin,
+) -> ReportStatsResponse:
+    """Report counts by status, category and institution, and user totals. Admin only. Read from precomputed counters, so the cost doesn't grow with the number of reports."""
+    return ReportStatsResponse(**await db.run_sync(report_stats.get_stats))
+
+
+@router.get("/search", response_model=List[ReportResponse])
+async def search_reports(
+    response: Response,
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    current_admin: CurrentAdmin,
+    q: str = Query(..., min_length=1, max_length=200, description="Words to find in title, description or location"),
+    status_filter: Optional[str] = Query(None, description="Filter by status"),
+    category_filter: Optional[str] = Query(None, description="Filter by category"),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+) -> List[ReportResponse]:
+    """Full-text search over reports, best match first. Admin only. The X-Next-Cursor response header holds the cursor for the next page."""
+    reports, next_cursor = await db.run_sync(
+        search.search_reports, q, limit, cursor, status_filter, category_filter
     )
+    set_page_headers(response, next_cursor)
+    return reports
+
+
+@router.get("/export")
+async def export_reports(
+    current_admin: CurrentAdmin,
+    fmt: str = Query("csv", alias="format", pattern="^(csv|ndjson)$", description="csv or ndjson"),
+    status_filter: Optional[str] = Query(None, description="Filter by status"),
+    category_filter: Optional[str] = Query(None, description="Filter by category"),
+    gzip: bool = Query(False, description="Send a .gz file compressed on the fly"),
+) -> StreamingResponse:
+    """Download all matching reports as CSV or NDJSON, oldest first. Admin only. Streamed from a server-side cursor, so any number of reports can be exported with constant memory."""
+    filename = f"reports-{datetime.now(timezone.utc):%Y%m%d-%H%M%S}.{fmt}" + (".gz" if gzip else "")
+    return StreamingResponse(
+        export.stream_reports(fmt, status_filter, category_filter, gzip),
+        media_type="application/gzip" if gzip else export.FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+async def _read_body(request: Request, limit: int) -> bytes:
+    """The request body, refused with 413 as soon as it passes `limit` bytes instead of after buffering it all."""
+    too_large = HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Body larger than {limit} bytes; split the file",
+    )
+    declared = request.headers.get("content-length", "")
+    if declared.isdigit() and int(declared) > limit:
+        raise too_large
+    chunks, size = [], 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > limit:
+            raise too_large
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+@router.post("/bulk", response_model=BulkIngestResponse)
+async def bulk_ingest_reports(
+    request: Request,
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    current_admin: CurrentAdmin,
+) -> BulkIngestResponse:
+    """Import many reports at once (field office batches, SMS gateway). Admin only. Body: a JSON array or NDJSON of report objects shaped like POST /api/reports. Every row is validated; valid rows are stored in chunked transactions and invalid ones are listed with their error, so the file never has to be resent whole. AI processing of imported reports starts after BULK_AI_DEFER_SECONDS so it doesn't hold up reports submitted live."""
+    body = await _read_body(request, settings.BULK_INGEST_MAX_BYTES)
+    # Parsing, validation and signatures are CPU-bound: keep them off the event loop
+    try:
+        rows = await run_in_threadpool(bulk_ingest.parse_body, body)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Body must be a JSON array or NDJSON: {e}")
+    if len(rows) > settings.BULK_INGEST_MAX_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.BULK_INGEST_MAX_ROWS} reports per request; split the file",
+        )
+    valid, errors = await run_in_threadpool(bulk_ingest.validate_rows, rows)
+    ids: dict[int, int] = {}
+    size = max(1, settings.BULK_INGEST_CHUNK_SIZE)
+    for start in range(0, len(valid), size):
+        chunk = valid[start:start + size]
+        signatures = await run_in_threadpool(bulk_ingest.sign_chunk, chunk)
+        try:
+            created = await db.run_sync(bulk_ingest.insert_chunk, chunk, signatures)
+            await db.commit()
+        except SQLAlchemyError:
+            # Find the offending rows: retry the chunk one row per transaction
+            await db.rollback()
+            created = []
+            for item, signature in zip(chunk, signatures):
+                try:
+                    created += await db.run_sync(bulk_ingest.insert_chunk, [item], [signature])
+                    await db.commit()
+                except SQLAlchemyError as e:
+                    await db.rollback()
+                    errors[item[0]] = f"Could not be stored: {type(getattr(e, 'orig', None) or e).__name__}"
+        ids.update(created)
+    # No notify_workers(): the AI jobs only become due after BULK_AI_DEFER_SECONDS, workers poll for them
+    results = [BulkIngestRow(index=index, id=ids.get(index), error=errors.get(index)) for index, _, _ in rows]
+    return BulkIngestResponse(received=len(rows), created=len(ids), failed=len(rows) - len(ids), results=results)
+
+
+@router.patch("/bulk", response_model=ReportBulkUpdateResponse)
+async def bulk_update_reports(
+    payload: ReportBulkUpdate,
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    current_admin: CurrentAdmin,
+) -> ReportBulkUpdateResponse:
+    """Set status and/or admin response on many reports at once, e.g. close a duplicate cluster or resolve every report about one outage. Admin only. Target either `ids` or the list filters (status_filter, category_filter, cluster_filter). Applied in one transaction; returns how many reports changed. Citizens get the change in their next digest email."""
+    condition = bulk_update.target_condition(
+        payload.ids, payload.status_filter, payload.category_filter, payload.cluster_filter
+    )
+    updated = await db.run_sync(bulk_update.apply, condition, payload.status, payload.admin_response)
+    await db.commit()
+    return ReportBulkUpdateResponse(updated=updated)
 
 
 @router.get("/{report_id}", response_model=ReportResponse)
-def get_report(
+async def get_report(
     report_id: int,
-    db: Annotated[Session, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_async_db)],
     current_user: CurrentUser,
 ) -> ReportResponse:
     """Get one report by id. Admin can see any; user can see only their own."""
-    report = db.query(Report).filter(Report.id == report_id).first()
+    report = await db.get(Report, report_id)
     if not report:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -95,38 +307,48 @@ def get_report(
 
 # ---------------- Admin endpoints ----------------
 @router.get("", response_model=List[ReportResponse])
-def list_reports(
-    db: Annotated[Session, Depends(get_db)],
+async def list_reports(
+    response: Response,
+    db: Annotated[AsyncSession, Depends(get_async_db)],
     current_admin: CurrentAdmin,
     status_filter: Optional[str] = Query(None, description="Filter by status"),
     category_filter: Optional[str] = Query(None, description="Filter by category"),
+    cluster_filter: Optional[int] = Query(None, description="Only reports in this duplicate cluster"),
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page (skip is ignored)"),
+    include_total: bool = Query(False, description="Return the report count in X-Total-Count"),
 ) -> List[ReportResponse]:
-    """List all reports. Admin only. Optional filters: status, category."""
-    query = db.query(Report)
-    if status_filter:
-        query = query.filter(Report.status == status_filter)
-    if category_filter:
-        query = query.filter(Report.category == category_filter)
-    return query.order_by(Report.created_at.desc()).offset(skip).limit(limit).all()
+    """List all reports. Admin only. Optional filters: status, category, duplicate cluster. The X-Next-Cursor response header holds the cursor for the next page."""
+    def page(sync_db: Session):
+        query = reports_query(sync_db, status_filter, category_filter, cluster_filter)
+        reports, next_cursor = paginate(sync_db, query, Report.created_at, Report.id, limit, skip, cursor)
+        return reports, next_cursor, count_rows(sync_db, query) if include_total else None
+
+    reports, next_cursor, total = await db.run_sync(page)
+    set_page_headers(response, next_cursor, total)
+    return reports
 
 
 @router.patch("/{report_id}", response_model=ReportResponse)
-def update_report(
+async def update_report(
     report_id: int,
     payload: ReportUpdate,
-    db: Annotated[Session, Depends(get_db)],
+    db: Annotated[AsyncSession, Depends(get_async_db)],
     current_admin: CurrentAdmin,
 ) -> ReportResponse:
-    """Update report status and/or admin response. Admin only."""
-    report = db.query(Report).filter(Report.id == report_id).first()
+    """Update report status and/or admin response. Admin only. The citizen gets the change in their next digest email."""
+    # Row lock (PostgreSQL) so two admins changing the same report move the counters once each
+    report = await db.scalar(select(Report).where(Report.id == report_id).with_for_update())
     if not report:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Report not found",
         )
 
+    before = (report.status, report.admin_response)
+    stats_before = report_stats.report_key(report)
+
     # Pydantic now validates status
     if payload.status is not None:
         report.status = payload.status
@@ -134,6 +356,12 @@ def update_report(
     if payload.admin_response is not None:
         report.admin_response = payload.admin_response
 
-    db.commit()
-    db.refresh(report)
+    def record(sync_db: Session) -> None:
+        if (report.status, report.admin_response) != before:
+            notifications.record_change(sync_db, report)
+        report_stats.report_changed(sync_db, stats_before, report)
+
+    await db.run_sync(record)
+    await db.commit()
+    await db.refresh(report)
     return report
@@ -1,32 +1,51 @@
 """
 Users: list (admin only).
 """
-from typing import Annotated, List
+from typing import Annotated, List, Optional
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from core.deps import CurrentAdmin
-from models.base import get_db
-from models.user import User
+from core.pagination import count_rows, paginate, set_page_headers
+from models.base import get_async_db
+from models.user import User, UserRole
 from schemas.auth import UserResponse
 
 router = APIRouter(prefix="/api/users", tags=["users"])
 
 
 @router.get("", response_model=List[UserResponse])
-def list_users(
-    db: Annotated[Session, Depends(get_db)],
+async def list_users(
+    response: Response,
+    db: Annotated[AsyncSession, Depends(get_async_db)],
     current_admin: CurrentAdmin,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=500),
     include_admin: bool = Query(False, description="Include the admin in the list"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page (skip is ignored)"),
+    include_total: bool = Query(False, description="Return the user count in X-Total-Count"),
 ) -> List[User]:
     """
     List all users. Admin only.
     By default, the single admin is excluded unless include_admin=True.
+    The X-Next-Cursor response header holds the cursor for the next page.
     """
+    def page(sync_db: Session):
+        query = users_query(sync_db, include_admin)
+        users, next_cursor = paginate(sync_db, query, User.created_at, User.id, limit, skip, cursor)
+        return users, next_cursor, count_rows(sync_db, query) if include_total else None
+
+    users, next_cursor, total = await db.run_sync(page)
+    set_page_headers(response, next_cursor, total)
+    return users
+
+
+def users_query(db: Session, include_admin: bool = False):
+    """Users newest first, optionally without admins (shared with scripts/check_query_plans.py)."""
     query = db.query(User)
     if not include_admin:
-        query = query.filter(User.role != "Admin")
-    return query.order_by(User.created_at.desc()).offset(skip).limit(limit).all()
+        # Equality, not role != 'Admin': only an equality on the leading column can seek ix_users_role_created
+        query = query.filter(User.role == UserRole.USER.value)
+    return query.order_by(User.created_at.desc(), User.id.desc())
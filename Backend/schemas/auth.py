@@ -38,11 +38,18 @@ class UserLogin(BaseModel):
 
 
 class TokenResponse(BaseModel):
-    """JWT access token response."""
+    """JWT access token response (plus the rotated refresh token from /refresh)."""
 
     access_token: str
     token_type: str = "bearer"
     expires_in_minutes: int
+    refresh_token: str | None = None
+
+
+class RefreshRequest(BaseModel):
+    """Refresh token from login or the previous refresh (for /refresh and /logout)."""
+
+    refresh_token: str = Field(..., min_length=1)
 
 
 class UserResponse(BaseModel):
@@ -66,6 +73,7 @@ class LoginResponse(BaseModel):
     expires_in_minutes: int
     user: UserResponse
     is_admin: bool = False  # True when user.role is Admin – frontend uses this for redirect
+    refresh_token: str | None = None  # exchange at /api/auth/refresh when the access token expires
 
 
 class ForgotPasswordRequest(BaseModel):
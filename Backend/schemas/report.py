@@ -4,7 +4,7 @@ Report request/response schemas. Aligned with frontend form fields.
 from datetime import datetime
 from typing import Optional
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
 
 
 # Allowed values for validation
@@ -61,6 +61,30 @@ class ReportUpdate(BaseModel):
         return v
 
 
+class ReportBulkUpdate(ReportUpdate):
+    """Admin applies one status and/or response to many reports: listed ids, or every report matching the filters."""
+
+    ids: Optional[list[int]] = Field(None, min_length=1, max_length=10_000)
+    status_filter: Optional[str] = None
+    category_filter: Optional[str] = None
+    cluster_filter: Optional[int] = None
+
+    @model_validator(mode="after")
+    def validate_target(self) -> "ReportBulkUpdate":
+        if self.status is None and self.admin_response is None:
+            raise ValueError("Give a status and/or an admin_response to apply")
+        has_filter = self.status_filter or self.category_filter or self.cluster_filter is not None
+        if (self.ids is None) == (not has_filter):
+            raise ValueError("Give either ids or at least one filter (status_filter, category_filter, cluster_filter)")
+        return self
+
+
+class ReportBulkUpdateResponse(BaseModel):
+    """Number of reports the bulk update changed (already matching reports are left alone)."""
+
+    updated: int
+
+
 class ReportResponse(BaseModel):
     """Single report – for list and detail."""
 
@@ -76,7 +100,51 @@ class ReportResponse(BaseModel):
     structured_description: Optional[str] = None
     admin_response: Optional[str] = None
     status: str
+    priority: Optional[str] = None
+    ai_status: Optional[str] = None
+    cluster_id: Optional[int] = None
     created_at: datetime
+    updated_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
+
+
+class ReportClusterResponse(BaseModel):
+    """A group of near-duplicate reports (same issue reported several times)."""
+
+    cluster_id: int
+    size: int
+    category: str
+    location: str
+    title: Optional[str] = None
+    first_reported_at: datetime
+    last_reported_at: datetime
+
+
+class ReportStatsResponse(BaseModel):
+    """Dashboard counters (GET /api/reports/stats)."""
+
+    total_reports: int
+    by_status: dict[str, int]
+    by_category: dict[str, int]
+    by_institution: dict[str, int]
+    total_users: int
+    users_by_role: dict[str, int]
+
+
+class BulkIngestRow(BaseModel):
+    """Outcome of one submitted row: the new report id, or why it was rejected."""
+
+    index: int
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+
+class BulkIngestResponse(BaseModel):
+    """POST /api/reports/bulk result, one entry per submitted row in input order."""
+
+    received: int
+    created: int
+    failed: int
+    results: list[BulkIngestRow]
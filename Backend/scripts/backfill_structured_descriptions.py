@@ -0,0 +1,185 @@
+"""
+Backfill AI structuring for reports that never got it (structured_description IS NULL),
+e.g. reports created while OPENAI_API_KEY was unset or AI calls were failing.
+Run from Backend folder: python -m scripts.backfill_structured_descriptions
+
+- Walks reports by id (keyset pages, no OFFSET) and skips rows the AI queue is
+  still processing.
+- Runs process_issue_text on a bounded thread pool, rate limited to --rate calls/s.
+- Writes results back with one batched UPDATE per page and records the last
+  finished id in a checkpoint file, so a crashed run resumes where it stopped.
+  Use --reset to start over from the first report.
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from sqlalchemy import or_, update
+
+from core.config import settings
+from models.base import SessionLocal
+from models.report import Report
+from services import report_stats
+from services.ai_processor import process_issue_text
+from services.ai_queue import AI_STATUS_DONE, AI_STATUS_PROCESSING
+
+DEFAULT_CHECKPOINT = Path(__file__).resolve().parent.parent / "data" / "backfill_checkpoint.json"
+
+
+class RateLimiter:
+    """Token bucket shared by worker threads: at most `rate` acquisitions per second."""
+
+    def __init__(self, rate: float) -> None:
+        self.rate = rate
+        self._tokens = 1.0
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(1.0, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                wait = (1.0 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def load_checkpoint(path: Path) -> int:
+    try:
+        return int(json.loads(path.read_text(encoding="utf-8"))["last_id"])
+    except (OSError, ValueError, KeyError):
+        return 0
+
+
+def save_checkpoint(path: Path, last_id: int) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps({"last_id": last_id, "saved_at": time.time()}), encoding="utf-8")
+    tmp.replace(path)  # atomic, so a crash never leaves a half-written checkpoint
+
+
+def fetch_page(after_id: int, page_size: int) -> list:
+    db = SessionLocal()
+    try:
+        return (
+            db.query(Report.id, Report.raw_description, Report.title, Report.status, Report.category, Report.institution)
+            .filter(
+                Report.id > after_id,
+                Report.structured_description.is_(None),
+                or_(Report.ai_status.is_(None), Report.ai_status != AI_STATUS_PROCESSING),
+            )
+            .order_by(Report.id)
+            .limit(page_size)
+            .all()
+        )
+    finally:
+        db.close()
+
+
+def write_results(rows: list[dict], stat_changes: list) -> None:
+    """One UPDATE ... WHERE id = :id executed for all rows of the page, with the dashboard counter moves."""
+    if not rows:
+        return
+    db = SessionLocal()
+    try:
+        db.execute(update(Report), rows)
+        report_stats.reports_changed(db, stat_changes)
+        db.commit()
+    finally:
+        db.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Backfill structured_description for reports missing it")
+    parser.add_argument("--workers", type=int, default=4, help="concurrent AI calls (default 4)")
+    parser.add_argument("--rate", type=float, default=5.0, help="max AI calls per second, 0 = unlimited (default 5)")
+    parser.add_argument("--page-size", type=int, default=100, help="reports per page / UPDATE batch (default 100)")
+    parser.add_argument("--limit", type=int, default=0, help="stop after this many reports (default: all)")
+    parser.add_argument("--checkpoint", type=Path, default=DEFAULT_CHECKPOINT)
+    parser.add_argument("--reset", action="store_true", help="ignore the checkpoint and start from the first report")
+    args = parser.parse_args()
+
+    if not settings.ai_enabled:
+        print("OPENAI_API_KEY is not set; nothing to do.")
+        sys.exit(1)
+
+    last_id = 0 if args.reset else load_checkpoint(args.checkpoint)
+    if last_id:
+        print(f"Resuming after report id {last_id} (checkpoint {args.checkpoint})")
+
+    limiter = RateLimiter(args.rate)
+
+    def process(text: str):
+        limiter.acquire()
+        return process_issue_text(text)
+
+    processed = updated = failed = 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        while True:
+            page_size = args.page_size
+            if args.limit:
+                page_size = min(page_size, args.limit - processed)
+                if page_size <= 0:
+                    break
+            page = fetch_page(last_id, page_size)
+            if not page:
+                break
+
+            results = list(pool.map(process, [row.raw_description for row in page]))
+            updates = []
+            stat_changes = []
+            for row, ai_result in zip(page, results):
+                if not ai_result or not ai_result.get("structured_description"):
+                    failed += 1
+                    continue
+                updates.append({
+                    "id": row.id,
+                    "structured_description": ai_result["structured_description"],
+                    "title": ai_result.get("suggested_title") or row.title,
+                    "category": ai_result.get("suggested_category") or row.category,
+                    "institution": ai_result.get("suggested_institution") or row.institution,
+                    "ai_status": AI_STATUS_DONE,
+                })
+                stat_changes.append((
+                    (row.status, row.category, row.institution),
+                    (row.status, updates[-1]["category"], updates[-1]["institution"]),
+                ))
+            write_results(updates, stat_changes)
+
+            processed += len(page)
+            updated += len(updates)
+            last_id = page[-1].id
+            save_checkpoint(args.checkpoint, last_id)
+
+            elapsed = time.perf_counter() - start
+            print(
+                f"up to id {last_id}: processed={processed} updated={updated} failed={failed} "
+                f"({processed / elapsed:.1f} reports/s)"
+            )
+
+    elapsed = time.perf_counter() - start
+    rate = processed / elapsed if elapsed else 0.0
+    print(f"Done: processed={processed} updated={updated} failed={failed} in {elapsed:.1f}s ({rate:.1f} reports/s)")
+    if failed:
+        print("Failed reports keep structured_description = NULL; rerun with --reset to retry them.")
+
+
+if __name__ == "__main__":
+    main()
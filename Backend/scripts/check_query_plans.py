@@ -0,0 +1,111 @@
+"""
+Check that the list endpoints are served by indexes, not a full scan plus sort.
+Run from Backend folder: python -m scripts.check_query_plans
+Exits with code 1 if any plan scans a table without an index or sorts rows.
+
+The queries are the ones the routers build (routers.reports / routers.users
+query builders), EXPLAINed against the configured database. On PostgreSQL
+sequential scans are disabled for the check, so it verifies an index *can*
+serve the query even when the planner would pick a seq scan on a small table.
+"""
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from sqlalchemy import text
+
+from core.config import settings
+from core.pagination import after_cursor, encode_cursor
+from models.base import SessionLocal
+from models.report import Report
+from models.user import User
+from routers.reports import my_reports_query, reports_query
+from routers.users import users_query
+
+
+def hot_queries(db):
+    """(label, query) pairs with the filters and page size the endpoints use, first page and cursor page."""
+    cursor = encode_cursor("2024-01-01 00:00:00", 1000)
+    queries = [
+        ("list_my_reports", my_reports_query(db, 1), Report),
+        ("list_reports", reports_query(db), Report),
+        ("list_reports?status_filter", reports_query(db, status_filter="pending"), Report),
+        ("list_reports?category_filter", reports_query(db, category_filter="water"), Report),
+        ("list_users", users_query(db), User),
+        ("list_users?include_admin", users_query(db, include_admin=True), User),
+    ]
+    pairs = []
+    for label, query, model in queries:
+        pairs.append((label, query.limit(50)))
+        pairs.append((f"{label} (cursor)", after_cursor(db, query, model.created_at, model.id, cursor).limit(50)))
+    return pairs
+
+
+def _sql(db, query) -> str:
+    return str(query.statement.compile(dialect=db.bind.dialect, compile_kwargs={"literal_binds": True}))
+
+
+def sqlite_problems(db, sql: str) -> tuple[list[str], list[str]]:
+    plan = [row[-1] for row in db.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+    problems = []
+    for step in plan:
+        if step.startswith("SCAN") and "INDEX" not in step:
+            problems.append(f"full scan: {step}")
+        if "TEMP B-TREE" in step:
+            problems.append(f"sort: {step}")
+    return plan, problems
+
+
+def _pg_nodes(node: dict):
+    yield node
+    for child in node.get("Plans", []):
+        yield from _pg_nodes(child)
+
+
+def postgres_problems(db, sql: str) -> tuple[list[str], list[str]]:
+    raw = db.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+    root = (json.loads(raw) if isinstance(raw, str) else raw)[0]["Plan"]
+    plan, problems = [], []
+    for node in _pg_nodes(root):
+        label = node["Node Type"] + (f" on {node['Relation Name']}" if "Relation Name" in node else "")
+        if "Index Name" in node:
+            label += f" using {node['Index Name']}"
+        plan.append(label)
+        if node["Node Type"] == "Seq Scan":
+            problems.append(f"full scan: {label}")
+        if node["Node Type"] in ("Sort", "Incremental Sort"):
+            problems.append(f"sort: {label}")
+    return plan, problems
+
+
+def main() -> int:
+    is_sqlite = "sqlite" in settings.DATABASE_URL
+    db = SessionLocal()
+    failed = 0
+    try:
+        if not is_sqlite:
+            db.execute(text("SET enable_seqscan = off"))
+        for label, query in hot_queries(db):
+            sql = _sql(db, query)
+            plan, problems = sqlite_problems(db, sql) if is_sqlite else postgres_problems(db, sql)
+            print(f"{'FAIL' if problems else 'ok  '} {label}: {' | '.join(plan)}")
+            for problem in problems:
+                print(f"       {problem}")
+            failed += bool(problems)
+    finally:
+        db.rollback()
+        db.close()
+    if failed:
+        print(f"{failed} query plan(s) need an index. Run: python -m scripts.migrate")
+        return 1
+    print("All list queries are index-backed.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
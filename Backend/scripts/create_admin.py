@@ -10,6 +10,7 @@ load_dotenv()
 from models.base import init_db, SessionLocal
 from models.user import User
 from core.security import hash_password
+from services import report_stats
 
 
 def main() -> None:
@@ -52,6 +53,7 @@ def main() -> None:
         role="Admin",
     )
     db.add(user)
+    report_stats.user_created(db, user)
     db.commit()
     db.refresh(user)
     db.close()
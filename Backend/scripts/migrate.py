@@ -0,0 +1,69 @@
+"""
+Apply pending schema migrations (migrations/versions.py) and record them in schema_version.
+Run from Backend folder: python -m scripts.migrate
+
+    python -m scripts.migrate --status        applied and pending versions
+    python -m scripts.migrate --dry-run       print the statements and backfill row counts, change nothing
+    python -m scripts.migrate --to 6          stop after version 6
+    python -m scripts.migrate --batch-size 2000 --pause-ms 200   gentler backfills on a busy database
+
+Missing tables are created first (init_db), then each pending version runs in
+order with its duration printed. Data backfills update --batch-size rows per
+transaction and sleep --pause-ms between batches, so the API keeps writing to
+reports while a large table is migrated. Works with SQLite and PostgreSQL.
+Safe to run multiple times.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from migrations.runner import applied_versions, migrate
+from migrations.versions import MIGRATIONS
+from models.base import engine, init_db
+
+
+def print_status() -> None:
+    with engine.connect() as conn:
+        done = applied_versions(conn)
+    for migration in MIGRATIONS:
+        row = done.get(migration.version)
+        state = f"applied {row['applied_at']} ({row['duration_ms']} ms)" if row else "pending"
+        print(f"{migration.version:04d} {migration.name:<30} {state}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Apply pending schema migrations")
+    parser.add_argument("--status", action="store_true", help="list applied and pending versions, change nothing")
+    parser.add_argument("--dry-run", action="store_true", help="print what would run, change nothing")
+    parser.add_argument("--to", type=int, default=None, help="last version to apply (default: all)")
+    parser.add_argument("--batch-size", type=int, default=5000, help="rows per backfill transaction (default 5000)")
+    parser.add_argument("--pause-ms", type=float, default=50, help="sleep between backfill batches (default 50)")
+    args = parser.parse_args()
+
+    if args.status:
+        print_status()
+        return 0
+    start = time.perf_counter()
+    if not args.dry_run:
+        init_db()
+    applied = migrate(
+        engine,
+        MIGRATIONS,
+        target=args.to,
+        dry_run=args.dry_run,
+        batch_size=args.batch_size,
+        batch_pause=args.pause_ms / 1000,
+    )
+    verb = "Would apply" if args.dry_run else "Applied"
+    print(f"{verb} {len(applied)} migration(s) in {time.perf_counter() - start:.2f}s.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
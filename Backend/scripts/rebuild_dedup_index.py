@@ -0,0 +1,45 @@
+"""
+Store MinHash signatures and LSH buckets (report_dedup_buckets) for
+near-duplicate detection. Run from Backend folder: python -m scripts.rebuild_dedup_index
+
+The API indexes every report it stores; run this for reports inserted
+directly in the database, or with --all after changing DEDUP_BANDS,
+DEDUP_ROWS or DEDUP_SHINGLE_SIZE (signatures and buckets of the old
+parameters no longer match new reports). --all clears the buckets first, so
+reports submitted while it runs may miss their duplicates. Cluster ids
+already assigned are kept.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from core.config import settings
+from models.base import engine, init_db
+from services import dedup
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Index reports for near-duplicate detection")
+    parser.add_argument("--all", action="store_true", help="re-index every report (after changing DEDUP_* parameters)")
+    parser.add_argument("--batch-size", type=int, default=1000, help="reports per transaction (default 1000)")
+    args = parser.parse_args()
+
+    if not settings.DEDUP_ENABLED:
+        print("DEDUP_ENABLED is off; nothing to do.")
+        return 1
+    init_db()
+    start = time.perf_counter()
+    with engine.connect() as conn:
+        count = dedup.backfill(conn, batch_size=max(1, args.batch_size), everything=args.all)
+    print(f"Indexed {count} reports in {time.perf_counter() - start:.1f}s.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
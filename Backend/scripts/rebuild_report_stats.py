@@ -0,0 +1,59 @@
+"""
+Recompute the dashboard counters (report_stats table) from the reports and users tables.
+Run from Backend folder: python -m scripts.rebuild_report_stats
+
+The API keeps the counters up to date itself; run this after changing reports
+or users directly in the database (SQL, imports, deletes), or to check for drift
+with --check (prints differences, changes nothing, exit code 1 if any).
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from models.base import init_db, SessionLocal
+from services import report_stats
+
+
+def _flatten(stats: dict) -> dict[str, int]:
+    flat = {"total_reports": stats["total_reports"], "total_users": stats["total_users"]}
+    for group in ("by_status", "by_category", "by_institution", "users_by_role"):
+        for value, count in stats[group].items():
+            flat[f"{group}.{value}"] = count
+    return flat
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Rebuild the report_stats counters")
+    parser.add_argument("--check", action="store_true", help="only compare stored counters with a fresh count")
+    args = parser.parse_args()
+
+    init_db()
+    db = SessionLocal()
+    try:
+        stored = _flatten(report_stats.get_stats(db))
+        fresh = _flatten(report_stats.rebuild(db))
+        diffs = {
+            key: (stored.get(key, 0), fresh.get(key, 0))
+            for key in sorted(set(stored) | set(fresh))
+            if stored.get(key, 0) != fresh.get(key, 0)
+        }
+        for key, (old, new) in diffs.items():
+            print(f"{key}: stored {old}, actual {new}")
+        if args.check:
+            db.rollback()
+            print("Counters match." if not diffs else f"{len(diffs)} counter(s) drifted; run without --check to fix.")
+            return 1 if diffs else 0
+        db.commit()
+        print(f"Rebuilt counters: {fresh['total_reports']} reports, {fresh['total_users']} users ({len(diffs)} corrected).")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,53 @@
+"""
+Retrain the local category/institution classifier from existing reports.
+Run from Backend folder: python -m scripts.train_classifier
+
+Writes the model to AI_CLASSIFIER_PATH (default: data/classifier.json).
+Restart the API (or its workers) afterwards to load the new model.
+"""
+import os
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from models.base import SessionLocal
+from models.report import Report
+from services import classifier
+
+
+def main() -> None:
+    db = SessionLocal()
+    start = time.perf_counter()
+    rows = []
+    try:
+        query = (
+            db.query(Report.raw_description, Report.category, Report.institution)
+            .execution_options(yield_per=1000)
+        )
+        for raw_description, category, institution in query:
+            rows.append((raw_description, category, institution))
+    finally:
+        db.close()
+
+    model = classifier.train(rows)
+    path = classifier.save(model)
+    print(f"Trained on {len(rows)} reports (+ seed keywords) in {time.perf_counter() - start:.2f}s")
+    print(f"Model saved to {path}")
+
+    if rows:
+        classifier.reload_model()
+        correct = 0
+        for text, category, _ in rows:
+            if classifier.classify(text)["category"] == category:
+                correct += 1
+        print(f"Category accuracy on training reports: {correct / len(rows):.1%}")
+        print("Reports per category:", dict(Counter(c for _, c, _ in rows)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Content-addressed cache for AI results.
+
+Citizens often submit the same complaint many times (copy-pasted text about one
+water outage, for example). Results are keyed on sha256(model, prompt version,
+normalized text) and kept in two tiers:
+  1. an in-process LRU with TTL (no I/O),
+  2. the ai_cache table, shared by all workers and kept across restarts.
+"""
+import hashlib
+import json
+import logging
+import re
+import threading
+import unicodedata
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Optional
+
+from sqlalchemy.exc import IntegrityError
+
+from core.cache import TTLCache
+from core.config import settings
+from models.ai_cache import AICacheEntry
+from models.base import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+_NON_WORD = re.compile(r"[\W_]+", re.UNICODE)
+
+
+def normalize_text(text: str) -> str:
+    """Case-fold and drop punctuation/extra whitespace so near-identical texts share a key."""
+    text = unicodedata.normalize("NFKC", text).casefold()
+    return _NON_WORD.sub(" ", text).strip()
+
+
+def cache_key(raw_text: str, model: str, prompt_version: str) -> str:
+    """sha256 hex of model, prompt version and normalized text."""
+    material = f"{model}\x00{prompt_version}\x00{normalize_text(raw_text)}"
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+_memory = TTLCache(settings.AI_CACHE_MAX_ENTRIES, settings.AI_CACHE_TTL_SECONDS)
+_stats_lock = threading.Lock()
+_stats = {"memory_hits": 0, "db_hits": 0, "misses": 0, "stores": 0}
+
+
+def _count(name: str) -> None:
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def get(key: str, validate: Callable[[dict[str, Any]], dict[str, Any]]) -> Optional[dict[str, Any]]:
+    """
+    Look up a cached result: memory first, then the ai_cache table.
+    DB hits are re-validated with `validate` and promoted to memory.
+    Returns a copy so callers can't mutate the cached value.
+    """
+    if not settings.AI_CACHE_ENABLED:
+        return None
+
+    value = _memory.get(key)
+    if value is not None:
+        _count("memory_hits")
+        return dict(value)
+
+    db = SessionLocal()
+    try:
+        entry = db.get(AICacheEntry, key)
+        if entry is not None:
+            created = entry.created_at
+            if created is not None and created.tzinfo is None:
+                created = created.replace(tzinfo=timezone.utc)
+            fresh = created is None or (
+                datetime.now(timezone.utc) - created < timedelta(seconds=settings.AI_CACHE_TTL_SECONDS)
+            )
+            if fresh:
+                value = validate(json.loads(entry.result))
+                _memory.set(key, value)
+                _count("db_hits")
+                return dict(value)
+    except Exception as e:
+        # Cache problems must never block processing
+        logger.warning("AI cache lookup failed: %s", e, exc_info=settings.DEBUG)
+    finally:
+        db.close()
+
+    _count("misses")
+    return None
+
+
+def put(key: str, result: dict[str, Any], model: str, prompt_version: str) -> None:
+    """Store a validated result in both tiers."""
+    if not settings.AI_CACHE_ENABLED:
+        return
+    _memory.set(key, dict(result))
+    _count("stores")
+
+    db = SessionLocal()
+    try:
+        entry = db.get(AICacheEntry, key)
+        if entry is None:
+            db.add(AICacheEntry(
+                cache_key=key,
+                model=model,
+                prompt_version=prompt_version,
+                result=json.dumps(result),
+            ))
+        else:
+            # Expired entry being refreshed
+            entry.result = json.dumps(result)
+            entry.created_at = datetime.now(timezone.utc)
+        db.commit()
+    except IntegrityError:
+        # Another worker stored the same key first
+        db.rollback()
+    except Exception as e:
+        db.rollback()
+        logger.warning("AI cache store failed: %s", e, exc_info=settings.DEBUG)
+    finally:
+        db.close()
+
+
+def stats() -> dict[str, Any]:
+    """Hit/miss counters since process start plus current memory tier size."""
+    with _stats_lock:
+        data = dict(_stats)
+    lookups = data["memory_hits"] + data["db_hits"] + data["misses"]
+    data["hit_ratio"] = round((data["memory_hits"] + data["db_hits"]) / lookups, 4) if lookups else None
+    data["memory_entries"] = len(_memory)
+    data["enabled"] = settings.AI_CACHE_ENABLED
+    return data
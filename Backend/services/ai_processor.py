@@ -9,9 +9,12 @@ structured_description and optional title/category/institution come from here.
 """
 import json
 import logging
+import threading
+import time
 from typing import Any, Optional
 
 from core.config import settings
+from services import ai_cache, ai_usage, classifier
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +28,9 @@ ALLOWED_INSTITUTIONS = {
     "mininfra", "mineduc", "minisante", "localGov", "other",
 }
 
+# Bump whenever SYSTEM_PROMPT or the output format changes so cached results are not reused
+PROMPT_VERSION = "1"
+
 SYSTEM_PROMPT = """You are a civic issue processing assistant for PublicVoice, a platform used in Rwanda.
 
 Your task is to process citizen-submitted issue text that may be:
@@ -58,6 +64,10 @@ def process_issue_text(raw_text: str) -> Optional[dict[str, Any]]:
       - suggested_institution: str (only if in ALLOWED_INSTITUTIONS)
 
     Returns None if AI is disabled, API key missing, or the request fails.
+    Once AI_DAILY_TOKEN_BUDGET is used up, returns a degraded local-only result
+    ("degraded": True, no structured_description) instead of calling the API.
+    Identical (normalized) texts are served from ai_cache without calling the API,
+    and clear English texts the local classifier is confident about skip it too.
     """
     if not getattr(settings, "OPENAI_API_KEY", None) or not settings.OPENAI_API_KEY.strip():
         logger.info(
@@ -66,38 +76,235 @@ def process_issue_text(raw_text: str) -> Optional[dict[str, Any]]:
         )
         return None
 
+    local = classifier.try_local(raw_text)
+    if local is not None:
+        return local
+
+    model = _model_name()
+    key = ai_cache.cache_key(raw_text, model, PROMPT_VERSION)
+    cached = ai_cache.get(key, _validate_and_normalize)
+    if cached is not None:
+        return cached
+    if ai_usage.budget_exhausted():
+        return _degraded_result(raw_text)
+    return _process_uncached(raw_text, key, model)
+
+
+def _degraded_result(raw_text: str) -> dict[str, Any]:
+    """
+    Non-AI result once the daily token budget is used up: local category and
+    institution suggestions only, no structured_description (the backfill
+    script can structure these reports later).
+    """
+    result = classifier.suggest(raw_text)
+    result["degraded"] = True
+    return result
+
+
+def _trim_input(raw_text: str) -> str:
+    """Cut oversized texts to AI_MAX_INPUT_CHARS so one report can't blow up latency and cost."""
+    limit = settings.AI_MAX_INPUT_CHARS
+    if limit <= 0 or len(raw_text) <= limit:
+        return raw_text
+    return raw_text[:limit].rstrip() + " [...]"
+
+
+def _process_uncached(raw_text: str, key: str, model: str) -> Optional[dict[str, Any]]:
+    """Call the API for one text and cache a successful result."""
     try:
-        return _call_openai(raw_text)
+        result = _call_openai(raw_text)
+    except ProviderUnavailable:
+        logger.info("AI call skipped: provider circuit breaker is open")
+        return None
     except Exception as e:
         logger.warning("AI processing failed: %s", e, exc_info=settings.DEBUG)
         return None
+    if result:
+        ai_cache.put(key, result, model, PROMPT_VERSION)
+    return result
 
 
-def _call_openai(raw_text: str) -> Optional[dict[str, Any]]:
-    """Call OpenAI (or compatible) API and return validated structured result."""
-    try:
-        from openai import OpenAI
-    except ImportError:
-        logger.warning("openai package not installed; pip install openai")
-        return None
+def _model_name() -> str:
+    return getattr(settings, "OPENAI_MODEL", "gpt-4o-mini") or "gpt-4o-mini"
+
+
+# Process-wide OpenAI client: one connection pool with keep-alive, reused by every call
+_client = None
+_client_lock = threading.Lock()
 
-    client = OpenAI(
+
+def _build_client():
+    """Create an OpenAI client with pool size, timeouts and keep-alive from settings."""
+    import httpx
+    from openai import OpenAI
+
+    http_client = httpx.Client(
+        limits=httpx.Limits(
+            max_connections=settings.OPENAI_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.OPENAI_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+        timeout=httpx.Timeout(
+            settings.OPENAI_TIMEOUT_SECONDS,
+            connect=settings.OPENAI_CONNECT_TIMEOUT_SECONDS,
+        ),
+        follow_redirects=True,
+    )
+    return OpenAI(
         api_key=settings.OPENAI_API_KEY,
         base_url=getattr(settings, "OPENAI_API_BASE", None) or None,
+        max_retries=settings.OPENAI_MAX_RETRIES,
+        http_client=http_client,
     )
-    model = getattr(settings, "OPENAI_MODEL", "gpt-4o-mini") or "gpt-4o-mini"
 
-    user_content = f"Process this citizen issue text and output only the JSON object.\n\n---\n{raw_text}\n---"
 
-    response = client.chat.completions.create(
-        model=model,
-        messages=[
-            {"role": "system", "content": SYSTEM_PROMPT},
+def init_client() -> None:
+    """Create the shared client (called once at app startup)."""
+    try:
+        get_client()
+    except ImportError:
+        logger.warning("openai package not installed; pip install openai")
+
+
+def get_client():
+    """Return the shared client, creating it on first use (e.g. from scripts)."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = _build_client()
+    return _client
+
+
+def close_client() -> None:
+    """Close the shared client's connection pool (called at app shutdown)."""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+
+
+class ProviderUnavailable(Exception):
+    """Raised instead of calling the provider while the circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Stops calling the AI provider after `failure_threshold` consecutive failures.
+    After `reset_seconds` one probe call is let through (half-open): success
+    closes the breaker, failure opens it again.
+    """
+
+    # Admission token for calls let through while the breaker is closed
+    ADMITTED = object()
+
+    def __init__(self, failure_threshold: int, reset_seconds: float) -> None:
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self._state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        # Token of the half-open probe call in flight, if any
+        self._probe: Optional[object] = None
+        self._lock = threading.Lock()
+
+    def allow(self) -> Optional[object]:
+        """Admission token if a call may go ahead now (reserving the probe when half-open), else None."""
+        with self._lock:
+            if self._state == "closed":
+                return self.ADMITTED
+            if self._state == "open" and time.monotonic() - self._opened_at >= self.reset_seconds:
+                self._state = "half_open"
+                self._probe = None
+            if self._state == "half_open" and self._probe is None:
+                self._probe = object()
+                return self._probe
+            return None
+
+    def available(self) -> bool:
+        """Whether a call would be allowed now (without reserving the probe)."""
+        with self._lock:
+            if self._state == "open":
+                return time.monotonic() - self._opened_at >= self.reset_seconds
+            return not (self._state == "half_open" and self._probe is not None)
+
+    def release_probe(self, token: Optional[object]) -> None:
+        """Give back the probe slot `token` reserved if the call never reached the provider."""
+        with self._lock:
+            if token is not None and token is self._probe:
+                self._probe = None
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = "closed"
+            self._failures = 0
+            self._probe = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == "half_open" or self._failures >= self.failure_threshold:
+                if self._state != "open":
+                    logger.warning("AI provider circuit breaker opened after %s failure(s)", self._failures)
+                self._state = "open"
+                self._opened_at = time.monotonic()
+                self._probe = None
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            retry_in = None
+            if self._state == "open":
+                retry_in = max(0.0, self.reset_seconds - (time.monotonic() - self._opened_at))
+            return {
+                "state": self._state,
+                "consecutive_failures": self._failures,
+                "retry_in_seconds": retry_in,
+            }
+
+
+_breaker = CircuitBreaker(settings.AI_BREAKER_FAILURE_THRESHOLD, settings.AI_BREAKER_RESET_SECONDS)
+# At most AI_MAX_CONCURRENCY model calls at once across all threads (queue workers, backfill, batch calls)
+_call_slots = threading.BoundedSemaphore(max(1, settings.AI_MAX_CONCURRENCY))
+_in_flight = 0
+_in_flight_lock = threading.Lock()
+
+
+def _track_in_flight(delta: int) -> None:
+    global _in_flight
+    with _in_flight_lock:
+        _in_flight += delta
+
+
+def provider_available() -> bool:
+    """False while the circuit breaker is open (queue workers then leave jobs alone)."""
+    return _breaker.available()
+
+
+def provider_stats() -> dict[str, Any]:
+    """Breaker state and in-flight model calls, for monitoring."""
+    return {
+        "breaker": _breaker.snapshot(),
+        "in_flight": _in_flight,
+        "max_concurrency": settings.AI_MAX_CONCURRENCY,
+        "deadline_seconds": settings.AI_CALL_DEADLINE_SECONDS,
+    }
+
+
+def _chat_kwargs(user_content: str, system_prompt: str, max_tokens: int) -> dict[str, Any]:
+    return {
+        "model": _model_name(),
+        "messages": [
+            {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_content},
         ],
-        temperature=0.2,
-        max_tokens=1024,
-    )
+        "temperature": 0.2,
+        "max_tokens": max_tokens,
+    }
+
+
+def _reply_text(response: Any) -> Optional[str]:
+    """Reply text of a chat completion, code fences stripped."""
     choice = response.choices[0] if response.choices else None
     if not choice or not choice.message or not choice.message.content:
         logger.warning("Empty response from AI")
@@ -112,16 +319,210 @@ def _call_openai(raw_text: str) -> Optional[dict[str, Any]]:
         if lines and lines[-1].strip() == "```":
             lines = lines[:-1]
         content = "\n".join(lines)
+    return content
+
+
+def _create(client, kwargs: dict[str, Any], deadline: float):
+    """chat.completions.create with up to OPENAI_MAX_RETRIES retries, all within `deadline`."""
+    import openai
+
+    # Worth another attempt (connection errors include timeouts); the client's own retries are off
+    retryable = (openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError)
+    attempt = 0
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError(f"AI call exceeded {settings.AI_CALL_DEADLINE_SECONDS}s deadline")
+        try:
+            return client.with_options(timeout=remaining, max_retries=0).chat.completions.create(**kwargs)
+        except Exception as e:
+            if attempt >= settings.OPENAI_MAX_RETRIES or not isinstance(e, retryable):
+                raise
+            backoff = min(0.5 * 2 ** attempt, 8.0)
+            if deadline - time.monotonic() <= backoff:
+                raise
+            time.sleep(backoff)
+            attempt += 1
 
+
+def _chat(user_content: str, system_prompt: str, max_tokens: int) -> Optional[str]:
+    """
+    Send one chat completion and return the reply text (code fences stripped).
+    Waits for one of AI_MAX_CONCURRENCY slots and gives up after
+    AI_CALL_DEADLINE_SECONDS, queueing and retries included (TimeoutError).
+    """
+    try:
+        client = get_client()
+    except ImportError:
+        logger.warning("openai package not installed; pip install openai")
+        return None
+    deadline = time.monotonic() + settings.AI_CALL_DEADLINE_SECONDS
+    admission = _breaker.allow()
+    if admission is None:
+        raise ProviderUnavailable("AI provider circuit breaker is open")
+    if not _call_slots.acquire(timeout=settings.AI_CALL_DEADLINE_SECONDS):
+        # Our own queueing, not the provider: doesn't count against the breaker
+        _breaker.release_probe(admission)
+        raise TimeoutError(f"No AI call slot within {settings.AI_CALL_DEADLINE_SECONDS}s")
+
+    kwargs = _chat_kwargs(user_content, system_prompt, max_tokens)
+    _track_in_flight(1)
+    start = time.perf_counter()
+    try:
+        response = _create(client, kwargs, deadline)
+    except Exception:
+        ai_usage.record(kwargs["model"], None, time.perf_counter() - start, ok=False)
+        _breaker.record_failure()
+        raise
+    finally:
+        _track_in_flight(-1)
+        _call_slots.release()
+    ai_usage.record(kwargs["model"], getattr(response, "usage", None), time.perf_counter() - start)
+    _breaker.record_success()
+    return _reply_text(response)
+
+
+def _single_user_content(raw_text: str) -> str:
+    return f"Process this citizen issue text and output only the JSON object.\n\n---\n{_trim_input(raw_text)}\n---"
+
+
+def _parse_single(content: Optional[str]) -> Optional[dict[str, Any]]:
+    if content is None:
+        return None
     try:
         data = json.loads(content)
     except json.JSONDecodeError as e:
         logger.warning("AI returned invalid JSON: %s", e)
         return None
-
     return _validate_and_normalize(data)
 
 
+def _call_openai(raw_text: str) -> Optional[dict[str, Any]]:
+    """Call OpenAI (or compatible) API and return validated structured result."""
+    return _parse_single(_chat(_single_user_content(raw_text), SYSTEM_PROMPT, max_tokens=settings.AI_MAX_OUTPUT_TOKENS))
+
+
+# ---------------- Batch mode ----------------
+BATCH_SYSTEM_PROMPT = SYSTEM_PROMPT + """
+
+BATCH MODE: you will receive several citizen texts, each introduced by a line "### id: <id>".
+Process each one independently as described above and output ONLY a JSON array with one object per text,
+in any order. Each object must have an "id" key (the id given, as a string) plus the four keys above."""
+
+
+def _estimate_tokens(text: str) -> int:
+    """Rough token count (about 4 characters per token) for batch budgeting."""
+    return len(text) // 4 + 1
+
+
+def _chunk_batch(items: dict[str, str]) -> list[dict[str, str]]:
+    """Split items into chunks bounded by AI_BATCH_SIZE and AI_BATCH_MAX_INPUT_TOKENS."""
+    chunks: list[dict[str, str]] = []
+    current: dict[str, str] = {}
+    tokens = 0
+    for key, text in items.items():
+        cost = _estimate_tokens(_trim_input(text))
+        if current and (
+            len(current) >= settings.AI_BATCH_SIZE
+            or tokens + cost > settings.AI_BATCH_MAX_INPUT_TOKENS
+        ):
+            chunks.append(current)
+            current, tokens = {}, 0
+        current[key] = text
+        tokens += cost
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _call_openai_batch(items: dict[str, str]) -> Optional[dict[str, dict[str, Any]]]:
+    """
+    One chat completion for several texts. Returns {id: validated result} for
+    the items the model answered, or None if the reply is not a usable array.
+    """
+    parts = [f"### id: {key}\n{_trim_input(text)}" for key, text in items.items()]
+    user_content = (
+        "Process each citizen issue text below and output only the JSON array.\n\n"
+        + "\n\n".join(parts)
+    )
+    max_tokens = min(settings.AI_BATCH_MAX_OUTPUT_TOKENS, 512 * len(items))
+    content = _chat(user_content, BATCH_SYSTEM_PROMPT, max_tokens=max_tokens)
+    if content is None:
+        return None
+
+    try:
+        data = json.loads(content)
+    except json.JSONDecodeError as e:
+        logger.warning("AI returned invalid batch JSON: %s", e)
+        return None
+    if isinstance(data, dict):
+        # Some models wrap the array, e.g. {"results": [...]}
+        data = next((v for v in data.values() if isinstance(v, list)), None)
+    if not isinstance(data, list):
+        logger.warning("AI batch reply is not a JSON array")
+        return None
+
+    results: dict[str, dict[str, Any]] = {}
+    for entry in data:
+        if not isinstance(entry, dict):
+            continue
+        key = str(entry.get("id", "")).strip()
+        if key in items and key not in results:
+            results[key] = _validate_and_normalize(entry)
+    return results
+
+
+def process_issue_texts_batch(items: dict[str, str]) -> dict[str, Optional[dict[str, Any]]]:
+    """
+    Batch version of process_issue_text for backlogs: packs up to AI_BATCH_SIZE
+    texts (within AI_BATCH_MAX_INPUT_TOKENS) into one request, so SYSTEM_PROMPT is
+    sent once per batch instead of once per report.
+
+    items maps a caller-chosen id (e.g. report id) to raw text. Returns the same
+    ids mapped to the process_issue_text-style dict, or None for failures.
+    Locally classified and cached texts skip the API; if a batch reply is malformed or misses an item,
+    those items fall back to one call each.
+    """
+    if not settings.ai_enabled:
+        return {key: None for key in items}
+
+    model = _model_name()
+    results: dict[str, Optional[dict[str, Any]]] = {}
+    pending: dict[str, str] = {}
+    cache_keys: dict[str, str] = {}
+    for key, text in items.items():
+        local = classifier.try_local(text)
+        if local is not None:
+            results[key] = local
+            continue
+        cache_keys[key] = ai_cache.cache_key(text, model, PROMPT_VERSION)
+        cached = ai_cache.get(cache_keys[key], _validate_and_normalize)
+        if cached is not None:
+            results[key] = cached
+        else:
+            pending[key] = text
+
+    for chunk in _chunk_batch(pending):
+        if ai_usage.budget_exhausted():
+            results.update({key: _degraded_result(text) for key, text in chunk.items()})
+            continue
+        batch: Optional[dict[str, dict[str, Any]]] = None
+        if len(chunk) > 1:
+            try:
+                batch = _call_openai_batch(chunk)
+            except ProviderUnavailable:
+                logger.info("AI batch skipped: provider circuit breaker is open")
+            except Exception as e:
+                logger.warning("AI batch processing failed: %s", e, exc_info=settings.DEBUG)
+        for key, text in chunk.items():
+            if batch is not None and key in batch:
+                results[key] = batch[key]
+                ai_cache.put(cache_keys[key], batch[key], model, PROMPT_VERSION)
+            else:
+                results[key] = _process_uncached(text, cache_keys[key], model)
+    return results
+
+
 def _validate_and_normalize(data: dict[str, Any]) -> dict[str, Any]:
     """Ensure category and institution are allowed; set structured_description."""
     result: dict[str, Any] = {}
@@ -0,0 +1,256 @@
+"""
+Background work queue for AI structuring of citizen reports.
+
+create_report commits the report with ai_status="processing" plus an AIJob row
+and returns immediately. A small pool of worker threads claims jobs from the
+ai_jobs table, runs process_issue_text and writes structured_description,
+title, category and institution back to the report.
+
+Jobs are claimed with a lease (run_after is pushed forward while running), so
+a job held by a crashed worker becomes claimable again once the lease expires.
+Failed calls are retried with exponential backoff up to AI_JOB_MAX_ATTEMPTS.
+When several jobs are due at once (a backlog), a worker claims up to
+AI_BATCH_SIZE of them and sends them in one batched request.
+"""
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from models.ai_job import AIJob
+from models.base import SessionLocal
+from models.report import Report
+from services import report_stats
+from services.ai_processor import process_issue_text, process_issue_texts_batch, provider_available
+
+logger = logging.getLogger(__name__)
+
+# Report.ai_status values
+AI_STATUS_PROCESSING = "processing"
+AI_STATUS_DONE = "done"
+AI_STATUS_FAILED = "failed"
+AI_STATUS_DEGRADED = "degraded"  # daily token budget used up: local suggestions only
+
+# AIJob.status values
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+# Set when a job is enqueued so idle workers pick it up without waiting a poll interval
+_wakeup = threading.Event()
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def enqueue_report(db: Session, report: Report) -> AIJob:
+    """Mark report as processing and add its AI job to the session. Caller commits."""
+    report.ai_status = AI_STATUS_PROCESSING
+    job = AIJob(report_id=report.id, status=JOB_QUEUED, attempts=0, run_after=_now())
+    db.add(job)
+    return job
+
+
+def notify_workers() -> None:
+    """Wake idle workers after new jobs were committed."""
+    _wakeup.set()
+
+
+def apply_ai_result(report: Report, ai_result: dict[str, Any]) -> None:
+    """Copy AI output onto the report (only fields the AI actually filled)."""
+    report.structured_description = ai_result.get("structured_description")
+    if ai_result.get("suggested_title"):
+        report.title = ai_result["suggested_title"]
+    if ai_result.get("suggested_institution"):
+        report.institution = ai_result["suggested_institution"]
+    if ai_result.get("suggested_category"):
+        report.category = ai_result["suggested_category"]
+
+
+def queue_depth(db: Session) -> dict[str, Any]:
+    """Job counts by status and age of the oldest waiting job (for monitoring)."""
+    counts = dict(
+        db.query(AIJob.status, func.count(AIJob.id)).group_by(AIJob.status).all()
+    )
+    oldest = (
+        db.query(func.min(AIJob.created_at))
+        .filter(AIJob.status.in_((JOB_QUEUED, JOB_RUNNING)))
+        .scalar()
+    )
+    oldest_age = None
+    if oldest is not None:
+        if oldest.tzinfo is None:
+            oldest = oldest.replace(tzinfo=timezone.utc)
+        oldest_age = max(0.0, (_now() - oldest).total_seconds())
+    return {
+        "queued": counts.get(JOB_QUEUED, 0),
+        "running": counts.get(JOB_RUNNING, 0),
+        "done": counts.get(JOB_DONE, 0),
+        "failed": counts.get(JOB_FAILED, 0),
+        "oldest_pending_seconds": oldest_age,
+        "workers": _pool.size if _pool else 0,
+    }
+
+
+def claim_jobs(db: Session, limit: int = 1) -> list[AIJob]:
+    """
+    Claim up to `limit` due jobs. Each UPDATE only succeeds if nobody else
+    claimed the job since we read it (attempts acts as a version), so several
+    workers or processes can share the table safely.
+    """
+    now = _now()
+    candidates = (
+        db.query(AIJob.id, AIJob.attempts)
+        .filter(AIJob.status.in_((JOB_QUEUED, JOB_RUNNING)), AIJob.run_after <= now)
+        .order_by(AIJob.run_after)
+        .limit(limit + 4)
+        .all()
+    )
+    claimed_ids: list[int] = []
+    for job_id, attempts in candidates:
+        if len(claimed_ids) >= limit:
+            break
+        claimed = db.execute(
+            update(AIJob)
+            .where(AIJob.id == job_id, AIJob.attempts == attempts)
+            .values(
+                status=JOB_RUNNING,
+                attempts=attempts + 1,
+                run_after=now + timedelta(seconds=settings.AI_JOB_LEASE_SECONDS),
+            )
+        ).rowcount
+        if claimed:
+            claimed_ids.append(job_id)
+    db.commit()
+    return [db.get(AIJob, job_id) for job_id in claimed_ids]
+
+
+def _finish_job(db: Session, job: AIJob, report: Optional[Report], ai_result: Optional[dict[str, Any]]) -> None:
+    """Write the result back, or schedule a retry / give up on failure."""
+    if ai_result is not None:
+        if report is not None:
+            before = report_stats.report_key(report)
+            apply_ai_result(report, ai_result)
+            report_stats.report_changed(db, before, report)
+            report.ai_status = AI_STATUS_DEGRADED if ai_result.get("degraded") else AI_STATUS_DONE
+        job.status = JOB_DONE
+        job.last_error = None
+    elif job.attempts >= settings.AI_JOB_MAX_ATTEMPTS:
+        job.status = JOB_FAILED
+        if report is not None:
+            report.ai_status = AI_STATUS_FAILED
+        logger.warning("AI job %s for report %s failed after %s attempts", job.id, job.report_id, job.attempts)
+    else:
+        delay = settings.AI_JOB_RETRY_BASE_SECONDS * (2 ** (job.attempts - 1))
+        job.status = JOB_QUEUED
+        job.run_after = _now() + timedelta(seconds=delay)
+    db.commit()
+
+
+def run_job(db: Session, job: AIJob) -> None:
+    """Process one claimed job."""
+    run_jobs(db, [job])
+
+
+def run_jobs(db: Session, jobs: list[AIJob]) -> None:
+    """Process claimed jobs; more than one goes through the batch API."""
+    reports: dict[int, Optional[Report]] = {job.id: db.get(Report, job.report_id) for job in jobs}
+    texts = {str(job.id): report.raw_description for job in jobs if (report := reports[job.id]) is not None}
+
+    results: dict[str, Optional[dict[str, Any]]] = {}
+    error = None
+    try:
+        if len(texts) == 1:
+            key, text = next(iter(texts.items()))
+            results[key] = process_issue_text(text)
+        elif texts:
+            results = process_issue_texts_batch(texts)
+    except Exception as e:
+        error = str(e)[:2000]
+        logger.warning("AI jobs %s raised: %s", [job.id for job in jobs], e, exc_info=settings.DEBUG)
+
+    for job in jobs:
+        report = reports[job.id]
+        if report is None:
+            job.status = JOB_DONE
+            job.last_error = "report deleted"
+            continue
+        ai_result = results.get(str(job.id))
+        if ai_result is None:
+            job.last_error = error or "AI returned no result"
+        _finish_job(db, job, report, ai_result)
+    db.commit()
+
+
+def work_once() -> bool:
+    """Claim and run due jobs (up to AI_BATCH_SIZE). Returns False if nothing was due."""
+    if not provider_available():
+        # Breaker open: leave jobs queued instead of burning their attempts
+        return False
+    db = SessionLocal()
+    try:
+        jobs = claim_jobs(db, limit=max(1, settings.AI_BATCH_SIZE))
+        if not jobs:
+            return False
+        run_jobs(db, jobs)
+        return True
+    finally:
+        db.close()
+
+
+class AIWorkerPool:
+    """Daemon threads that drain the ai_jobs table until stopped."""
+
+    def __init__(self, size: int) -> None:
+        self.size = max(1, size)
+        self._stop = threading.Event()
+        self._threads: list[threading.Thread] = []
+
+    def start(self) -> None:
+        for i in range(self.size):
+            t = threading.Thread(target=self._loop, name=f"ai-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        logger.info("AI queue: started %s worker(s)", self.size)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        _wakeup.set()
+        for t in self._threads:
+            t.join(timeout=timeout)
+        self._threads.clear()
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                if work_once():
+                    continue
+            except Exception as e:
+                logger.exception("AI worker error: %s", e)
+            _wakeup.wait(settings.AI_JOB_POLL_SECONDS)
+            _wakeup.clear()
+
+
+_pool: Optional[AIWorkerPool] = None
+
+
+def start_workers() -> None:
+    """Start the process-wide worker pool (called from app lifespan)."""
+    global _pool
+    if _pool is None:
+        _pool = AIWorkerPool(settings.AI_WORKERS)
+        _pool.start()
+
+
+def stop_workers() -> None:
+    """Stop the worker pool; unfinished jobs stay in the table for the next start."""
+    global _pool
+    if _pool is not None:
+        _pool.stop()
+        _pool = None
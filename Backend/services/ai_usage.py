@@ -0,0 +1,146 @@
+"""
+Token and latency accounting for AI calls, aggregated per model, plus the
+daily token budget guard.
+
+Latency and call counters live in this process. Tokens are also added to the
+ai_token_usage table (one upserted row per UTC day and model), and the budget
+is checked against that table, so it holds across restarts, API workers and
+the backfill script.
+"""
+import logging
+import threading
+from datetime import date, datetime, timezone
+from typing import Any, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from models.ai_token_usage import AITokenUsage
+from models.base import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_models: dict[str, dict[str, float]] = {}
+
+
+def _empty() -> dict[str, float]:
+    return {
+        "calls": 0,
+        "errors": 0,
+        "prompt_tokens": 0,
+        "completion_tokens": 0,
+        "latency_total_seconds": 0.0,
+        "latency_max_seconds": 0.0,
+    }
+
+
+def _today() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+def _insert(db: Session):
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(AITokenUsage)
+
+
+def _store(model: str, prompt: int, completion: int) -> None:
+    """Add one call's tokens to today's row for the model (upsert)."""
+    db = SessionLocal()
+    try:
+        stmt = _insert(db).values(
+            day=_today(), model=model, calls=1, prompt_tokens=prompt, completion_tokens=completion
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[AITokenUsage.day, AITokenUsage.model],
+            set_={
+                "calls": AITokenUsage.calls + 1,
+                "prompt_tokens": AITokenUsage.prompt_tokens + stmt.excluded.prompt_tokens,
+                "completion_tokens": AITokenUsage.completion_tokens + stmt.excluded.completion_tokens,
+            },
+        )
+        db.execute(stmt)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.warning("AI token usage store failed: %s", e, exc_info=settings.DEBUG)
+    finally:
+        db.close()
+
+
+def record(model: str, usage: Optional[Any], latency_seconds: float, ok: bool = True) -> None:
+    """Record one chat completion. usage is the SDK's response.usage (may be None)."""
+    prompt = int(getattr(usage, "prompt_tokens", 0) or 0)
+    completion = int(getattr(usage, "completion_tokens", 0) or 0)
+    with _lock:
+        m = _models.setdefault(model, _empty())
+        m["calls"] += 1
+        if not ok:
+            m["errors"] += 1
+        m["prompt_tokens"] += prompt
+        m["completion_tokens"] += completion
+        m["latency_total_seconds"] += latency_seconds
+        m["latency_max_seconds"] = max(m["latency_max_seconds"], latency_seconds)
+    if prompt or completion:
+        _store(model, prompt, completion)
+
+
+def tokens_today() -> dict[str, int]:
+    """Today's tokens per model, from every process."""
+    db = SessionLocal()
+    try:
+        rows = db.execute(
+            select(AITokenUsage.model, AITokenUsage.prompt_tokens + AITokenUsage.completion_tokens)
+            .where(AITokenUsage.day == _today())
+        ).all()
+    finally:
+        db.close()
+    return {model: int(tokens) for model, tokens in rows}
+
+
+def budget_exhausted() -> bool:
+    """True once today's tokens (all processes) reach AI_DAILY_TOKEN_BUDGET (0 = no budget)."""
+    if settings.AI_DAILY_TOKEN_BUDGET <= 0:
+        return False
+    db = SessionLocal()
+    try:
+        used = db.scalar(
+            select(func.coalesce(func.sum(AITokenUsage.prompt_tokens + AITokenUsage.completion_tokens), 0))
+            .where(AITokenUsage.day == _today())
+        )
+    except Exception as e:
+        # Can't tell: keep processing rather than degrade every report
+        logger.warning("AI token budget check failed: %s", e, exc_info=settings.DEBUG)
+        return False
+    finally:
+        db.close()
+    return used >= settings.AI_DAILY_TOKEN_BUDGET
+
+
+def stats() -> dict[str, Any]:
+    """Per-model totals and averages since process start, plus today's budget use across processes."""
+    with _lock:
+        models = {}
+        for name, m in _models.items():
+            calls = m["calls"] or 1
+            models[name] = {
+                **m,
+                "total_tokens": m["prompt_tokens"] + m["completion_tokens"],
+                "avg_prompt_tokens": round(m["prompt_tokens"] / calls, 1),
+                "avg_completion_tokens": round(m["completion_tokens"] / calls, 1),
+                "avg_latency_seconds": round(m["latency_total_seconds"] / calls, 4),
+            }
+    today = tokens_today()
+    used = sum(today.values())
+    return {
+        "models": models,
+        "today": _today().isoformat(),
+        "tokens_today": used,
+        "tokens_today_by_model": today,
+        "daily_token_budget": settings.AI_DAILY_TOKEN_BUDGET or None,
+        "budget_exhausted": bool(settings.AI_DAILY_TOKEN_BUDGET) and used >= settings.AI_DAILY_TOKEN_BUDGET,
+    }
@@ -0,0 +1,139 @@
+"""
+Bulk report ingestion (POST /api/reports/bulk) for reports collected offline.
+
+The body is a JSON array or NDJSON (one ReportCreate object per line). All
+rows are parsed and validated first; valid rows are then inserted
+BULK_INGEST_CHUNK_SIZE at a time, one multi-row INSERT ... RETURNING plus one
+AI-job insert and one counter update per chunk, each chunk in its own
+transaction. Parsing, validation and MinHash signatures are CPU-bound, so the
+route runs them on the threadpool (sign_chunk) and insert_chunk only does the
+database work and cheap comparisons. Near-duplicates are clustered against earlier reports and
+against earlier rows of the same chunk. A chunk that fails is retried row by
+row so only the bad rows are reported as failed. AI jobs of ingested reports start after
+BULK_AI_DEFER_SECONDS, behind reports submitted live. The full-text index
+follows through its triggers (SQLite) or the GIN index (PostgreSQL).
+"""
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+
+from pydantic import ValidationError
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from models.ai_job import AIJob
+from models.report import Report
+from schemas.report import ReportCreate
+from services import dedup, report_stats
+from services.ai_queue import AI_STATUS_PROCESSING, JOB_QUEUED
+
+# (input index, validated payload)
+IndexedReport = tuple[int, ReportCreate]
+
+
+def parse_body(body: bytes) -> list[tuple[int, Any, Optional[str]]]:
+    """
+    (index, item, error) per submitted row. A JSON array must parse as a whole
+    (ValueError otherwise); in NDJSON a malformed line only fails that row.
+    """
+    text = body.decode("utf-8-sig")
+    if text.lstrip().startswith("["):
+        items = json.loads(text)
+        return [(i, item, None) for i, item in enumerate(items)]
+    rows: list[tuple[int, Any, Optional[str]]] = []
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        try:
+            rows.append((len(rows), json.loads(line), None))
+        except ValueError as e:
+            rows.append((len(rows), None, f"Invalid JSON: {e}"))
+    return rows
+
+
+def _error_message(error: ValidationError) -> str:
+    first = error.errors()[0]
+    field = ".".join(str(part) for part in first.get("loc", ()))
+    return f"{field}: {first['msg']}" if field else first["msg"]
+
+
+def validate_rows(rows: list[tuple[int, Any, Optional[str]]]) -> tuple[list[IndexedReport], dict[int, str]]:
+    """Validated payloads and {index: error} for rejected rows, in one pass."""
+    valid: list[IndexedReport] = []
+    errors: dict[int, str] = {}
+    for index, item, error in rows:
+        if error is not None:
+            errors[index] = error
+            continue
+        try:
+            valid.append((index, ReportCreate.model_validate(item)))
+        except ValidationError as e:
+            errors[index] = _error_message(e)
+    return valid, errors
+
+
+def sign_chunk(chunk: list[IndexedReport]) -> list[Optional[bytes]]:
+    """MinHash signature of each row's description for insert_chunk (CPU-bound: run it off the event loop)."""
+    return [dedup.signature(payload.description) for _, payload in chunk]
+
+
+def insert_chunk(db: Session, chunk: list[IndexedReport], signatures: list[Optional[bytes]]) -> list[tuple[int, int]]:
+    """
+    Insert validated reports with their AI jobs, dedup buckets and counter
+    deltas; returns (index, report id). `signatures` come from sign_chunk.
+    Caller commits.
+    """
+    values = [
+        dict(
+            user_id=None,
+            title=payload.title or None,
+            name=payload.name,
+            phone=payload.phone,
+            location=payload.location,
+            institution=payload.institution,
+            category=payload.category,
+            raw_description=payload.description,
+            status="pending",
+            ai_status=AI_STATUS_PROCESSING if settings.ai_enabled else None,
+            cluster_id=dedup.find_cluster(db, minhash, payload.location, payload.category),
+            minhash=minhash,
+        )
+        for (_, payload), minhash in zip(chunk, signatures)
+    ]
+    # One multi-row INSERT (insertmanyvalues); RETURNING in parameter order maps ids back to rows
+    inserted = db.execute(
+        insert(Report).returning(
+            Report.id, Report.status, Report.category, Report.institution, sort_by_parameter_order=True
+        ),
+        values,
+    ).all()
+
+    # Rows with no earlier duplicate are matched against the rows before them in this chunk,
+    # whose buckets aren't stored yet
+    chunk_index = dedup.LocalIndex()
+    new_clusters: list[int] = []
+    joined: list[dict] = []
+    for row, v in zip(inserted, values):
+        cluster_id = v["cluster_id"]
+        if cluster_id is None:
+            cluster_id = chunk_index.match(v["minhash"], v["location"], v["category"])
+            if cluster_id is not None:
+                joined.append({"id": row.id, "cluster_id": cluster_id})
+        if cluster_id is None:
+            cluster_id = row.id
+            new_clusters.append(row.id)
+        chunk_index.add(row.id, cluster_id, v["minhash"], v["location"], v["category"])
+    if new_clusters:
+        db.execute(update(Report).where(Report.id.in_(new_clusters)).values(cluster_id=Report.id))
+    if joined:
+        db.execute(update(Report), joined)  # executemany by primary key
+    dedup.add_buckets(db, [(row.id, v["minhash"], v["location"], v["category"]) for row, v in zip(inserted, values)])
+
+    if settings.ai_enabled:
+        run_after = datetime.now(timezone.utc) + timedelta(seconds=settings.BULK_AI_DEFER_SECONDS)
+        db.execute(insert(AIJob), [
+            {"report_id": row.id, "status": JOB_QUEUED, "attempts": 0, "run_after": run_after} for row in inserted
+        ])
+    report_stats.reports_created(db, inserted)
+    return [(index, row.id) for (index, _), row in zip(chunk, inserted)]
@@ -0,0 +1,70 @@
+"""
+Bulk triage (PATCH /api/reports/bulk): one status and/or admin_response for
+many reports, chosen by id list or by the list endpoint's filters.
+
+The change is applied with set-based UPDATE ... RETURNING statements, one per
+current status of the matched reports (usually one to three), all in the
+caller's transaction. Pinning the old status in each WHERE lets the counters
+move exactly, even if another admin changes some of the reports meanwhile;
+RETURNING gives the owner and counter fields for the notifications and
+report_stats without loading the reports. Reports that already have the
+requested values are not touched, so they get no notification and no new
+updated_at.
+"""
+from typing import Optional
+
+from sqlalchemy import and_, select, update
+from sqlalchemy.orm import Session
+
+from models.report import Report
+from services import notifications, report_stats
+
+
+def target_condition(
+    ids: Optional[list[int]] = None,
+    status_filter: Optional[str] = None,
+    category_filter: Optional[str] = None,
+    cluster_filter: Optional[int] = None,
+):
+    """WHERE clause for the selected reports (ids, or the list filters)."""
+    if ids is not None:
+        return Report.id.in_(ids)
+    conditions = []
+    if status_filter:
+        conditions.append(Report.status == status_filter)
+    if category_filter:
+        conditions.append(Report.category == category_filter)
+    if cluster_filter is not None:
+        conditions.append(Report.cluster_id == cluster_filter)
+    return and_(*conditions)
+
+
+def apply(db: Session, condition, status: Optional[str], admin_response: Optional[str]) -> int:
+    """Apply the change to reports matching `condition`; returns how many changed. Caller commits."""
+    values = {}
+    if status is not None:
+        values["status"] = status
+    if admin_response is not None:
+        values["admin_response"] = admin_response
+
+    updated = 0
+    for old_status in db.scalars(select(Report.status).where(condition).distinct()).all():
+        where = and_(condition, Report.status.is_not_distinct_from(old_status))
+        if status is None or status == old_status:
+            # Status stays: only reports whose response differs change
+            if admin_response is None:
+                continue
+            where = and_(where, Report.admin_response.is_distinct_from(admin_response))
+        rows = db.execute(
+            update(Report)
+            .where(where)
+            .values(**values)
+            .returning(Report.id, Report.user_id, Report.status, Report.category, Report.institution, Report.admin_response)
+            .execution_options(synchronize_session=False)
+        ).all()
+        report_stats.reports_changed(
+            db, [((old_status, row.category, row.institution), report_stats.report_key(row)) for row in rows]
+        )
+        notifications.record_changes(db, rows)
+        updated += len(rows)
+    return updated
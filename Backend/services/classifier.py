@@ -0,0 +1,305 @@
+"""
+Local offline classifier for report category and institution.
+
+A TF-IDF centroid model over English and Kinyarwanda keywords: seed keywords
+per category, plus (after training) the text of existing reports. Prediction
+only touches the input's own tokens through an inverted index, so it runs in
+microseconds with no network call. process_issue_text uses it to skip the LLM
+when the category is obvious and the text does not need a formal rewrite.
+
+Train from the database: python -m scripts.train_classifier
+"""
+import json
+import logging
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_TOKEN = re.compile(r"[^\W\d_]{2,}", re.UNICODE)
+
+# Seed vocabulary (English + Kinyarwanda) so the model works before any training
+SEED_KEYWORDS: dict[str, list[str]] = {
+    "roads": [
+        "road", "roads", "pothole", "potholes", "bridge", "traffic", "street", "tarmac", "asphalt",
+        "umuhanda", "imihanda", "ikiraro", "ibiraro", "icyobo", "ibyobo", "kaburimbo",
+    ],
+    "water": [
+        "water", "tap", "taps", "pipe", "pipes", "leak", "leaking", "borehole", "wasac", "drinking",
+        "amazi", "robine", "umuyoboro", "imiyoboro", "isoko", "ivomero",
+    ],
+    "security": [
+        "security", "theft", "thief", "thieves", "robbery", "stolen", "violence", "attack", "police",
+        "umutekano", "ubujura", "abajura", "umujura", "urugomo", "polisi", "yibwe",
+    ],
+    "sanitation": [
+        "garbage", "waste", "trash", "rubbish", "sewage", "toilet", "toilets", "drainage", "dirty",
+        "imyanda", "isuku", "umwanda", "ubwiherero", "ruhurura",
+    ],
+    "electricity": [
+        "electricity", "power", "blackout", "outage", "transformer", "electric", "cable", "reg", "light",
+        "umuriro", "amashanyarazi", "insinga", "cashpower",
+    ],
+    "health": [
+        "hospital", "clinic", "health", "doctor", "nurse", "medicine", "patients", "malaria", "disease",
+        "ibitaro", "ivuriro", "ubuzima", "muganga", "imiti", "umurwayi", "abarwayi", "indwara",
+    ],
+    "education": [
+        "school", "schools", "teacher", "teachers", "students", "pupils", "classroom", "education", "exam",
+        "ishuri", "amashuri", "mwarimu", "abarimu", "abanyeshuri", "uburezi", "icyumba",
+    ],
+    "other": [],
+}
+
+# Usual institution for each category, used to seed the institution model
+CATEGORY_INSTITUTION: dict[str, str] = {
+    "roads": "mininfra",
+    "water": "district",
+    "security": "localGov",
+    "sanitation": "sector",
+    "electricity": "mininfra",
+    "health": "minisante",
+    "education": "mineduc",
+    "other": "other",
+}
+
+# Common Kinyarwanda function words: their presence means translation is needed
+KINYARWANDA_MARKERS = {
+    "ni", "na", "mu", "ku", "kandi", "ariko", "nta", "ntabwo", "cyane", "turasaba", "dufite",
+    "iwacu", "umudugudu", "akagari", "umurenge", "akarere", "abaturage", "muri", "hari", "kubera",
+    "amazi", "umuriro", "umuhanda", "ishuri", "ibitaro",
+}
+# Informal English shorthand that calls for a formal rewrite
+INFORMAL_MARKERS = {"pls", "plz", "u", "ur", "cuz", "bcz", "coz", "gonna", "wanna", "thx", "asap", "ppl", "bt"}
+
+
+def tokenize(text: str) -> list[str]:
+    return _TOKEN.findall(text.casefold())
+
+
+class TfidfCentroidModel:
+    """Per-label TF-IDF centroids stored as an inverted index term -> {label: weight}."""
+
+    def __init__(self, idf: dict[str, float], index: dict[str, dict[str, float]], default_idf: float) -> None:
+        self.idf = idf
+        self.index = index
+        self.default_idf = default_idf
+
+    @classmethod
+    def train(cls, docs: Iterable[tuple[str, list[str]]]) -> "TfidfCentroidModel":
+        """docs: (label, tokens) pairs."""
+        docs = [(label, Counter(tokens)) for label, tokens in docs if tokens]
+        n_docs = len(docs) or 1
+        df: Counter = Counter()
+        for _, tf in docs:
+            df.update(tf.keys())
+        idf = {term: math.log((1 + n_docs) / (1 + count)) + 1.0 for term, count in df.items()}
+
+        centroids: dict[str, dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        for label, tf in docs:
+            vec = {term: (1 + math.log(count)) * idf[term] for term, count in tf.items()}
+            norm = math.sqrt(sum(w * w for w in vec.values())) or 1.0
+            for term, w in vec.items():
+                centroids[label][term] += w / norm
+
+        index: dict[str, dict[str, float]] = defaultdict(dict)
+        for label, vec in centroids.items():
+            norm = math.sqrt(sum(w * w for w in vec.values())) or 1.0
+            for term, w in vec.items():
+                index[term][label] = w / norm
+        return cls(idf, dict(index), default_idf=math.log(1 + n_docs) + 1.0)
+
+    def predict(self, tokens: list[str]) -> tuple[Optional[str], float]:
+        """Best label and confidence (its share of the total similarity, 0..1)."""
+        scores: dict[str, float] = defaultdict(float)
+        for term, count in Counter(tokens).items():
+            postings = self.index.get(term)
+            if not postings:
+                continue
+            weight = (1 + math.log(count)) * self.idf.get(term, self.default_idf)
+            for label, w in postings.items():
+                scores[label] += weight * w
+        total = sum(scores.values())
+        if total <= 0:
+            return None, 0.0
+        label = max(scores, key=scores.get)
+        return label, scores[label] / total
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"idf": self.idf, "index": self.index, "default_idf": self.default_idf}
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "TfidfCentroidModel":
+        return cls(data["idf"], data["index"], data["default_idf"])
+
+
+def _seed_docs() -> list[tuple[str, str, list[str]]]:
+    """(category, institution, tokens) for each seed keyword."""
+    return [
+        (category, CATEGORY_INSTITUTION[category], [word])
+        for category, words in SEED_KEYWORDS.items()
+        for word in words
+    ]
+
+
+def train(rows: Iterable[tuple[str, str, str]]) -> dict[str, Any]:
+    """
+    Train category and institution models from (raw_description, category,
+    institution) rows plus the seed keywords. Returns a JSON-serializable dict.
+    """
+    docs = _seed_docs()
+    for text, category, institution in rows:
+        tokens = tokenize(text or "")
+        if tokens:
+            docs.append((category, institution, tokens))
+    category_model = TfidfCentroidModel.train((c, t) for c, _, t in docs)
+    institution_model = TfidfCentroidModel.train((i, t) for _, i, t in docs)
+    return {
+        "version": 1,
+        "documents": len(docs),
+        "category": category_model.to_dict(),
+        "institution": institution_model.to_dict(),
+    }
+
+
+def model_path() -> Path:
+    return Path(settings.AI_CLASSIFIER_PATH)
+
+
+def save(model: dict[str, Any], path: Optional[Path] = None) -> Path:
+    path = path or model_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(model), encoding="utf-8")
+    return path
+
+
+_models: Optional[tuple[TfidfCentroidModel, TfidfCentroidModel]] = None
+_models_lock = threading.Lock()
+_stats_lock = threading.Lock()
+_stats = {"local": 0, "llm": 0}
+
+
+def _count(name: str) -> None:
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def _load() -> tuple[TfidfCentroidModel, TfidfCentroidModel]:
+    """Trained model from AI_CLASSIFIER_PATH, or a seed-only model if none is saved yet."""
+    global _models
+    if _models is None:
+        with _models_lock:
+            if _models is None:
+                path = model_path()
+                data = None
+                if path.exists():
+                    try:
+                        data = json.loads(path.read_text(encoding="utf-8"))
+                    except (OSError, ValueError) as e:
+                        logger.warning("Could not load classifier model %s: %s", path, e)
+                if data is None:
+                    data = train([])
+                _models = (
+                    TfidfCentroidModel.from_dict(data["category"]),
+                    TfidfCentroidModel.from_dict(data["institution"]),
+                )
+    return _models
+
+
+def reload_model() -> None:
+    """Drop the loaded model so the next call reads AI_CLASSIFIER_PATH again."""
+    global _models
+    with _models_lock:
+        _models = None
+
+
+def classify(text: str) -> dict[str, Any]:
+    """Predict category and institution with confidence scores (0..1)."""
+    category_model, institution_model = _load()
+    tokens = tokenize(text)
+    category, category_conf = category_model.predict(tokens)
+    institution, institution_conf = institution_model.predict(tokens)
+    return {
+        "category": category,
+        "category_confidence": round(category_conf, 4),
+        "institution": institution,
+        "institution_confidence": round(institution_conf, 4),
+    }
+
+
+def needs_formal_rewrite(text: str) -> bool:
+    """True if the text is Kinyarwanda, informal, or too long to store as-is."""
+    tokens = tokenize(text)
+    if not tokens or len(text) > settings.AI_LOCAL_MAX_CHARS:
+        return True
+    if any(t in KINYARWANDA_MARKERS for t in tokens):
+        return True
+    if any(t in INFORMAL_MARKERS for t in text.casefold().split()):
+        return True
+    stripped = text.strip()
+    # Formal text starts with a capital letter and ends a sentence
+    return not (stripped[0].isupper() and stripped[-1] in ".!?")
+
+
+def _title_from(text: str) -> str:
+    first_sentence = re.split(r"(?<=[.!?])\s", text.strip(), maxsplit=1)[0].rstrip(".!?")
+    return " ".join(first_sentence.split()[:10])
+
+
+def try_local(raw_text: str) -> Optional[dict[str, Any]]:
+    """
+    process_issue_text-style result without the LLM, or None when the model is
+    not confident enough or the text needs translation / formal rewriting.
+    """
+    if not settings.AI_LOCAL_CLASSIFIER_ENABLED:
+        return None
+    prediction = classify(raw_text)
+    min_conf = settings.AI_LOCAL_MIN_CONFIDENCE
+    if (
+        prediction["category"] is None
+        or prediction["category_confidence"] < min_conf
+        or prediction["institution_confidence"] < min_conf
+        or needs_formal_rewrite(raw_text)
+    ):
+        _count("llm")
+        return None
+    _count("local")
+    return {
+        "structured_description": " ".join(raw_text.split()),
+        "suggested_title": _title_from(raw_text)[:255] or None,
+        "suggested_category": prediction["category"],
+        "suggested_institution": prediction["institution"],
+    }
+
+
+def suggest(raw_text: str) -> dict[str, Any]:
+    """Category/institution suggestions only (None where not confident); no rewriting."""
+    prediction = classify(raw_text)
+    min_conf = settings.AI_LOCAL_MIN_CONFIDENCE
+    return {
+        "structured_description": None,
+        "suggested_title": None,
+        "suggested_category": prediction["category"] if prediction["category_confidence"] >= min_conf else None,
+        "suggested_institution": (
+            prediction["institution"] if prediction["institution_confidence"] >= min_conf else None
+        ),
+    }
+
+
+def stats() -> dict[str, Any]:
+    """How many texts were handled locally vs sent on to the LLM."""
+    with _stats_lock:
+        counts = dict(_stats)
+    return {
+        "enabled": settings.AI_LOCAL_CLASSIFIER_ENABLED,
+        "model_path": str(model_path()),
+        "trained": model_path().exists(),
+        "min_confidence": settings.AI_LOCAL_MIN_CONFIDENCE,
+        **counts,
+    }
@@ -0,0 +1,251 @@
+"""
+Near-duplicate report detection with MinHash + LSH, stored in the database.
+
+Each report is reduced to word shingles of its description; a MinHash
+signature of DEDUP_BANDS x DEDUP_ROWS values is stored in reports.minhash and
+split into bands. Each (category, location, band) key is a row of
+report_dedup_buckets pointing at the first report that filled it; category
+and location are part of the key, so the same text from two places never
+matches. A new report's keys find candidate reports with one primary-key
+SELECT; a candidate is only accepted if its stored signature agrees with the
+new one on at least DEDUP_THRESHOLD of the values (estimated Jaccard
+similarity), so a single colliding band is not enough.
+
+Reports store the result in Report.cluster_id (the id of the cluster's first
+report; a report with no duplicate is its own cluster). A report's buckets are
+written in the same transaction as the report, so every worker and process
+sees them once it commits; nothing is kept in memory or rebuilt at startup.
+Reports stored before dedup existed, or before a change to DEDUP_BANDS,
+DEDUP_ROWS or DEDUP_SHINGLE_SIZE, are indexed by backfill()
+(scripts/rebuild_dedup_index.py).
+"""
+import hashlib
+import logging
+import re
+import struct
+import threading
+from functools import lru_cache
+from typing import Any, Callable, Iterable, Optional
+
+from sqlalchemy import bindparam, delete, select, update
+
+from core.config import settings
+from models.report import Report
+from models.report_dedup_bucket import ReportDedupBucket
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+_MERSENNE = (1 << 61) - 1
+
+_lock = threading.Lock()
+_stats = {"lookups": 0, "candidates": 0, "matched": 0, "rejected": 0}
+
+# (report id, signature, location, category) of a stored report
+BucketSource = tuple[int, Optional[bytes], str, str]
+
+
+def _count(name: str, n: int = 1) -> None:
+    with _lock:
+        _stats[name] += n
+
+
+@lru_cache(maxsize=4)
+def _coefficients(count: int) -> tuple[tuple[int, int], ...]:
+    """Deterministic (a, b) pairs so every process computes the same signatures."""
+    coeffs = []
+    for i in range(count):
+        digest = hashlib.blake2b(f"minhash-{i}".encode(), digest_size=16).digest()
+        a = int.from_bytes(digest[:8], "little") % _MERSENNE or 1
+        b = int.from_bytes(digest[8:], "little") % _MERSENNE
+        coeffs.append((a, b))
+    return tuple(coeffs)
+
+
+def _hash64(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def shingles(description: str, size: int) -> set[int]:
+    """Hashed word n-grams of the description."""
+    words = _WORD.findall((description or "").casefold())
+    if len(words) < size:
+        grams = {" ".join(words)} if words else set()
+    else:
+        grams = {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+    return {_hash64(g) for g in grams}
+
+
+def _place(location: str) -> str:
+    """Location as compared for duplicates: case and punctuation don't matter."""
+    return " ".join(_WORD.findall((location or "").casefold()))
+
+
+def signature(description: str) -> Optional[bytes]:
+    """MinHash signature to store in reports.minhash (None if dedup is off or there are no words)."""
+    if not settings.DEDUP_ENABLED:
+        return None
+    hashed = shingles(description, max(1, settings.DEDUP_SHINGLE_SIZE))
+    if not hashed:
+        return None
+    coeffs = _coefficients(max(1, settings.DEDUP_BANDS) * max(1, settings.DEDUP_ROWS))
+    return struct.pack(f"<{len(coeffs)}Q", *[min((a * x + b) % _MERSENNE for x in hashed) for a, b in coeffs])
+
+
+def band_keys(minhash: bytes, location: str, category: str) -> list[int]:
+    """Bucket keys of a signature: a signed 64-bit hash per band, the same in every process."""
+    width = 8 * max(1, settings.DEDUP_ROWS)
+    prefix = f"{category}\0{_place(location)}\0".encode("utf-8")
+    return [
+        int.from_bytes(
+            hashlib.blake2b(prefix + band.to_bytes(2, "little") + minhash[start:start + width], digest_size=8).digest(),
+            "little",
+            signed=True,
+        )
+        for band, start in enumerate(range(0, len(minhash), width))
+    ]
+
+
+def similarity(a: bytes, b: bytes) -> float:
+    """Estimated Jaccard similarity: share of equal MinHash values (0 for signatures of other parameters)."""
+    if not a or len(a) != len(b):
+        return 0.0
+    return sum(a[i:i + 8] == b[i:i + 8] for i in range(0, len(a), 8)) / (len(a) // 8)
+
+
+def _best(minhash: bytes, candidates: Iterable[tuple[int, Optional[int], Optional[bytes]]]) -> Optional[int]:
+    """Cluster id of the most similar (report id, cluster id, signature) candidate at or above the threshold."""
+    scored = [
+        (similarity(minhash, other), -(cluster_id or report_id), cluster_id or report_id)
+        for report_id, cluster_id, other in candidates
+        if other is not None
+    ]
+    _count("lookups")
+    if not scored:
+        return None
+    _count("candidates", len(scored))
+    best, _, cluster_id = max(scored)
+    if best < settings.DEDUP_THRESHOLD:
+        _count("rejected")
+        return None
+    _count("matched")
+    return cluster_id
+
+
+def find_cluster(db: Any, minhash: Optional[bytes], location: str, category: str) -> Optional[int]:
+    """
+    Cluster id for a report about to be inserted with this signature, or None
+    if it looks new. `db` is a Session or Connection.
+    """
+    if minhash is None or not settings.DEDUP_ENABLED:
+        return None
+    report_ids = set(db.scalars(
+        select(ReportDedupBucket.report_id).where(ReportDedupBucket.key.in_(band_keys(minhash, location, category)))
+    ))
+    if not report_ids:
+        _count("lookups")
+        return None
+    rows = db.execute(select(Report.id, Report.cluster_id, Report.minhash).where(Report.id.in_(report_ids))).all()
+    return _best(minhash, rows)
+
+
+class LocalIndex:
+    """
+    Buckets of reports not committed yet (one bulk chunk), with the same
+    matching rules, so rows of a chunk cluster with each other.
+    """
+
+    def __init__(self) -> None:
+        self._buckets: dict[int, tuple[int, int, bytes]] = {}
+
+    def match(self, minhash: Optional[bytes], location: str, category: str) -> Optional[int]:
+        if minhash is None or not self._buckets:
+            return None
+        candidates = {}
+        for key in band_keys(minhash, location, category):
+            hit = self._buckets.get(key)
+            if hit is not None:
+                candidates[hit[0]] = hit
+        return _best(minhash, candidates.values()) if candidates else None
+
+    def add(self, report_id: int, cluster_id: int, minhash: Optional[bytes], location: str, category: str) -> None:
+        if minhash is None:
+            return
+        for key in band_keys(minhash, location, category):
+            self._buckets.setdefault(key, (report_id, cluster_id, minhash))
+
+
+def _insert(db: Any):
+    dialect = db.dialect if hasattr(db, "dialect") else db.get_bind().dialect
+    if dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(ReportDedupBucket)
+
+
+def add_buckets(db: Any, reports: Iterable[BucketSource]) -> None:
+    """
+    Point the still-free buckets of these (flushed) reports at them. Caller
+    commits. Keys go in sorted order so concurrent inserts lock in the same order.
+    """
+    rows: dict[int, int] = {}
+    for report_id, minhash, location, category in reports:
+        if minhash is None:
+            continue
+        for key in band_keys(minhash, location, category):
+            rows.setdefault(key, report_id)
+    if not rows:
+        return
+    db.execute(
+        _insert(db).on_conflict_do_nothing(index_elements=[ReportDedupBucket.key]),
+        [{"key": key, "report_id": report_id} for key, report_id in sorted(rows.items())],
+    )
+
+
+def backfill(db: Any, batch_size: int = 1000, everything: bool = False, log: Callable[[str], None] = print) -> int:
+    """
+    Store signatures and buckets of reports that have none (all reports with
+    `everything`, after clearing the buckets: for changed DEDUP_* parameters),
+    walking ids in batches, each committed on its own. Existing cluster ids are
+    kept. Returns reports indexed.
+    """
+    if everything:
+        db.execute(delete(ReportDedupBucket))
+        db.commit()
+    set_minhash = (
+        update(Report.__table__)
+        .where(Report.__table__.c.id == bindparam("report_id"))
+        .values(minhash=bindparam("signature"))
+    )
+    last_id, indexed = 0, 0
+    while True:
+        query = select(Report.id, Report.raw_description, Report.location, Report.category).where(Report.id > last_id)
+        if not everything:
+            query = query.where(Report.minhash.is_(None))
+        rows = db.execute(query.order_by(Report.id).limit(batch_size)).all()
+        if not rows:
+            break
+        signed = [(row.id, signature(row.raw_description), row.location, row.category) for row in rows]
+        db.execute(set_minhash, [{"report_id": report_id, "signature": sig} for report_id, sig, _, _ in signed])
+        add_buckets(db, signed)
+        db.commit()
+        last_id = rows[-1].id
+        indexed += len(rows)
+        if indexed % (batch_size * 20) == 0:
+            log(f"    ... {indexed} reports indexed up to id {last_id}")
+    log(f"    indexed {indexed} reports for near-duplicate detection")
+    return indexed
+
+
+def stats() -> dict[str, Any]:
+    """Lookups, candidates verified, matches and rejections (this process), and the parameters."""
+    with _lock:
+        data = dict(_stats)
+    data.update(
+        enabled=settings.DEDUP_ENABLED,
+        bands=settings.DEDUP_BANDS,
+        rows=settings.DEDUP_ROWS,
+        threshold=settings.DEDUP_THRESHOLD,
+    )
+    return data
@@ -0,0 +1,273 @@
+"""
+Email outbox: requests add an EmailOutbox row (committed with the rest of the
+request) and return; one background sender thread delivers queued rows.
+
+The sender claims up to EMAIL_BATCH_SIZE due rows at a time (optimistic UPDATE
+with a lease, as in services.ai_queue) and sends them over one persistent
+core.email.SMTPConnection, so a burst of emails costs one connect + STARTTLS +
+login instead of one per message. Each email's lease is renewed just before it
+is sent and its result committed right after, both only while `attempts`
+still matches the claim, so a slow batch never outlives its leases and an
+email another sender has reclaimed is skipped rather than sent twice. Failed sends are retried with exponential
+backoff up to EMAIL_MAX_ATTEMPTS. When idle, the sender deletes sent and
+failed rows past their retention (EMAIL_SENT_RETENTION_SECONDS,
+EMAIL_FAILED_RETENTION_SECONDS): their bodies hold password-reset links.
+"""
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+
+from sqlalchemy import and_, delete, func, or_, update
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from core.email import SMTPConnection, build_message
+from models.base import SessionLocal
+from models.email_outbox import EmailOutbox
+
+logger = logging.getLogger(__name__)
+
+# EmailOutbox.status values
+EMAIL_QUEUED = "queued"
+EMAIL_SENDING = "sending"
+EMAIL_SENT = "sent"
+EMAIL_FAILED = "failed"
+
+# Expired rows deleted per statement, and how often the idle sender looks for them
+PURGE_BATCH_SIZE = 1000
+PURGE_INTERVAL_SECONDS = 60
+
+# Set when an email is enqueued so the sender doesn't wait a poll interval
+_wakeup = threading.Event()
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def enqueue_email(
+    db: Session, to_email: str, subject: str, text_body: str, html_body: Optional[str] = None
+) -> EmailOutbox:
+    """Add an email to the outbox. Caller commits, then calls notify_sender()."""
+    email = EmailOutbox(
+        to_email=to_email,
+        subject=subject[:255],
+        text_body=text_body,
+        html_body=html_body,
+        status=EMAIL_QUEUED,
+        attempts=0,
+        run_after=_now(),
+    )
+    db.add(email)
+    return email
+
+
+def notify_sender() -> None:
+    """Wake the sender after new emails were committed."""
+    _wakeup.set()
+
+
+def outbox_depth(db: Session) -> dict[str, Any]:
+    """Email counts by status and age of the oldest unsent email (for monitoring)."""
+    counts = dict(
+        db.query(EmailOutbox.status, func.count(EmailOutbox.id)).group_by(EmailOutbox.status).all()
+    )
+    oldest = (
+        db.query(func.min(EmailOutbox.created_at))
+        .filter(EmailOutbox.status.in_((EMAIL_QUEUED, EMAIL_SENDING)))
+        .scalar()
+    )
+    oldest_age = None
+    if oldest is not None:
+        if oldest.tzinfo is None:
+            oldest = oldest.replace(tzinfo=timezone.utc)
+        oldest_age = max(0.0, (_now() - oldest).total_seconds())
+    return {
+        "queued": counts.get(EMAIL_QUEUED, 0),
+        "sending": counts.get(EMAIL_SENDING, 0),
+        "sent": counts.get(EMAIL_SENT, 0),
+        "failed": counts.get(EMAIL_FAILED, 0),
+        "oldest_pending_seconds": oldest_age,
+        "sender_running": _sender is not None,
+        "smtp_connections_opened": _sender.connection.connections_opened if _sender else 0,
+        "smtp_messages_sent": _sender.connection.messages_sent if _sender else 0,
+        "purged": _sender.purged if _sender else 0,
+    }
+
+
+def claim_emails(db: Session, limit: int) -> list[EmailOutbox]:
+    """Claim up to `limit` due emails; attempts acts as a version so processes can share the table."""
+    now = _now()
+    candidates = (
+        db.query(EmailOutbox.id, EmailOutbox.attempts)
+        .filter(EmailOutbox.status.in_((EMAIL_QUEUED, EMAIL_SENDING)), EmailOutbox.run_after <= now)
+        .order_by(EmailOutbox.run_after)
+        .limit(limit)
+        .all()
+    )
+    claimed_ids: list[int] = []
+    for email_id, attempts in candidates:
+        claimed = db.execute(
+            update(EmailOutbox)
+            .where(EmailOutbox.id == email_id, EmailOutbox.attempts == attempts)
+            .values(
+                status=EMAIL_SENDING,
+                attempts=attempts + 1,
+                run_after=now + timedelta(seconds=settings.EMAIL_LEASE_SECONDS),
+            )
+        ).rowcount
+        if claimed:
+            claimed_ids.append(email_id)
+    db.commit()
+    return [db.get(EmailOutbox, email_id) for email_id in claimed_ids]
+
+
+def _update_claimed(db: Session, email_id: int, attempts: int, **values) -> bool:
+    """Update and commit an email only if it is still this claim (attempts unchanged). False otherwise."""
+    updated = db.execute(
+        update(EmailOutbox)
+        .where(EmailOutbox.id == email_id, EmailOutbox.attempts == attempts)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    return bool(updated)
+
+
+def send_batch(db: Session, emails: list[EmailOutbox], connection: SMTPConnection) -> None:
+    """Send claimed emails over one connection, renewing each lease before sending and committing each result."""
+    # Read the claims first: the commits below expire the ORM objects
+    claims = [
+        (email.id, email.attempts, email.to_email, build_message(email.to_email, email.subject, email.text_body, email.html_body))
+        for email in emails
+    ]
+    for email_id, attempts, to_email, message in claims:
+        lease = _now() + timedelta(seconds=settings.EMAIL_LEASE_SECONDS)
+        if not _update_claimed(db, email_id, attempts, run_after=lease):
+            logger.info("Email %s was reclaimed by another sender; not sending it again", email_id)
+            continue
+        try:
+            connection.send(message)
+        except Exception as e:
+            # Start the next message on a fresh session
+            connection.close()
+            if attempts >= settings.EMAIL_MAX_ATTEMPTS:
+                values = dict(status=EMAIL_FAILED)
+                logger.warning("Email %s to %s failed after %s attempts: %s", email_id, to_email, attempts, e)
+            else:
+                delay = settings.EMAIL_RETRY_BASE_SECONDS * (2 ** (attempts - 1))
+                values = dict(status=EMAIL_QUEUED, run_after=_now() + timedelta(seconds=delay))
+            _update_claimed(db, email_id, attempts, last_error=str(e)[:2000], **values)
+            continue
+        if not _update_claimed(db, email_id, attempts, status=EMAIL_SENT, sent_at=_now(), last_error=None):
+            logger.warning("Email %s was sent after another sender reclaimed it", email_id)
+
+
+def purge_expired(db: Session) -> int:
+    """Delete sent and failed emails past their retention, in batches. Returns rows deleted."""
+    now = _now()
+    expired = or_(
+        and_(
+            EmailOutbox.status == EMAIL_SENT,
+            EmailOutbox.sent_at < now - timedelta(seconds=settings.EMAIL_SENT_RETENTION_SECONDS),
+        ),
+        # run_after of a failed row is its last attempt's lease
+        and_(
+            EmailOutbox.status == EMAIL_FAILED,
+            EmailOutbox.run_after < now - timedelta(seconds=settings.EMAIL_FAILED_RETENTION_SECONDS),
+        ),
+    )
+    deleted = 0
+    while True:
+        ids = [email_id for (email_id,) in db.query(EmailOutbox.id).filter(expired).limit(PURGE_BATCH_SIZE)]
+        if not ids:
+            break
+        db.execute(delete(EmailOutbox).where(EmailOutbox.id.in_(ids)))
+        db.commit()
+        deleted += len(ids)
+        if len(ids) < PURGE_BATCH_SIZE:
+            break
+    return deleted
+
+
+class EmailSender:
+    """Daemon thread that drains the outbox until stopped."""
+
+    def __init__(self) -> None:
+        self.connection = SMTPConnection()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_purge = 0.0
+        self.purged = 0
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._loop, name="email-sender", daemon=True)
+        self._thread.start()
+        logger.info("Email outbox: sender started")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        _wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+        self.connection.close()
+
+    def work_once(self) -> bool:
+        """Send one batch of due emails. Returns False if nothing was due."""
+        db = SessionLocal()
+        try:
+            emails = claim_emails(db, limit=max(1, settings.EMAIL_BATCH_SIZE))
+            if not emails:
+                return False
+            send_batch(db, emails, self.connection)
+            return True
+        finally:
+            db.close()
+
+    def purge_once(self) -> None:
+        """Delete expired rows, at most every PURGE_INTERVAL_SECONDS."""
+        now = time.monotonic()
+        if now - self._last_purge < PURGE_INTERVAL_SECONDS:
+            return
+        self._last_purge = now
+        db = SessionLocal()
+        try:
+            deleted = purge_expired(db)
+        finally:
+            db.close()
+        if deleted:
+            self.purged += deleted
+            logger.info("Email outbox: deleted %s expired email(s)", deleted)
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                if self.work_once():
+                    continue
+                self.purge_once()
+            except Exception as e:
+                logger.exception("Email sender error: %s", e)
+            self.connection.close_if_idle()
+            _wakeup.wait(settings.EMAIL_POLL_SECONDS)
+            _wakeup.clear()
+
+
+_sender: Optional[EmailSender] = None
+
+
+def start_sender() -> None:
+    """Start the process-wide sender (called from app lifespan when SMTP is configured)."""
+    global _sender
+    if _sender is None:
+        _sender = EmailSender()
+        _sender.start()
+
+
+def stop_sender() -> None:
+    """Stop the sender; unsent emails stay in the table for the next start."""
+    global _sender
+    if _sender is not None:
+        _sender.stop()
+        _sender = None
@@ -0,0 +1,147 @@
+"""
+Streaming report export (GET /api/reports/export) as CSV or NDJSON.
+
+Rows are read as plain column tuples (no ORM objects or Pydantic models)
+through a server-side cursor, EXPORT_BATCH_SIZE at a time, and each batch is
+encoded and sent before the next is fetched, so memory stays flat for any
+number of reports. Optionally the bytes are gzip-compressed on the fly.
+
+CSV is opened in spreadsheets, and most columns are citizen-submitted text:
+a cell starting with =, +, -, @, tab or CR gets a leading ' so it is shown
+as text instead of evaluated as a formula (e.g. =HYPERLINK(...)). NDJSON is
+left as stored.
+
+The stream opens its own connection: it keeps reading after the endpoint has
+returned, when the request's session is already closed. With ASYNC_DB it is
+an async connection; otherwise a sync one whose fetches run on the threadpool.
+"""
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from typing import Any, AsyncIterator, Iterator, Optional
+
+from sqlalchemy import select
+from starlette.concurrency import iterate_in_threadpool
+
+from core.config import settings
+from models.base import engine, get_async_engine
+from models.report import Report
+
+FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+EXPORT_COLUMNS = [
+    Report.id,
+    Report.created_at,
+    Report.updated_at,
+    Report.status,
+    Report.priority,
+    Report.category,
+    Report.institution,
+    Report.location,
+    Report.title,
+    Report.raw_description,
+    Report.structured_description,
+    Report.admin_response,
+    Report.ai_status,
+    Report.cluster_id,
+    Report.user_id,
+    Report.name,
+    Report.phone,
+]
+HEADER = [column.key for column in EXPORT_COLUMNS]
+
+
+def export_query(status_filter: Optional[str] = None, category_filter: Optional[str] = None):
+    """Report columns with the list endpoint's filters, in id order (primary key, no sort)."""
+    query = select(*EXPORT_COLUMNS)
+    if status_filter:
+        query = query.where(Report.status == status_filter)
+    if category_filter:
+        query = query.where(Report.category == category_filter)
+    return query.order_by(Report.id)
+
+
+def _value(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+# First characters that make a spreadsheet treat a cell as a formula
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _csv_value(value: Any) -> Any:
+    """_value, with formula-looking text prefixed by ' (CSV formula injection)."""
+    value = _value(value)
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def _encode_csv(rows, header: bool) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(HEADER)
+    writer.writerows([[_csv_value(v) for v in row] for row in rows])
+    return buffer.getvalue().encode("utf-8")
+
+
+def _encode_ndjson(rows) -> bytes:
+    return "".join(
+        json.dumps({key: _value(v) for key, v in zip(HEADER, row)}, ensure_ascii=False) + "\n" for row in rows
+    ).encode("utf-8")
+
+
+def _encode(rows, fmt: str, first: bool) -> bytes:
+    return _encode_csv(rows, header=first) if fmt == "csv" else _encode_ndjson(rows)
+
+
+def _sync_chunks(query, fmt: str) -> Iterator[bytes]:
+    with engine.connect() as conn:
+        result = conn.execute(query.execution_options(yield_per=max(1, settings.EXPORT_BATCH_SIZE)))
+        first = True
+        for rows in result.partitions():
+            yield _encode(rows, fmt, first)
+            first = False
+        if first and fmt == "csv":
+            yield _encode_csv([], header=True)
+
+
+async def _chunks(query, fmt: str) -> AsyncIterator[bytes]:
+    if not settings.ASYNC_DB:
+        async for chunk in iterate_in_threadpool(_sync_chunks(query, fmt)):
+            yield chunk
+        return
+    async with get_async_engine().connect() as conn:
+        result = await conn.stream(query.execution_options(yield_per=max(1, settings.EXPORT_BATCH_SIZE)))
+        first = True
+        async for rows in result.partitions():
+            yield _encode(rows, fmt, first)
+            first = False
+        if first and fmt == "csv":
+            yield _encode_csv([], header=True)
+
+
+async def stream_reports(
+    fmt: str,
+    status_filter: Optional[str] = None,
+    category_filter: Optional[str] = None,
+    gzip: bool = False,
+) -> AsyncIterator[bytes]:
+    """Export bytes, one chunk per batch of rows (a gzip stream when gzip=True)."""
+    chunks = _chunks(export_query(status_filter, category_filter), fmt)
+    if not gzip:
+        async for chunk in chunks:
+            yield chunk
+        return
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31: gzip header and trailer
+    async for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
@@ -0,0 +1,194 @@
+"""
+Digest emails to citizens when admins change their reports.
+
+update_report and the bulk PATCH record each status / admin_response change
+as a ReportNotification row in the same commit. A background digester wakes every
+few seconds, picks users whose oldest pending change is at least
+NOTIFY_DIGEST_WINDOW_SECONDS old, and turns all their pending changes into one
+email (latest change per report) in the email outbox, so a bulk triage of 50
+reports sends one email per citizen rather than 50, over the outbox sender's
+single SMTP session.
+"""
+import logging
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Iterable, Optional
+
+from sqlalchemy import delete, func, insert, update
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from core.email import report_updates_email
+from models.base import SessionLocal
+from models.report import Report
+from models.report_notification import ReportNotification
+from models.user import User
+from services.email_outbox import enqueue_email, notify_sender
+
+logger = logging.getLogger(__name__)
+
+_stats_lock = threading.Lock()
+_stats = {"changes_recorded": 0, "digests_sent": 0, "changes_coalesced": 0}
+
+
+def _count(name: str, n: int = 1) -> None:
+    with _stats_lock:
+        _stats[name] += n
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def record_change(db: Session, report: Report) -> None:
+    """Queue a notification for the report's owner. Caller commits (with the report change)."""
+    if not settings.notifications_enabled or report.user_id is None:
+        return
+    db.add(ReportNotification(
+        user_id=report.user_id,
+        report_id=report.id,
+        status=report.status,
+        admin_response=report.admin_response,
+        created_at=_now(),
+    ))
+    _count("changes_recorded")
+
+
+def record_changes(db: Session, reports: Iterable[Any]) -> None:
+    """record_change for many reports (ORM objects or rows with id/user_id/status/admin_response) in one INSERT."""
+    if not settings.notifications_enabled:
+        return
+    now = _now()
+    rows = [
+        dict(user_id=r.user_id, report_id=r.id, status=r.status, admin_response=r.admin_response, created_at=now)
+        for r in reports
+        if r.user_id is not None
+    ]
+    if rows:
+        db.execute(insert(ReportNotification), rows)
+        _count("changes_recorded", len(rows))
+
+
+def send_due_digests() -> int:
+    """
+    Fold pending changes of every due user into one outbox email each.
+    Claiming (UPDATE ... SET batch_id), enqueueing and deleting happen in one
+    transaction, so a crash or a second process never sends a change twice.
+    Returns the number of digests queued.
+    """
+    cutoff = _now() - timedelta(seconds=settings.NOTIFY_DIGEST_WINDOW_SECONDS)
+    batch_id = uuid.uuid4().hex
+    db = SessionLocal()
+    try:
+        due_users = [
+            user_id
+            for (user_id,) in db.query(ReportNotification.user_id)
+            .filter(ReportNotification.batch_id.is_(None))
+            .group_by(ReportNotification.user_id)
+            .having(func.min(ReportNotification.created_at) <= cutoff)
+            .limit(settings.NOTIFY_MAX_USERS_PER_RUN)
+        ]
+        if not due_users:
+            return 0
+        db.execute(
+            update(ReportNotification)
+            .where(ReportNotification.user_id.in_(due_users), ReportNotification.batch_id.is_(None))
+            .values(batch_id=batch_id)
+        )
+        rows = (
+            db.query(ReportNotification, Report.title, User.email, User.full_name)
+            .join(Report, Report.id == ReportNotification.report_id)
+            .join(User, User.id == ReportNotification.user_id)
+            .filter(ReportNotification.batch_id == batch_id)
+            .order_by(ReportNotification.user_id, ReportNotification.id)
+            .all()
+        )
+
+        # Latest change per report, grouped by user
+        per_user: dict[int, tuple[str, str, dict[int, dict[str, Any]]]] = {}
+        for change, title, email, full_name in rows:
+            _, _, updates = per_user.setdefault(change.user_id, (email, full_name, {}))
+            updates[change.report_id] = {
+                "title": title or f"Report #{change.report_id}",
+                "status": change.status,
+                "admin_response": change.admin_response,
+            }
+        for email, full_name, updates in per_user.values():
+            subject, text_body, html_body = report_updates_email(full_name, list(updates.values()))
+            enqueue_email(db, email, subject, text_body, html_body)
+
+        db.execute(delete(ReportNotification).where(ReportNotification.batch_id == batch_id))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    notify_sender()
+    _count("digests_sent", len(per_user))
+    _count("changes_coalesced", len(rows))
+    return len(per_user)
+
+
+def pending_stats(db: Session) -> dict[str, Any]:
+    """Pending changes and users waiting for a digest, plus counters (for monitoring)."""
+    pending, users = db.query(
+        func.count(ReportNotification.id), func.count(func.distinct(ReportNotification.user_id))
+    ).one()
+    with _stats_lock:
+        data = dict(_stats)
+    data.update({
+        "pending_changes": pending,
+        "pending_users": users,
+        "window_seconds": settings.NOTIFY_DIGEST_WINDOW_SECONDS,
+        "enabled": settings.notifications_enabled,
+    })
+    return data
+
+
+class DigestWorker:
+    """Daemon thread that calls send_due_digests() periodically until stopped."""
+
+    def __init__(self, interval_seconds: float) -> None:
+        self.interval_seconds = interval_seconds
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._loop, name="notification-digest", daemon=True)
+        self._thread.start()
+        logger.info("Notifications: digest worker started (window %ss)", settings.NOTIFY_DIGEST_WINDOW_SECONDS)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                send_due_digests()
+            except Exception as e:
+                logger.exception("Notification digest error: %s", e)
+
+
+_worker: Optional[DigestWorker] = None
+
+
+def start_worker() -> None:
+    """Start the digest worker (called from app lifespan when notifications are enabled)."""
+    global _worker
+    if _worker is None:
+        # Check a few times per window so digests go out soon after the window closes
+        _worker = DigestWorker(max(1.0, min(30.0, settings.NOTIFY_DIGEST_WINDOW_SECONDS / 5)))
+        _worker.start()
+
+
+def stop_worker() -> None:
+    """Stop the digest worker; pending changes stay in the table for the next start."""
+    global _worker
+    if _worker is not None:
+        _worker.stop()
+        _worker = None
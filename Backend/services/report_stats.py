@@ -0,0 +1,155 @@
+"""
+Dashboard counters kept in the report_stats table.
+
+Every path that creates a report or user, or changes a report's status,
+category or institution, adds the matching +1/-1 deltas here before it
+commits, so the counters move in the same transaction as the data they count.
+GET /api/reports/stats then reads the whole (small) table instead of counting
+reports. rebuild() recomputes everything from the reports and users tables:
+on startup when the table is empty, and from scripts/rebuild_report_stats.py
+after changes made outside the API.
+"""
+import logging
+from typing import Any, Iterable, Optional
+
+from sqlalchemy import delete, func, insert, text
+from sqlalchemy.orm import Session
+
+from models.base import SessionLocal
+from models.report import Report
+from models.report_stat import ReportStat
+from models.user import User
+
+logger = logging.getLogger(__name__)
+
+# ReportStat.dimension values
+TOTAL = "total"
+STATUS = "status"
+CATEGORY = "category"
+INSTITUTION = "institution"
+USER_ROLE = "user_role"
+
+REPORT_DIMENSIONS = (STATUS, CATEGORY, INSTITUTION)
+
+# (status, category, institution) of a report, as counted
+ReportKey = tuple[Optional[str], Optional[str], Optional[str]]
+
+
+def report_key(report: Any) -> ReportKey:
+    """What the counters know about a report; take it before changing the report."""
+    return report.status, report.category, report.institution
+
+
+def _insert(db: Session):
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(ReportStat)
+
+
+def add(db: Session, deltas: dict[tuple[str, str], int]) -> None:
+    """
+    Apply {(dimension, value): delta} as one upsert batch. Caller commits.
+    Keys are written in sorted order so concurrent transactions lock rows in
+    the same order (no deadlocks on PostgreSQL).
+    """
+    rows = [
+        {"dimension": dimension, "value": value or "", "count": delta}
+        for (dimension, value), delta in sorted(deltas.items())
+        if delta
+    ]
+    if not rows:
+        return
+    stmt = _insert(db)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ReportStat.dimension, ReportStat.value],
+        set_={"count": ReportStat.count + stmt.excluded.count},
+    )
+    db.execute(stmt, rows)
+
+
+def _report_deltas(deltas: dict[tuple[str, str], int], key: ReportKey, sign: int) -> None:
+    for dimension, value in zip(REPORT_DIMENSIONS, key):
+        deltas[(dimension, value or "")] = deltas.get((dimension, value or ""), 0) + sign
+
+
+def reports_created(db: Session, reports: Iterable[Any]) -> None:
+    """Count new reports (ORM objects or rows with status/category/institution). Caller commits."""
+    deltas: dict[tuple[str, str], int] = {}
+    for report in reports:
+        deltas[(TOTAL, "")] = deltas.get((TOTAL, ""), 0) + 1
+        _report_deltas(deltas, report_key(report), +1)
+    add(db, deltas)
+
+
+def report_created(db: Session, report: Report) -> None:
+    reports_created(db, [report])
+
+
+def reports_changed(db: Session, changes: Iterable[tuple[ReportKey, ReportKey]]) -> None:
+    """Move counts for (before, after) report keys; unchanged fields cancel out. Caller commits."""
+    deltas: dict[tuple[str, str], int] = {}
+    for before, after in changes:
+        if before != after:
+            _report_deltas(deltas, before, -1)
+            _report_deltas(deltas, after, +1)
+    add(db, deltas)
+
+
+def report_changed(db: Session, before: ReportKey, report: Report) -> None:
+    reports_changed(db, [(before, report_key(report))])
+
+
+def user_created(db: Session, user: User) -> None:
+    add(db, {(USER_ROLE, user.role): 1})
+
+
+def get_stats(db: Session) -> dict[str, Any]:
+    """Counters grouped by dimension; one read of report_stats, independent of table sizes."""
+    grouped: dict[str, dict[str, int]] = {STATUS: {}, CATEGORY: {}, INSTITUTION: {}, USER_ROLE: {}, TOTAL: {}}
+    for dimension, value, count in db.query(ReportStat.dimension, ReportStat.value, ReportStat.count):
+        if count:
+            grouped.setdefault(dimension, {})[value] = count
+    return {
+        "total_reports": grouped[TOTAL].get("", 0),
+        "by_status": grouped[STATUS],
+        "by_category": grouped[CATEGORY],
+        "by_institution": grouped[INSTITUTION],
+        "total_users": sum(grouped[USER_ROLE].values()),
+        "users_by_role": grouped[USER_ROLE],
+    }
+
+
+def rebuild(db: Session) -> dict[str, Any]:
+    """
+    Recompute every counter from reports and users. Caller commits. On
+    PostgreSQL the counters table is locked first, so reports committed while
+    this runs are either counted here or add their delta after it.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("LOCK TABLE report_stats IN EXCLUSIVE MODE"))
+    db.execute(delete(ReportStat))
+    deltas: dict[tuple[str, str], int] = {(TOTAL, ""): db.query(func.count(Report.id)).scalar() or 0}
+    for dimension, column in ((STATUS, Report.status), (CATEGORY, Report.category), (INSTITUTION, Report.institution)):
+        for value, count in db.query(column, func.count(Report.id)).group_by(column):
+            deltas[(dimension, value or "")] = count
+    for role, count in db.query(User.role, func.count(User.id)).group_by(User.role):
+        deltas[(USER_ROLE, role or "")] = count
+    # Plain insert so the total row exists even at zero (ensure_built checks for it)
+    db.execute(insert(ReportStat), [
+        {"dimension": dimension, "value": value, "count": count} for (dimension, value), count in sorted(deltas.items())
+    ])
+    return get_stats(db)
+
+
+def ensure_built() -> None:
+    """Build the counters once for databases that existed before report_stats (called at startup)."""
+    db = SessionLocal()
+    try:
+        if db.query(ReportStat.dimension).filter(ReportStat.dimension == TOTAL).first() is None:
+            stats = rebuild(db)
+            db.commit()
+            logger.info("Report stats: built counters for %s reports", stats["total_reports"])
+    finally:
+        db.close()
@@ -0,0 +1,198 @@
+"""
+Group commit for new reports (REPORT_WRITE_BATCHING).
+
+SQLite allows one writer at a time and each commit waits for the disk, so
+concurrent POST /api/reports requests queue on the database lock one commit
+each. With batching on, requests hand their report to one writer thread
+instead: it takes everything submitted within REPORT_WRITE_MAX_WAIT_MS of the
+first report (up to REPORT_WRITE_BATCH_SIZE), inserts it with the AI jobs and
+counter updates in one transaction, and resolves every request's future after
+that single commit. If a batch fails, its reports are retried one by one so a
+bad row only fails its own request.
+"""
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Optional
+
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from models.base import SessionLocal
+from models.report import Report
+from services import dedup, report_stats
+from services.ai_queue import enqueue_report, notify_workers
+
+logger = logging.getLogger(__name__)
+
+_stats_lock = threading.Lock()
+_stats = {"batches": 0, "reports_written": 0, "largest_batch": 0, "failed": 0}
+
+
+def _count(batch_size: int, failed: int = 0) -> None:
+    with _stats_lock:
+        _stats["batches"] += 1
+        _stats["reports_written"] += batch_size - failed
+        _stats["largest_batch"] = max(_stats["largest_batch"], batch_size)
+        _stats["failed"] += failed
+
+
+def insert_reports(db: Session, rows: list[dict[str, Any]]) -> list[Report]:
+    """Insert reports (Report column values) with their AI jobs, dedup buckets and counter deltas. Caller commits."""
+    reports = [Report(**values) for values in rows]
+    db.add_all(reports)
+    db.flush()  # one multi-row INSERT; assigns ids for cluster_id and the AI jobs
+    for report in reports:
+        if report.cluster_id is None:
+            report.cluster_id = report.id
+        if settings.ai_enabled:
+            enqueue_report(db, report)
+    dedup.add_buckets(db, [(r.id, values.get("minhash"), r.location, r.category) for r, values in zip(reports, rows)])
+    report_stats.reports_created(db, reports)
+    return reports
+
+
+class _Pending:
+    __slots__ = ("values", "future")
+
+    def __init__(self, values: dict[str, Any]) -> None:
+        self.values = values
+        self.future: Future = Future()
+
+
+class ReportWriter:
+    """Daemon thread that writes queued reports in batches until stopped."""
+
+    def __init__(self) -> None:
+        self._queue: "queue.Queue[_Pending]" = queue.Queue()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._loop, name="report-writer", daemon=True)
+        self._thread.start()
+        logger.info(
+            "Report writer: started (batch up to %s, wait %s ms)",
+            settings.REPORT_WRITE_BATCH_SIZE, settings.REPORT_WRITE_MAX_WAIT_MS,
+        )
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+
+    def submit(self, values: dict[str, Any]) -> Future:
+        pending = _Pending(values)
+        self._queue.put(pending)
+        return pending.future
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def _next_batch(self) -> list[_Pending]:
+        """Block for the first report, then collect more until the batch is full or the wait is over."""
+        try:
+            batch = [self._queue.get(timeout=0.5)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + settings.REPORT_WRITE_MAX_WAIT_MS / 1000
+        while len(batch) < max(1, settings.REPORT_WRITE_BATCH_SIZE):
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch: list[_Pending]) -> list[Report]:
+        # expire_on_commit=False: the requests serialize the reports after this session is closed
+        db = SessionLocal(expire_on_commit=False)
+        try:
+            reports = insert_reports(db, [pending.values for pending in batch])
+            db.commit()
+            return reports
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def write_batch(self, batch: list[_Pending]) -> None:
+        """Write a batch in one transaction and resolve its futures."""
+        try:
+            results = list(zip(batch, self._write(batch)))
+            failed = 0
+        except Exception as e:
+            if len(batch) == 1:
+                batch[0].future.set_exception(e)
+                _count(1, failed=1)
+                return
+            logger.warning("Report writer: batch of %s failed (%s); writing one by one", len(batch), e)
+            results, failed = [], 0
+            for pending in batch:
+                try:
+                    results.append((pending, self._write([pending])[0]))
+                except Exception as row_error:
+                    pending.future.set_exception(row_error)
+                    failed += 1
+        _count(len(batch), failed)
+        for pending, report in results:
+            pending.future.set_result(report)
+        if settings.ai_enabled and results:
+            notify_workers()
+
+    def _loop(self) -> None:
+        # Keep going after stop until the queue is drained, so accepted reports are written
+        while not self._stop.is_set() or not self._queue.empty():
+            batch = self._next_batch()
+            if not batch:
+                continue
+            try:
+                self.write_batch(batch)
+            except Exception as e:
+                logger.exception("Report writer error: %s", e)
+                for pending in batch:
+                    if not pending.future.done():
+                        pending.future.set_exception(e)
+
+
+_writer: Optional[ReportWriter] = None
+
+
+def running() -> bool:
+    return _writer is not None
+
+
+def submit(values: dict[str, Any]) -> Future:
+    """Queue a report (Report column values) for the writer; the future resolves to the committed Report."""
+    if _writer is None:
+        raise RuntimeError("Report writer is not running")
+    return _writer.submit(values)
+
+
+def stats() -> dict[str, Any]:
+    """Batches written, reports per batch and queue length (this process)."""
+    with _stats_lock:
+        data = dict(_stats)
+    data["avg_batch_size"] = round(data["reports_written"] / data["batches"], 2) if data["batches"] else 0.0
+    data["pending"] = _writer.pending() if _writer else 0
+    data["running"] = _writer is not None
+    return data
+
+
+def start_writer() -> None:
+    """Start the process-wide writer (called from app lifespan when REPORT_WRITE_BATCHING is on)."""
+    global _writer
+    if _writer is None:
+        _writer = ReportWriter()
+        _writer.start()
+
+
+def stop_writer() -> None:
+    """Stop accepting reports and write the ones already queued."""
+    global _writer
+    if _writer is not None:
+        writer, _writer = _writer, None
+        writer.stop()
@@ -0,0 +1,83 @@
+"""
+Ranked full-text search over reports (index defined in models.report_search).
+
+Every word of the query must appear (in any of title, description, AI
+description or location). Results are ordered by relevance, best first, with
+newer reports first among equal scores. The score is "lower is better" on both
+databases (SQLite bm25() is negative, PostgreSQL ts_rank() is negated), so one
+keyset rule pages through either: the cursor holds (score, id) of the last
+row and the next page is the rows ranked after it.
+"""
+import re
+from typing import Optional
+
+from sqlalchemy import and_, column, func, literal, literal_column, or_, select, table
+from sqlalchemy.orm import Session
+
+from core.pagination import decode_cursor, encode_cursor
+from models.report import Report
+from models.report_search import DOCUMENT_SQL, TS_CONFIG
+
+# bm25 column weights: title, raw_description, structured_description, location
+SQLITE_WEIGHTS = (4.0, 1.0, 1.0, 2.0)
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def query_words(q: str) -> list[str]:
+    """Words of the user's query; punctuation and search operators are dropped."""
+    return _WORD.findall(q.lower())[:20]
+
+
+def _ranked_ids(db: Session, words: list[str]):
+    """Subquery of (id, score) for reports matching all words."""
+    if db.get_bind().dialect.name == "postgresql":
+        tsquery = func.plainto_tsquery(TS_CONFIG, " ".join(words))
+        document = literal_column(DOCUMENT_SQL)
+        return (
+            select(Report.id.label("id"), (-func.ts_rank(document, tsquery)).label("score"))
+            .where(document.op("@@")(tsquery))
+            .subquery("ranked")
+        )
+    # FTS5: each word as a quoted string, so user input can't form FTS5 syntax
+    match = " ".join('"' + word.replace('"', "") + '"' for word in words)
+    fts = table("reports_fts", column("rowid"))
+    return (
+        select(fts.c.rowid.label("id"), func.bm25(literal_column("reports_fts"), *SQLITE_WEIGHTS).label("score"))
+        .select_from(fts)
+        .where(literal_column("reports_fts").op("MATCH")(match))
+        .subquery("ranked")
+    )
+
+
+def search_reports(
+    db: Session,
+    q: str,
+    limit: int,
+    cursor: Optional[str] = None,
+    status_filter: Optional[str] = None,
+    category_filter: Optional[str] = None,
+) -> tuple[list[Report], Optional[str]]:
+    """One page of matching reports, best match first, and the cursor for the next page (None on the last)."""
+    words = query_words(q)
+    if not words:
+        return [], None
+    ranked = _ranked_ids(db, words)
+    query = db.query(Report, ranked.c.score).join(ranked, ranked.c.id == Report.id)
+    if status_filter:
+        query = query.filter(Report.status == status_filter)
+    if category_filter:
+        query = query.filter(Report.category == category_filter)
+    if cursor:
+        score, row_id = decode_cursor(cursor, float)
+        query = query.filter(or_(
+            ranked.c.score > literal(score),
+            and_(ranked.c.score == literal(score), Report.id < row_id),
+        ))
+    rows = query.order_by(ranked.c.score, Report.id.desc()).limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last_report, last_score = rows[-1]
+        next_cursor = encode_cursor(float(last_score), last_report.id)
+    return [report for report, _ in rows], next_cursor
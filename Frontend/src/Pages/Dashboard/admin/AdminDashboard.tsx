@@ -21,6 +21,15 @@ interface ReportItem {
   created_at: string;
 }
 
+interface ReportStats {
+  total_reports: number;
+  by_status: Record<string, number>;
+  by_category: Record<string, number>;
+  by_institution: Record<string, number>;
+  total_users: number;
+  users_by_role: Record<string, number>;
+}
+
 interface Counts {
   users: number;
   totalReports: number;
@@ -61,29 +70,29 @@ export function AdminDashboard() {
     rejectedReports: 0,
   });
   const [reports, setReports] = useState<ReportItem[]>([]);
+  const [byCategory, setByCategory] = useState<Record<string, number>>({});
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
     let cancelled = false;
     async function fetchData() {
       try {
-        const [usersRes, reportsRes] = await Promise.all([
-          apiClient.get<{ id: number }[]>('/api/users'),
-          apiClient.get<ReportItem[]>('/api/reports'),
+        // Counts come from server-side counters; only the 5 most recent reports are fetched
+        const [statsRes, reportsRes] = await Promise.all([
+          apiClient.get<ReportStats>('/api/reports/stats'),
+          apiClient.get<ReportItem[]>('/api/reports', { params: { limit: 5 } }),
         ]);
         if (cancelled) return;
-        const usersList = Array.isArray(usersRes.data) ? usersRes.data : [];
+        const stats = statsRes.data;
         const reportsList = Array.isArray(reportsRes.data) ? reportsRes.data : [];
-        const pending = reportsList.filter((r) => r.status === 'pending' || r.status === 'new').length;
-        const resolved = reportsList.filter((r) => r.status === 'resolved').length;
-        const rejected = reportsList.filter((r) => r.status === 'rejected').length;
         setCounts({
-          users: usersList.length,
-          totalReports: reportsList.length,
-          pendingReports: pending,
-          resolvedReports: resolved,
-          rejectedReports: rejected,
+          users: stats.users_by_role?.User ?? 0,
+          totalReports: stats.total_reports,
+          pendingReports: (stats.by_status?.pending ?? 0) + (stats.by_status?.new ?? 0),
+          resolvedReports: stats.by_status?.resolved ?? 0,
+          rejectedReports: stats.by_status?.rejected ?? 0,
         });
+        setByCategory(stats.by_category ?? {});
         setReports(reportsList);
       } catch {
         if (!cancelled)
@@ -102,11 +111,6 @@ export function AdminDashboard() {
     return () => { cancelled = true; };
   }, []);
 
-  const byCategory = reports.reduce<Record<string, number>>((acc, r) => {
-    const cat = r.category || 'other';
-    acc[cat] = (acc[cat] || 0) + 1;
-    return acc;
-  }, {});
   const categoryData = Object.entries(byCategory)
     .map(([key, value]) => ({ name: CATEGORY_LABELS[key] || key, value, key }))
     .sort((a, b) => b.value - a.value)